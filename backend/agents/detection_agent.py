@@ -13,8 +13,7 @@ from .detection.severity_estimator import estimate_severity
 from .detection.confidence_estimator import estimate_confidence
 from .detection.spike_detector import detect_spikes
 from backend.ws.manager import manager as ws_manager
-from backend.agents.trust_agent import TrustAgent
-trust_agent = TrustAgent()
+from backend.agents.trust_agent import get_trust_agent
 
 def _get_alerts_log_path():
     base_dir = os.path.dirname(os.path.dirname(__file__))  
@@ -194,7 +193,7 @@ def run_detection_pipeline(broadcast=True):
             log_alert = _format_alert_for_log(signal, event_type, severity, confidence)
 
             try:
-                trust_result = trust_agent.verify_alert(log_alert)
+                trust_result = get_trust_agent().verify_alert(log_alert)
                 log_alert.update(trust_result)
             except Exception as e:
                 print(f"[Detection] Trust verification failed: {e}")
@@ -0,0 +1,246 @@
+"""
+Append-only event log for learning metrics
+
+Each recorded metric is one row appended to a SQLite table, so recording
+costs O(1) I/O. Every `snapshot_every` events the aggregate state is
+written as the snapshot and the events it covers are deleted. On startup
+the snapshot is loaded and the events after it are replayed.
+
+Several processes (API workers, the scheduler) may share one log file:
+- seq is an AUTOINCREMENT key, so every event gets a unique, ordered seq
+- before taking a snapshot a process applies the events other processes
+  added since it last looked, inside one BEGIN IMMEDIATE transaction
+- a process whose unseen events were compacted by another one rebuilds
+  its state from that snapshot first
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Callable, Dict, Optional
+
+
+class MetricsEventLog:
+    """Event log + snapshots for one aggregate state, shared across processes"""
+
+    def __init__(self, path: str, snapshot_every: int = 1000, fsync: bool = False,
+                 busy_timeout_ms: int = 5000):
+        """
+        Args:
+            path: SQLite file holding the snapshot and the events
+            snapshot_every: Events between snapshots (bounds replay time)
+            fsync: Sync every append (durable across power loss, slower)
+            busy_timeout_ms: How long to wait for another process's write
+        """
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.busy_timeout_ms = busy_timeout_ms
+
+        # Every event <= seq is folded into the state
+        self.seq = 0
+        self.since_snapshot = 0
+        self._apply = None
+        self._initial_state = None
+        # Seqs this process appended after self.seq (already in its state)
+        self._own = set()
+        self._conn = None
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """This process's connection (reopened after a fork)"""
+        if self._conn is None or self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000,
+                                         isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(f"PRAGMA synchronous={'FULL' if self.fsync else 'NORMAL'}")
+            self._pid = os.getpid()
+        return self._conn
+
+    def _transaction(self, fn: Callable[[sqlite3.Connection], object]):
+        conn = self._connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            result = fn(conn)
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+
+    # ========== STARTUP ==========
+
+    def load(self, initial_state: Callable[[], Dict],
+             apply: Callable[[Dict, Dict], None],
+             legacy_path: Optional[str] = None,
+             upgrade: Optional[Callable[[Dict], Dict]] = None) -> Dict:
+        """
+        Rebuild the state: snapshot (or a legacy full-state JSON file, or
+        initial_state()) plus every later event passed through `apply`;
+        `upgrade` converts a stored state from an older layout first
+        """
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._apply = apply
+        self._initial_state = initial_state
+
+        with self._lock:
+            def run(conn):
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS metric_events (
+                        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                        payload TEXT NOT NULL
+                    )
+                """)
+                conn.execute("""
+                    CREATE TABLE IF NOT EXISTS metric_snapshot (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        seq INTEGER NOT NULL,
+                        state TEXT NOT NULL
+                    )
+                """)
+                state, self.seq = self._read_snapshot(conn)
+                migrated = False
+                # The legacy file is imported once, by whichever process starts first
+                if state is None and legacy_path and os.path.exists(legacy_path):
+                    try:
+                        with open(legacy_path, 'r') as f:
+                            state = json.load(f)
+                        migrated = True
+                    except Exception as e:
+                        print(f"⚠ Failed to import legacy metrics: {e}")
+                if state is None:
+                    state = initial_state()
+                elif upgrade is not None:
+                    state = upgrade(state)
+
+                replayed = self._replay(conn, state)
+                if migrated:
+                    self._write_snapshot(conn, state)
+                    return state, 0
+                return state, replayed
+
+            state, replayed = self._transaction(run)
+
+        self.since_snapshot = replayed
+        if replayed >= self.snapshot_every:
+            self.snapshot(state)
+        return state
+
+    @staticmethod
+    def _read_snapshot(conn: sqlite3.Connection):
+        row = conn.execute("SELECT seq, state FROM metric_snapshot WHERE id = 1").fetchone()
+        if row is None:
+            return None, 0
+        try:
+            return json.loads(row[1]), row[0]
+        except ValueError as e:
+            print(f"⚠ Failed to load metrics snapshot: {e}")
+            return None, row[0]
+
+    @staticmethod
+    def _max_seq(conn: sqlite3.Connection) -> int:
+        row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'metric_events'").fetchone()
+        return row[0] if row else 0
+
+    def _replay(self, conn: sqlite3.Connection, state: Dict) -> int:
+        """Apply the events after self.seq that this process did not append"""
+        replayed = 0
+        rows = conn.execute(
+            "SELECT seq, payload FROM metric_events WHERE seq > ? ORDER BY seq", (self.seq,)
+        ).fetchall()
+        for seq, payload in rows:
+            if seq not in self._own:
+                try:
+                    self._apply(state, json.loads(payload))
+                except Exception as e:
+                    print(f"⚠ Skipped metrics event {seq}: {e}")
+                replayed += 1
+            self.seq = seq
+        self._own.clear()
+        return replayed
+
+    # ========== WRITE ==========
+
+    def append(self, event: Dict, state: Dict) -> int:
+        """
+        Append one event (already applied to `state`); snapshots `state`
+        when snapshot_every events have accumulated. Returns the event seq.
+        """
+        with self._lock:
+            conn = self._connection()
+            cursor = conn.execute(
+                "INSERT INTO metric_events (payload) VALUES (?)",
+                (json.dumps(event, separators=(',', ':')),)
+            )
+            seq = cursor.lastrowid
+            self._own.add(seq)
+            self.since_snapshot += 1
+
+        if self.since_snapshot >= self.snapshot_every:
+            self.snapshot(state)
+        return seq
+
+    def snapshot(self, state: Dict):
+        """
+        Catch `state` up with other processes' events, write it as the
+        snapshot and drop the events it covers. `state` is updated in place.
+        """
+        with self._lock:
+            def run(conn):
+                snapshot_seq = conn.execute("SELECT seq FROM metric_snapshot WHERE id = 1").fetchone()
+                if snapshot_seq and snapshot_seq[0] > self.seq:
+                    # Another process compacted events this state never saw
+                    self._rebuild(conn, state)
+                else:
+                    self._replay(conn, state)
+                self._write_snapshot(conn, state)
+
+            self._transaction(run)
+            self.since_snapshot = 0
+
+    def reset(self, state: Dict):
+        """Make `state` the snapshot and discard every logged event"""
+        with self._lock:
+            def run(conn):
+                self.seq = self._max_seq(conn)
+                self._own.clear()
+                self._write_snapshot(conn, state)
+
+            self._transaction(run)
+            self.since_snapshot = 0
+
+    def _rebuild(self, conn: sqlite3.Connection, state: Dict):
+        snap, self.seq = self._read_snapshot(conn)
+        state.clear()
+        state.update(snap if snap is not None else self._initial_state())
+        # Own events after the snapshot were lost with the old state too
+        self._own.clear()
+        self._replay(conn, state)
+
+    def _write_snapshot(self, conn: sqlite3.Connection, state: Dict):
+        conn.execute(
+            "INSERT OR REPLACE INTO metric_snapshot (id, seq, state) VALUES (1, ?, ?)",
+            (self.seq, json.dumps(state, separators=(',', ':')))
+        )
+        conn.execute("DELETE FROM metric_events WHERE seq <= ?", (self.seq,))
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            pending = self._connection().execute("SELECT COUNT(*) FROM metric_events").fetchone()[0]
+        return {
+            'path': self.path,
+            'seq': self.seq,
+            'events_since_snapshot': self.since_snapshot,
+            'events_in_log': pending
+        }
@@ -11,6 +11,7 @@ Responsibilities:
 
 from typing import Dict, List, Optional
 from datetime import datetime
+import threading
 import time
 
 from .metrics import MetricsTracker
@@ -462,14 +463,34 @@ class LearningAgent:
 
 
 # ========== MODULE-LEVEL AGENT INSTANCE ==========
-agent = LearningAgent()
+# Built on first use so importing the learning routes doesn't load metrics
+_agent = None
+_agent_lock = threading.Lock()
+
+
+def get_learning_agent() -> LearningAgent:
+    """Return the shared LearningAgent, creating it on first call"""
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                _agent = LearningAgent()
+    return _agent
+
+
+def __getattr__(name):
+    # Keeps `from backend.agents.learning.learning_agent import agent` working
+    if name == 'agent':
+        return get_learning_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # Module-level convenience functions
 def record_task_result(task_id: str, volunteer_id: str, 
                       success: bool, task_type: str = None,
                       completion_time: float = None):
     """Module-level function for recording task results"""
-    agent.metrics.record_task_result(
+    get_learning_agent().metrics.record_task_result(
         task_id=task_id,
         volunteer_id=volunteer_id,
         success=success,
@@ -479,4 +500,4 @@ def record_task_result(task_id: str, volunteer_id: str,
 
 def get_volunteer_reliability(volunteer_id: str) -> Dict:
     """Module-level function for getting volunteer reliability"""
-    return agent.get_volunteer_profile(volunteer_id)
\ No newline at end of file
+    return get_learning_agent().get_volunteer_profile(volunteer_id)
\ No newline at end of file
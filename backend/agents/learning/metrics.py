@@ -6,19 +6,36 @@ Tracks:
 - Task success/failure rates
 - Volunteer reliability scores
 - Crisis outcome effectiveness
+
+Response times, completion times and resource scores are kept as
+streaming statistics (running mean/variance, min/max, a reservoir for
+percentiles) per volunteer, resource and task type, not as sample lists.
+
+Every record_* call is an event: applied to the in-memory aggregates and
+appended to an event log (see event_store), so recording costs O(1) I/O.
+The aggregates are rebuilt on startup from the last snapshot plus replay.
 """
 
-import json
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from collections import defaultdict
 import statistics
+import threading
+
+from .event_store import MetricsEventLog
+from .running_stats import add_sample, from_samples, new_stats, summary
 
 class MetricsTracker:
     """Track performance metrics for learning and optimization"""
     
-    def __init__(self, data_path: str = None):
+    def __init__(self, data_path: str = None, snapshot_every: int = 1000):
+        """
+        Args:
+            data_path: Legacy full-state JSON file; the event log is the
+                SQLite file of the same name with '.db' for '.json'
+            snapshot_every: Events between snapshots of the aggregates
+        """
         if data_path is None:
             data_path = os.path.join(
                 os.path.dirname(__file__), 
@@ -28,25 +45,30 @@ class MetricsTracker:
             )
         
         self.data_path = data_path
+        self.store = MetricsEventLog(os.path.splitext(data_path)[0] + '.db', snapshot_every)
+        self._lock = threading.Lock()
         self.data = self._load_data()
         
         print(f"✓ MetricsTracker initialized")
     
     def _load_data(self) -> Dict:
-        """Load metrics data from file"""
-        if os.path.exists(self.data_path):
-            try:
-                with open(self.data_path, 'r') as f:
-                    return json.load(f)
-            except Exception as e:
-                print(f"⚠ Failed to load metrics: {e}")
-        
-        # Initialize empty structure
+        """Snapshot + replayed events (imports the legacy JSON file once)"""
+        try:
+            return self.store.load(self._empty_data, self._apply, legacy_path=self.data_path,
+                                   upgrade=self._upgrade_data)
+        except Exception as e:
+            print(f"⚠ Failed to load metrics: {e}")
+            return self._empty_data()
+    
+    @staticmethod
+    def _empty_data() -> Dict:
         return {
             'volunteer_metrics': {},
             'crisis_outcomes': [],
             'resource_performance': {},
-            'response_times': [],
+            'response_time_stats': new_stats(),
+            # task type -> {'response_time': stats, 'completion_time': stats}
+            'task_type_metrics': {},
             'task_results': [],
             'metadata': {
                 'created_at': datetime.now().isoformat(),
@@ -56,16 +78,74 @@ class MetricsTracker:
             }
         }
     
-    def _save_data(self):
-        """Save metrics data to file"""
-        try:
-            os.makedirs(os.path.dirname(self.data_path), exist_ok=True)
-            self.data['metadata']['last_updated'] = datetime.now().isoformat()
-            
-            with open(self.data_path, 'w') as f:
-                json.dump(self.data, f, indent=2)
-        except Exception as e:
-            print(f"⚠ Failed to save metrics: {e}")
+    @staticmethod
+    def _upgrade_data(data: Dict) -> Dict:
+        """Fold sample lists from older snapshots / JSON files into stats"""
+        entries = data.pop('response_times', None)
+        if 'response_time_stats' not in data:
+            data['response_time_stats'] = from_samples(e['response_time'] for e in entries or [])
+        if 'task_type_metrics' not in data:
+            data['task_type_metrics'] = {}
+            for entry in entries or []:
+                if entry.get('task_type'):
+                    add_sample(MetricsTracker._task_type(data, entry['task_type'])['response_time'],
+                               entry['response_time'])
+            for result in data.get('task_results', []):
+                if result.get('task_type') and result.get('completion_time') is not None:
+                    add_sample(MetricsTracker._task_type(data, result['task_type'])['completion_time'],
+                               result['completion_time'])
+        for vol_metrics in data['volunteer_metrics'].values():
+            if 'response_times' in vol_metrics:
+                vol_metrics['response_time_stats'] = from_samples(vol_metrics.pop('response_times'))
+        for res_data in data['resource_performance'].values():
+            if 'performance_scores' in res_data:
+                res_data['performance_stats'] = from_samples(res_data.pop('performance_scores'))
+        return data
+    
+    # ========== EVENTS ==========
+    
+    def _record(self, event_type: str, **fields):
+        """Apply one event to the aggregates and append it to the log"""
+        event = {'type': event_type, **fields, 'timestamp': datetime.now().isoformat()}
+        with self._lock:
+            self._apply(self.data, event)
+            try:
+                self.store.append(event, self.data)
+            except Exception as e:
+                print(f"⚠ Failed to save metrics: {e}")
+    
+    def _apply(self, data: Dict, event: Dict):
+        """Fold one event into `data` (also used for replay, so no clocks here)"""
+        getattr(self, f"_apply_{event['type']}")(data, event)
+        data['metadata']['last_updated'] = event['timestamp']
+    
+    @staticmethod
+    def _volunteer(data: Dict, volunteer_id: str) -> Dict:
+        if volunteer_id not in data['volunteer_metrics']:
+            data['volunteer_metrics'][volunteer_id] = {
+                'total_tasks': 0,
+                'successful_tasks': 0,
+                'failed_tasks': 0,
+                'avg_response_time': 0,
+                'response_time_stats': new_stats(),
+                'reliability_score': 0.5,
+                'last_active': None
+            }
+        return data['volunteer_metrics'][volunteer_id]
+    
+    @staticmethod
+    def _task_type(data: Dict, task_type: str) -> Dict:
+        if task_type not in data['task_type_metrics']:
+            data['task_type_metrics'][task_type] = {
+                'response_time': new_stats(),
+                'completion_time': new_stats()
+            }
+        return data['task_type_metrics'][task_type]
+    
+    def snapshot(self):
+        """Write a snapshot now (e.g. on shutdown) to shorten the next replay"""
+        with self._lock:
+            self.store.snapshot(self.data)
     
     # ========== RESPONSE TIME TRACKING ==========
     
@@ -81,38 +161,28 @@ class MetricsTracker:
             response_time_seconds: Time taken to respond
             task_type: Type of task (rescue, medical, etc.)
         """
-        entry = {
-            'volunteer_id': volunteer_id,
-            'task_id': task_id,
-            'response_time': response_time_seconds,
-            'task_type': task_type,
-            'timestamp': datetime.now().isoformat()
-        }
+        self._record(
+            'response_time',
+            volunteer_id=volunteer_id,
+            task_id=task_id,
+            response_time=response_time_seconds,
+            task_type=task_type
+        )
         
-        self.data['response_times'].append(entry)
+        print(f"   ✓ Response time recorded: {volunteer_id} - {response_time_seconds:.1f}s")
+    
+    def _apply_response_time(self, data: Dict, event: Dict):
+        add_sample(data['response_time_stats'], event['response_time'])
+        if event['task_type']:
+            add_sample(self._task_type(data, event['task_type'])['response_time'], event['response_time'])
         
         # Update volunteer metrics
-        if volunteer_id not in self.data['volunteer_metrics']:
-            self.data['volunteer_metrics'][volunteer_id] = {
-                'total_tasks': 0,
-                'successful_tasks': 0,
-                'failed_tasks': 0,
-                'avg_response_time': 0,
-                'response_times': [],
-                'reliability_score': 0.5,
-                'last_active': None
-            }
+        vol_metrics = self._volunteer(data, event['volunteer_id'])
+        add_sample(vol_metrics['response_time_stats'], event['response_time'])
+        vol_metrics['last_active'] = event['timestamp']
         
-        vol_metrics = self.data['volunteer_metrics'][volunteer_id]
-        vol_metrics['response_times'].append(response_time_seconds)
-        vol_metrics['last_active'] = datetime.now().isoformat()
-        
-        # Calculate running average
-        vol_metrics['avg_response_time'] = statistics.mean(vol_metrics['response_times'])
-        
-        self._save_data()
-        
-        print(f"   ✓ Response time recorded: {volunteer_id} - {response_time_seconds:.1f}s")
+        # Running average (Welford)
+        vol_metrics['avg_response_time'] = vol_metrics['response_time_stats']['mean']
     
     def get_avg_response_time(self, volunteer_id: str = None, 
                              task_type: str = None) -> float:
@@ -126,22 +196,35 @@ class MetricsTracker:
         Returns:
             Average response time in seconds
         """
+        return self.get_response_time_stats(volunteer_id, task_type)['mean']
+    
+    def get_response_time_stats(self, volunteer_id: str = None,
+                                task_type: str = None) -> Dict:
+        """
+        Response time summary: count, mean, stddev, min, max, p50, p90
+        
+        Args:
+            volunteer_id: If specified, get for specific volunteer
+            task_type: If specified, get for this task type
+        """
         if volunteer_id:
             vol_data = self.data['volunteer_metrics'].get(volunteer_id)
-            if vol_data and vol_data['response_times']:
-                return vol_data['avg_response_time']
-            return 0.0
-        
-        # Get overall or filtered average
-        times = self.data['response_times']
+            return summary(vol_data and vol_data['response_time_stats'])
         
         if task_type:
-            times = [t for t in times if t.get('task_type') == task_type]
+            type_data = self.data['task_type_metrics'].get(task_type)
+            return summary(type_data and type_data['response_time'])
         
-        if not times:
-            return 0.0
-        
-        return statistics.mean([t['response_time'] for t in times])
+        return summary(self.data['response_time_stats'])
+    
+    def get_task_type_statistics(self, task_type: str) -> Dict:
+        """Response and completion time summaries for one task type"""
+        type_data = self.data['task_type_metrics'].get(task_type) or {}
+        return {
+            'task_type': task_type,
+            'response_time': summary(type_data.get('response_time')),
+            'completion_time': summary(type_data.get('completion_time'))
+        }
     
     # ========== TASK SUCCESS/FAILURE TRACKING ==========
     
@@ -160,35 +243,33 @@ class MetricsTracker:
             completion_time: Time taken to complete (seconds)
             notes: Additional notes
         """
-        entry = {
-            'task_id': task_id,
-            'volunteer_id': volunteer_id,
-            'success': success,
-            'task_type': task_type,
-            'completion_time': completion_time,
-            'notes': notes,
-            'timestamp': datetime.now().isoformat()
-        }
+        self._record(
+            'task_result',
+            task_id=task_id,
+            volunteer_id=volunteer_id,
+            success=success,
+            task_type=task_type,
+            completion_time=completion_time,
+            notes=notes
+        )
         
-        self.data['task_results'].append(entry)
-        self.data['metadata']['total_tasks'] += 1
+        status = "✓ Success" if success else "✗ Failed"
+        print(f"   {status}: Task {task_id} by {volunteer_id}")
+    
+    def _apply_task_result(self, data: Dict, event: Dict):
+        data['task_results'].append({
+            key: event[key] for key in
+            ('task_id', 'volunteer_id', 'success', 'task_type', 'completion_time', 'notes', 'timestamp')
+        })
+        data['metadata']['total_tasks'] += 1
+        if event['task_type'] and event['completion_time'] is not None:
+            add_sample(self._task_type(data, event['task_type'])['completion_time'], event['completion_time'])
         
         # Update volunteer metrics
-        if volunteer_id not in self.data['volunteer_metrics']:
-            self.data['volunteer_metrics'][volunteer_id] = {
-                'total_tasks': 0,
-                'successful_tasks': 0,
-                'failed_tasks': 0,
-                'avg_response_time': 0,
-                'response_times': [],
-                'reliability_score': 0.5,
-                'last_active': None
-            }
-        
-        vol_metrics = self.data['volunteer_metrics'][volunteer_id]
+        vol_metrics = self._volunteer(data, event['volunteer_id'])
         vol_metrics['total_tasks'] += 1
         
-        if success:
+        if event['success']:
             vol_metrics['successful_tasks'] += 1
         else:
             vol_metrics['failed_tasks'] += 1
@@ -198,12 +279,7 @@ class MetricsTracker:
             vol_metrics['successful_tasks'] / vol_metrics['total_tasks']
         )
         
-        vol_metrics['last_active'] = datetime.now().isoformat()
-        
-        self._save_data()
-        
-        status = "✓ Success" if success else "✗ Failed"
-        print(f"   {status}: Task {task_id} by {volunteer_id}")
+        vol_metrics['last_active'] = event['timestamp']
     
     def get_success_rate(self, volunteer_id: str = None, 
                         task_type: str = None,
@@ -264,6 +340,7 @@ class MetricsTracker:
                 'total_tasks': 0,
                 'success_rate': 0.0,
                 'avg_response_time': 0.0,
+                'p90_response_time': None,
                 'status': 'new'
             }
         
@@ -287,6 +364,7 @@ class MetricsTracker:
             'failed_tasks': vol_data['failed_tasks'],
             'success_rate': vol_data['reliability_score'] * 100,
             'avg_response_time': vol_data['avg_response_time'],
+            'p90_response_time': summary(vol_data['response_time_stats'])['p90'],
             'last_active': vol_data['last_active'],
             'status': status
         }
@@ -340,22 +418,26 @@ class MetricsTracker:
             effectiveness_score: How effective the response was (0-1)
             notes: Additional notes
         """
-        entry = {
-            'crisis_id': crisis_id,
-            'crisis_type': crisis_type,
-            'outcome': outcome,
-            'resources_used': resources_used,
-            'response_time': response_time,
-            'effectiveness_score': effectiveness_score,
-            'notes': notes,
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        self.data['crisis_outcomes'].append(entry)
-        self._save_data()
+        self._record(
+            'crisis_outcome',
+            crisis_id=crisis_id,
+            crisis_type=crisis_type,
+            outcome=outcome,
+            resources_used=resources_used,
+            response_time=response_time,
+            effectiveness_score=effectiveness_score,
+            notes=notes
+        )
         
         print(f"   ✓ Crisis outcome recorded: {crisis_id} - {outcome}")
     
+    def _apply_crisis_outcome(self, data: Dict, event: Dict):
+        data['crisis_outcomes'].append({
+            key: event[key] for key in
+            ('crisis_id', 'crisis_type', 'outcome', 'resources_used', 'response_time',
+             'effectiveness_score', 'notes', 'timestamp')
+        })
+    
     def get_crisis_statistics(self, crisis_type: str = None,
                              days: int = None) -> Dict:
         """
@@ -413,21 +495,29 @@ class MetricsTracker:
             performance_score: How well it performed (0-1)
             utilization_rate: How much it was utilized (0-1)
         """
-        if resource_id not in self.data['resource_performance']:
-            self.data['resource_performance'][resource_id] = {
+        self._record(
+            'resource_performance',
+            resource_id=resource_id,
+            task_id=task_id,
+            performance_score=performance_score,
+            utilization_rate=utilization_rate
+        )
+    
+    def _apply_resource_performance(self, data: Dict, event: Dict):
+        resource_id = event['resource_id']
+        if resource_id not in data['resource_performance']:
+            data['resource_performance'][resource_id] = {
                 'total_uses': 0,
-                'performance_scores': [],
+                'performance_stats': new_stats(),
                 'avg_performance': 0,
                 'last_used': None
             }
         
-        res_data = self.data['resource_performance'][resource_id]
+        res_data = data['resource_performance'][resource_id]
         res_data['total_uses'] += 1
-        res_data['performance_scores'].append(performance_score)
-        res_data['avg_performance'] = statistics.mean(res_data['performance_scores'])
-        res_data['last_used'] = datetime.now().isoformat()
-        
-        self._save_data()
+        add_sample(res_data['performance_stats'], event['performance_score'])
+        res_data['avg_performance'] = res_data['performance_stats']['mean']
+        res_data['last_used'] = event['timestamp']
     
     def get_resource_performance(self, resource_id: str) -> Dict:
         """Get performance data for a resource"""
@@ -445,6 +535,7 @@ class MetricsTracker:
             'resource_id': resource_id,
             'total_uses': res_data['total_uses'],
             'avg_performance': res_data['avg_performance'],
+            'performance': summary(res_data['performance_stats']),
             'last_used': res_data['last_used'],
             'status': 'active' if res_data['total_uses'] > 0 else 'unused'
         }
@@ -491,18 +582,8 @@ class MetricsTracker:
     
     def reset_metrics(self):
         """Reset all metrics (use with caution)"""
-        self.data = {
-            'volunteer_metrics': {},
-            'crisis_outcomes': [],
-            'resource_performance': {},
-            'response_times': [],
-            'task_results': [],
-            'metadata': {
-                'created_at': datetime.now().isoformat(),
-                'last_updated': None,
-                'total_tasks': 0,
-                'total_volunteers': 0
-            }
-        }
-        self._save_data()
+        with self._lock:
+            self.data = self._empty_data()
+            # The empty snapshot supersedes (and deletes) every logged event
+            self.store.reset(self.data)
         print("✓ Metrics reset")
\ No newline at end of file
@@ -0,0 +1,102 @@
+"""
+Streaming statistics for learning metrics
+
+A stats record is a plain dict (so it lives in the metrics snapshot):
+count, Welford running mean / sum of squared deviations, min, max and a
+fixed-size reservoir sample for percentiles. Adding a sample is O(1)
+time and memory, whatever the history length.
+
+Reservoir replacement is driven by a hash of the sample count instead
+of a random generator, so replaying the same events rebuilds the same
+reservoir.
+"""
+
+import math
+from typing import Dict, Iterable, Optional
+
+
+RESERVOIR_SIZE = 128
+
+_MASK64 = (1 << 64) - 1
+
+
+def new_stats() -> Dict:
+    return {
+        'count': 0,
+        'mean': 0.0,
+        'm2': 0.0,
+        'min': None,
+        'max': None,
+        'reservoir': []
+    }
+
+
+def _mix(n: int) -> int:
+    """splitmix64 of n: a well-spread deterministic 64-bit value"""
+    z = (n * 0x9E3779B97F4A7C15) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+def add_sample(stats: Dict, value: float, reservoir_size: int = RESERVOIR_SIZE):
+    """Fold one sample into `stats` (in place)"""
+    value = float(value)
+    stats['count'] += 1
+    n = stats['count']
+
+    # Welford
+    delta = value - stats['mean']
+    stats['mean'] += delta / n
+    stats['m2'] += delta * (value - stats['mean'])
+
+    stats['min'] = value if stats['min'] is None else min(stats['min'], value)
+    stats['max'] = value if stats['max'] is None else max(stats['max'], value)
+
+    # Reservoir (Algorithm R): the nth sample replaces a slot with p = size / n
+    reservoir = stats['reservoir']
+    if len(reservoir) < reservoir_size:
+        reservoir.append(value)
+    else:
+        slot = _mix(n) % n
+        if slot < reservoir_size:
+            reservoir[slot] = value
+
+
+def from_samples(values: Iterable[float]) -> Dict:
+    """Stats for existing samples (upgrading stored sample lists)"""
+    stats = new_stats()
+    for value in values:
+        add_sample(stats, value)
+    return stats
+
+
+def variance(stats: Dict) -> float:
+    """Sample variance (0 below two samples)"""
+    return stats['m2'] / (stats['count'] - 1) if stats['count'] > 1 else 0.0
+
+
+def percentile(stats: Dict, q: float) -> Optional[float]:
+    """q-th percentile (0-100) of the reservoir, linearly interpolated"""
+    values = sorted(stats['reservoir'])
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100
+    low = math.floor(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def summary(stats: Optional[Dict]) -> Dict:
+    """count, mean, stddev, min, max, p50 and p90 (zeros when empty)"""
+    if not stats or not stats['count']:
+        return {'count': 0, 'mean': 0.0, 'stddev': 0.0, 'min': None, 'max': None, 'p50': None, 'p90': None}
+    return {
+        'count': stats['count'],
+        'mean': stats['mean'],
+        'stddev': math.sqrt(variance(stats)),
+        'min': stats['min'],
+        'max': stats['max'],
+        'p50': percentile(stats, 50),
+        'p90': percentile(stats, 90)
+    }
@@ -0,0 +1,112 @@
+import json
+import multiprocessing
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from agents.learning.event_store import MetricsEventLog
+from agents.learning.metrics import MetricsTracker
+
+
+def initial_state():
+    return {'total': 0, 'seen': []}
+
+
+def apply(state, event):
+    state['total'] += event['value']
+    state['seen'].append(event['value'])
+
+
+def record(log, state, value):
+    event = {'value': value}
+    apply(state, event)
+    return log.append(event, state)
+
+
+def open_log(path, snapshot_every=1000):
+    log = MetricsEventLog(str(path), snapshot_every=snapshot_every)
+    return log, log.load(initial_state, apply)
+
+
+def test_replay_after_restart(tmp_path):
+    log, state = open_log(tmp_path / 'm.db', snapshot_every=4)
+    for value in range(1, 11):
+        record(log, state, value)
+    log.close()
+
+    reopened, replayed = open_log(tmp_path / 'm.db', snapshot_every=4)
+    assert replayed == state
+    assert reopened.seq == 10
+    # Two snapshots were taken; only the last two events remain to replay
+    assert reopened.get_statistics()['events_in_log'] == 2
+
+
+def test_seqs_stay_unique_after_compaction(tmp_path):
+    log, state = open_log(tmp_path / 'm.db', snapshot_every=3)
+    seqs = [record(log, state, 1) for _ in range(7)]
+    assert seqs == list(range(1, 8))
+
+
+def test_snapshot_catches_up_with_other_writers(tmp_path):
+    a, state_a = open_log(tmp_path / 'm.db')
+    b, state_b = open_log(tmp_path / 'm.db')
+    record(a, state_a, 1)
+    record(b, state_b, 10)
+    record(a, state_a, 2)
+
+    a.snapshot(state_a)
+    assert state_a['total'] == 13
+
+    # b's unseen events were compacted into a's snapshot: b rebuilds from it
+    record(b, state_b, 100)
+    b.snapshot(state_b)
+    assert state_b['total'] == 113
+    assert open_log(tmp_path / 'm.db')[1]['total'] == 113
+
+
+def _worker(path, count):
+    log, state = open_log(path, snapshot_every=7)
+    for _ in range(count):
+        record(log, state, 1)
+    log.close()
+
+
+def test_concurrent_processes_lose_no_events(tmp_path):
+    path = str(tmp_path / 'm.db')
+    open_log(path)[0].close()
+    workers = [multiprocessing.Process(target=_worker, args=(path, 50)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert open_log(path)[1]['total'] == 200
+
+
+def test_reset_discards_logged_events(tmp_path):
+    log, state = open_log(tmp_path / 'm.db')
+    record(log, state, 5)
+    log.reset(initial_state())
+    assert record(log, initial_state(), 1) == 2
+    assert open_log(tmp_path / 'm.db')[1]['total'] == 1
+
+
+def test_tracker_imports_legacy_json_once(tmp_path):
+    legacy = tmp_path / 'learning_metrics.json'
+    data = MetricsTracker._empty_data()
+    data.pop('response_time_stats')
+    data.pop('task_type_metrics')
+    data['response_times'] = [{'response_time': 4.0, 'task_type': 'rescue'},
+                              {'response_time': 6.0, 'task_type': 'rescue'}]
+    legacy.write_text(json.dumps(data))
+
+    tracker = MetricsTracker(str(legacy))
+    assert tracker.data['response_time_stats']['mean'] == 5.0
+    tracker.record_response_time('v1', 't1', 8.0, 'rescue')
+    tracker.store.close()
+
+    # Later edits to the legacy file are ignored; the log is the source now
+    legacy.write_text(json.dumps(MetricsTracker._empty_data()))
+    reloaded = MetricsTracker(str(legacy))
+    assert reloaded.data['response_time_stats']['count'] == 3
+    assert reloaded.data['task_type_metrics']['rescue']['response_time']['mean'] == 6.0
@@ -0,0 +1,126 @@
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from db import models
+
+logger = logging.getLogger(__name__)
+
+
+class AllocationQueue:
+    """
+    Verified crises waiting for batch allocation:
+    - TrustAgent.verify_alert submits the id of every verified alert and
+      returns; the crisis row may be committed by its caller afterwards
+    - A daemon worker collects ids for flush_interval seconds, then runs
+      one ResourceAgent.allocate_open_crises over those whose crisis
+      exists, so concurrent verified crises are allocated jointly
+    - Ids whose crisis never appears within max_wait seconds are dropped
+    """
+
+    def __init__(self, flush_interval: float = 1.0, max_wait: float = 60.0,
+                 session_factory: Optional[Callable] = None):
+        self.flush_interval = flush_interval
+        self.max_wait = max_wait
+        self._session_factory = session_factory
+        # crisis_id -> first submitted (monotonic)
+        self._pending: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._allocate_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self.stats = {"submitted": 0, "allocated_crises": 0, "assignments": 0, "expired": 0, "errors": 0}
+
+    # ---------- LIFECYCLE ----------
+
+    def start(self):
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stopping.clear()
+                self._worker = threading.Thread(target=self._run, name="allocation-queue", daemon=True)
+                self._worker.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker after one last allocation round"""
+        self._stopping.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+        self.flush()
+
+    # ---------- SUBMIT ----------
+
+    def submit(self, crisis_id: str):
+        """Queue a verified crisis for the next allocation round"""
+        if crisis_id is None:
+            return
+        with self._lock:
+            self._pending.setdefault(str(crisis_id), time.monotonic())
+            self.stats["submitted"] += 1
+        self.start()
+
+    def flush(self) -> Optional[Dict]:
+        """Allocate whatever is ready now, in the calling thread"""
+        try:
+            return self._allocate_pending()
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Queued allocation failed: {e}")
+            return None
+
+    # ---------- WORKER ----------
+
+    def _run(self):
+        while not self._stopping.wait(self.flush_interval):
+            self.flush()
+
+    def _session(self):
+        if self._session_factory is None:
+            from db.database import SessionLocal
+            self._session_factory = SessionLocal
+        return self._session_factory()
+
+    def _allocate_pending(self) -> Optional[Dict]:
+        with self._allocate_lock:
+            with self._lock:
+                ids: List[str] = list(self._pending)
+            if not ids:
+                return None
+
+            with self._session() as db:
+                ready = [row[0] for row in db.query(models.Crisis.id).filter(models.Crisis.id.in_(ids))]
+
+                now = time.monotonic()
+                with self._lock:
+                    for crisis_id in ready:
+                        self._pending.pop(crisis_id, None)
+                    expired = [i for i, t in self._pending.items() if now - t > self.max_wait]
+                    for crisis_id in expired:
+                        del self._pending[crisis_id]
+                    self.stats["expired"] += len(expired)
+                if expired:
+                    logger.warning(f"Dropped queued allocation for unknown crises {expired}")
+                if not ready:
+                    return None
+
+                from ..resource_agent import ResourceAgent
+                result = ResourceAgent(db).allocate_open_crises(ready)
+
+            self.stats["allocated_crises"] += len(result["crises"])
+            self.stats["assignments"] += len(result["assignments"])
+            return result
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            **self.stats,
+            "pending": pending,
+            "worker_alive": bool(self._worker and self._worker.is_alive())
+        }
+
+
+# Process-wide queue, fed by the trust agent
+allocation_queue = AllocationQueue()
@@ -0,0 +1,165 @@
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:
+    linear_sum_assignment = None
+
+
+class AssignmentSolver:
+    """
+    Global task x volunteer assignment:
+    - One vectorized score matrix for every task/candidate pair
+    - Solved jointly (Hungarian via scipy, greedy global fallback)
+    - Task slots and volunteer capacity, never double-booked
+    """
+
+    # Volunteer score weights (0-100); ResourceAgent.score_volunteer
+    # scores single pairs with the same constants
+    SKILL_EXACT = 40
+    SKILL_PARTIAL = 10
+    SKILL_NOT_REQUIRED = 30
+    # (max km, points), nearest band first
+    DISTANCE_BANDS = ((5.0, 30), (15.0, 20), (30.0, 10))
+    DISTANCE_FAR = 5
+    DISTANCE_UNKNOWN = 15
+    RELIABILITY_WEIGHT = 20
+    AVAILABILITY_POINTS = 10
+
+    def __init__(self, max_distance_km: float = 50.0, require_skill: bool = True):
+        self.max_distance_km = max_distance_km
+        # Strict skills keep the old behaviour: a skilled task only goes to
+        # volunteers with that skill
+        self.require_skill = require_skill
+
+    # ---------- SCORING ----------
+
+    def score_matrix(
+        self,
+        task_skills: Sequence[Optional[str]],
+        candidate_skills: Sequence[Iterable[str]],
+        distances: np.ndarray,
+        reliability: Sequence[float],
+        available: Sequence[bool]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (scores, feasible), both shaped (tasks, candidates)
+
+        `distances` is (candidates,) when every task shares a location, or
+        (tasks, candidates); NaN means the distance is unknown.
+        """
+        n_tasks, n_cands = len(task_skills), len(candidate_skills)
+        distances = np.broadcast_to(np.asarray(distances, dtype=np.float64), (n_tasks, n_cands))
+
+        # Skills: one membership vector per distinct required skill
+        skill_sets = [set(s or ()) for s in candidate_skills]
+        has_skill = np.zeros((n_tasks, n_cands), dtype=bool)
+        by_skill = {}
+        for i, skill in enumerate(task_skills):
+            if skill:
+                if skill not in by_skill:
+                    by_skill[skill] = np.fromiter((skill in s for s in skill_sets), dtype=bool, count=n_cands)
+                has_skill[i] = by_skill[skill]
+
+        needs_skill = np.array([bool(s) for s in task_skills], dtype=bool)[:, None]
+        skill_score = np.where(
+            needs_skill,
+            np.where(has_skill, self.SKILL_EXACT, self.SKILL_PARTIAL),
+            self.SKILL_NOT_REQUIRED
+        )
+
+        # Distance bands
+        known = ~np.isnan(distances)
+        conditions = [known & (distances <= limit) for limit, _ in self.DISTANCE_BANDS]
+        choices = [points for _, points in self.DISTANCE_BANDS]
+        distance_score = np.select(conditions, choices, default=self.DISTANCE_FAR)
+        distance_score = np.where(known, distance_score, self.DISTANCE_UNKNOWN)
+
+        reliability_score = np.asarray(reliability, dtype=np.float64) * self.RELIABILITY_WEIGHT
+        availability_score = np.where(np.asarray(available, dtype=bool), self.AVAILABILITY_POINTS, 0.0)
+
+        scores = skill_score + distance_score + reliability_score + availability_score
+
+        feasible = ~known | (distances <= self.max_distance_km)
+        if self.require_skill:
+            feasible &= ~needs_skill | has_skill
+
+        return scores, feasible
+
+    # ---------- SOLVING ----------
+
+    def solve(
+        self,
+        scores: np.ndarray,
+        feasible: np.ndarray,
+        task_priority: Sequence[float] = None,
+        task_slots: Sequence[int] = None,
+        candidate_capacity: Sequence[int] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        Conflict-free (task, candidate) pairs maximizing total weighted score
+
+        Each task takes up to task_slots[i] volunteers and each candidate up
+        to candidate_capacity[j] tasks (both default 1). Priority weights the
+        objective so urgent tasks win contested volunteers when there are
+        not enough to go round.
+        """
+        n_tasks, n_cands = scores.shape
+        if n_tasks == 0 or n_cands == 0:
+            return []
+
+        slots = np.ones(n_tasks, dtype=int) if task_slots is None else np.asarray(task_slots, dtype=int)
+        capacity = np.ones(n_cands, dtype=int) if candidate_capacity is None else np.asarray(candidate_capacity, dtype=int)
+        priority = np.ones(n_tasks) if task_priority is None else np.asarray(task_priority, dtype=np.float64)
+
+        # Priority 1-10 scales the objective by 1.1-2.0
+        weighted = scores * (1.0 + priority[:, None] / 10.0)
+
+        # Expand rows/columns so slots and capacity become plain 1:1 matching
+        rows = np.repeat(np.arange(n_tasks), np.clip(slots, 0, None))
+        cols = np.repeat(np.arange(n_cands), np.clip(capacity, 0, None))
+        if rows.size == 0 or cols.size == 0:
+            return []
+
+        profit = weighted[np.ix_(rows, cols)]
+        allowed = feasible[np.ix_(rows, cols)]
+
+        if linear_sum_assignment is not None:
+            pairs = self._solve_hungarian(profit, allowed)
+        else:
+            pairs = self._solve_greedy(profit, allowed)
+
+        # A task can't take the same volunteer twice through two slots
+        seen = set()
+        result = []
+        for r, c in pairs:
+            pair = (int(rows[r]), int(cols[c]))
+            if pair not in seen:
+                seen.add(pair)
+                result.append(pair)
+        return sorted(result)
+
+    def _solve_hungarian(self, profit: np.ndarray, allowed: np.ndarray) -> List[Tuple[int, int]]:
+        # Infeasible pairs get a cost far below any real score and are dropped
+        forbidden = -1e9
+        matrix = np.where(allowed, profit, forbidden)
+        row_idx, col_idx = linear_sum_assignment(matrix, maximize=True)
+        return [(r, c) for r, c in zip(row_idx, col_idx) if allowed[r, c]]
+
+    def _solve_greedy(self, profit: np.ndarray, allowed: np.ndarray) -> List[Tuple[int, int]]:
+        # Best remaining pair first; still conflict-free, not always optimal
+        order = np.argsort(np.where(allowed, profit, -np.inf), axis=None, kind="stable")[::-1]
+        used_rows, used_cols = set(), set()
+        pairs = []
+        for flat in order:
+            r, c = divmod(int(flat), profit.shape[1])
+            if not allowed[r, c]:
+                break
+            if r in used_rows or c in used_cols:
+                continue
+            used_rows.add(r)
+            used_cols.add(c)
+            pairs.append((r, c))
+        return pairs
@@ -1,60 +1,137 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+from collections import defaultdict
 from datetime import datetime
 
 
 class AvailabilityManager:
     """
-    Round-1 MVP:
+    Round-2:
     - Tracks availability of resources and volunteers
-    - Marks them allocated or released
-    - No time-based auto-release (Round-2 feature)
+    - Available ids are indexed per kind and type (resource type,
+      volunteer skill), so lookups cost O(result) not O(all items)
+    - mark_allocated / release_items keep the index current in O(1) per
+      item; allocations remember their items for release(allocation_id)
+    - No time-based auto-release
     """
 
+    ALL = "*"
+
+    COMPATIBLE_TYPES = {
+        "flood": ["boat", "rescue_vehicle", "ambulance"],
+        "fire": ["fire_truck", "ambulance", "rescue_vehicle"],
+        "medical": ["ambulance", "rescue_vehicle"],
+        "earthquake": ["rescue_vehicle", "ambulance", "shelter"],
+        "accident": ["ambulance", "rescue_vehicle"]
+    }
+    DEFAULT_TYPES = ["ambulance", "rescue_vehicle"]
+
     def __init__(self):
         self.allocated_items = {}
+        # allocation_id -> ids of the items it holds
+        self.allocations: Dict[str, List[str]] = {}
+        # kind -> item id -> item
+        self._items = {"resource": {}, "volunteer": {}}
+        # kind -> type/skill (or ALL) -> available item ids
+        self._available = {"resource": defaultdict(set), "volunteer": defaultdict(set)}
+        # kind -> the list last indexed (and its length)
+        self._tracked = {"resource": (None, 0), "volunteer": (None, 0)}
 
-    # ---------- AVAILABILITY CHECKS ----------
+    # ---------- INDEX ----------
+
+    def track(self, items: List[Dict], kind: str):
+        """
+        (Re)index a resource or volunteer list: O(n), once per list
+
+        Later availability changes must go through mark_allocated /
+        release_items for the index to see them.
+        """
+        self._items[kind] = {}
+        self._available[kind] = defaultdict(set)
+        for item in items:
+            self._items[kind][item["id"]] = item
+            if item.get("available", True):
+                self._index(kind, item)
+        self._tracked[kind] = (items, len(items))
+
+    def _sync(self, kind: str, items: Optional[List[Dict]]):
+        tracked, size = self._tracked[kind]
+        if items is not None and (items is not tracked or len(items) != size):
+            self.track(items, kind)
 
-    def get_available(self, resources: List[Dict], crisis_type: str) -> List[Dict]:
-        compatible_types = self._get_compatible_types(crisis_type)
+    def _keys(self, kind: str, item: Dict) -> List[str]:
+        if kind == "resource":
+            return [self.ALL, item.get("type")]
+        return [self.ALL, *(item.get("skills") or [])]
 
-        return [
-            r for r in resources
-            if r.get("available", True) and r.get("type") in compatible_types
-        ]
+    def _index(self, kind: str, item: Dict):
+        for key in self._keys(kind, item):
+            self._available[kind][key].add(item["id"])
 
-    def get_available_volunteers(self, volunteers: List[Dict]) -> List[Dict]:
-        return [
-            v for v in volunteers
-            if v.get("available", True)
-        ]
+    def _unindex(self, kind: str, item: Dict):
+        for key in self._keys(kind, item):
+            self._available[kind][key].discard(item["id"])
+
+    def _kind_of(self, item: Dict) -> str:
+        if item["id"] in self._items["resource"]:
+            return "resource"
+        if item["id"] in self._items["volunteer"]:
+            return "volunteer"
+        return "resource" if "type" in item else "volunteer"
+
+    def _collect(self, kind: str, keys: List[str]) -> List[Dict]:
+        # A resource has one type, so per-type sets never overlap
+        items = self._items[kind]
+        return [items[i] for key in dict.fromkeys(keys) for i in self._available[kind].get(key, ())]
+
+    # ---------- AVAILABILITY CHECKS ----------
+
+    def get_available(self, resources: Optional[List[Dict]], crisis_type: str) -> List[Dict]:
+        """
+        Available resources compatible with crisis_type, grouped by type
+        (None: the tracked list)
+        """
+        self._sync("resource", resources)
+        return self._collect("resource", self._get_compatible_types(crisis_type))
+
+    def get_available_volunteers(self, volunteers: Optional[List[Dict]], skill: Optional[str] = None) -> List[Dict]:
+        """Available volunteers, optionally only those with `skill`"""
+        self._sync("volunteer", volunteers)
+        return self._collect("volunteer", [skill or self.ALL])
 
     # ---------- ALLOCATION MANAGEMENT ----------
 
-    def mark_allocated(self, items: List[Dict]):
+    def mark_allocated(self, items: List[Dict], allocation_id: Optional[str] = None):
+        allocated_at = datetime.utcnow().isoformat()
         for item in items:
             item_id = item["id"]
             item["available"] = False
+            self._unindex(self._kind_of(item), item)
             self.allocated_items[item_id] = {
                 "item": item,
-                "allocated_at": datetime.utcnow().isoformat()
+                "allocated_at": allocated_at,
+                "allocation_id": allocation_id
             }
+        if allocation_id is not None:
+            self.allocations.setdefault(allocation_id, []).extend(item["id"] for item in items)
 
     def release_items(self, items: List[Dict]):
         for item in items:
             item_id = item["id"]
-            item["available"] = True
-            if item_id in self.allocated_items:
-                del self.allocated_items[item_id]
+            kind = self._kind_of(item)
+            # Re-index the tracked object (registering it if it is new)
+            tracked = self._items[kind].setdefault(item_id, item)
+            item["available"] = tracked["available"] = True
+            self._index(kind, tracked)
+            self.allocated_items.pop(item_id, None)
+
+    def release(self, allocation_id: str) -> List[Dict]:
+        """Release everything held by an allocation: O(items in it)"""
+        item_ids = self.allocations.pop(allocation_id, [])
+        items = [self.allocated_items[i]["item"] for i in item_ids if i in self.allocated_items]
+        self.release_items(items)
+        return items
 
     # ---------- HELPERS ----------
 
     def _get_compatible_types(self, crisis_type: str) -> List[str]:
-        compatibility_map = {
-            "flood": ["boat", "rescue_vehicle", "ambulance"],
-            "fire": ["fire_truck", "ambulance", "rescue_vehicle"],
-            "medical": ["ambulance", "rescue_vehicle"],
-            "earthquake": ["rescue_vehicle", "ambulance", "shelter"],
-            "accident": ["ambulance", "rescue_vehicle"]
-        }
-        return compatibility_map.get(crisis_type, ["ambulance", "rescue_vehicle"])
+        return self.COMPATIBLE_TYPES.get(crisis_type, self.DEFAULT_TYPES)
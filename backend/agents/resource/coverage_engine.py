@@ -0,0 +1,286 @@
+import base64
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+try:
+    from scipy.signal import fftconvolve
+except ImportError:
+    fftconvolve = None
+
+from core.availability import hour_of_week, next_hours_mask, covers
+from core.geo import EARTH_RADIUS_KM
+from db import models
+from db.volunteer_pool import VolunteerRecord, volunteer_pool
+from .geo_optimizer import GeoOptimizer
+
+
+class CoverageEngine:
+    """
+    Isochrone coverage heatmaps over a fixed district grid:
+    - Each cell counts the assets that can reach its centre within 10, 20
+      and 30 minutes (straight-line ETA, same floor rule as calc_eta)
+    - Assets are binned to cells and the count grid is convolved with one
+      disk stencil per threshold (FFT via scipy, stencil stamps without)
+    - Volunteer grids are cached per (skill, hour of week) and patched in
+      place from volunteer pool updates; resource grids expire after
+      resource_ttl seconds
+    """
+
+    # Dehradun district, south/north latitude and west/east longitude
+    BOUNDS = (29.95, 30.95, 77.55, 78.35)
+    CELL_DEG = 0.01
+    THRESHOLDS = (10, 20, 30)
+    VOLUNTEER_TYPE = "volunteer_car"
+
+    def __init__(self, bounds: Tuple[float, float, float, float] = BOUNDS, cell_deg: float = CELL_DEG,
+                 thresholds: Sequence[int] = THRESHOLDS, resource_ttl: float = 60.0,
+                 max_entries: int = 64, pool=volunteer_pool):
+        self.bounds = bounds
+        self.cell_deg = cell_deg
+        self.thresholds = tuple(thresholds)
+        self.resource_ttl = resource_ttl
+        self.max_entries = max_entries
+        self.pool = pool
+        # Coordinate parsing only; no road graph needed
+        self._geo = GeoOptimizer(road_network=False)
+
+        south, north, west, east = bounds
+        self.rows = int(math.ceil(round((north - south) / cell_deg, 6)))
+        self.cols = int(math.ceil(round((east - west) / cell_deg, 6)))
+        # Local km plane at the district's mid-latitude
+        km_per_deg = EARTH_RADIUS_KM * math.pi / 180
+        self.cell_km = (cell_deg * km_per_deg, cell_deg * km_per_deg * math.cos(math.radians((south + north) / 2)))
+
+        self._stencils: Dict[float, List[np.ndarray]] = {}
+        # (kind, filter, hour) -> {"grid", "version", "computed_at", "total", ...}
+        self._cache: "OrderedDict[tuple, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"computed": 0, "hits": 0, "patched": 0, "invalidated": 0}
+
+        pool.add_listener(self._on_pool_change)
+
+    # ---------- GRID ----------
+
+    def _stencils_for(self, speed_kmh: float) -> List[np.ndarray]:
+        """
+        One int32 disk per threshold: offsets whose centre-to-centre
+        distance is under (T + 1) minutes of travel, i.e. floor ETA <= T
+        """
+        stencils = self._stencils.get(speed_kmh)
+        if stencils is None:
+            stencils = []
+            for minutes in self.thresholds:
+                reach = (minutes + 1) * speed_kmh / 60
+                half_r = int(reach // self.cell_km[0])
+                half_c = int(reach // self.cell_km[1])
+                dy = np.arange(-half_r, half_r + 1)[:, None] * self.cell_km[0]
+                dx = np.arange(-half_c, half_c + 1)[None, :] * self.cell_km[1]
+                stencils.append((np.hypot(dy, dx) < reach).astype(np.int32))
+            self._stencils[speed_kmh] = stencils
+        return stencils
+
+    def _cells(self, lats: np.ndarray, lons: np.ndarray, pad: Tuple[int, int]) -> Tuple[np.ndarray, np.ndarray]:
+        """Cell indices in a grid padded by `pad`, only for points that can reach the district"""
+        south, _, west, _ = self.bounds
+        with np.errstate(invalid="ignore"):
+            rows = np.floor((lats - south) / self.cell_deg)
+            cols = np.floor((lons - west) / self.cell_deg)
+        keep = (
+            np.isfinite(rows) & np.isfinite(cols)
+            & (rows >= -pad[0]) & (rows < self.rows + pad[0])
+            & (cols >= -pad[1]) & (cols < self.cols + pad[1])
+        )
+        return rows[keep].astype(np.int64) + pad[0], cols[keep].astype(np.int64) + pad[1]
+
+    def _coverage(self, lats: np.ndarray, lons: np.ndarray, speed_kmh: float) -> np.ndarray:
+        """(len(thresholds), rows, cols) reachable-asset counts for one speed"""
+        stencils = self._stencils_for(speed_kmh)
+        pad = (stencils[-1].shape[0] // 2, stencils[-1].shape[1] // 2)
+        grid = np.zeros((len(self.thresholds), self.rows, self.cols), dtype=np.int32)
+
+        rows, cols = self._cells(np.asarray(lats, dtype=np.float64), np.asarray(lons, dtype=np.float64), pad)
+        if rows.size == 0:
+            return grid
+        shape = (self.rows + 2 * pad[0], self.cols + 2 * pad[1])
+        hist = np.bincount(rows * shape[1] + cols, minlength=shape[0] * shape[1]).reshape(shape)
+
+        if fftconvolve is not None:
+            for t, stencil in enumerate(stencils):
+                full = fftconvolve(hist.astype(np.float64), stencil.astype(np.float64), mode="same")
+                grid[t] = np.rint(full[pad[0]:pad[0] + self.rows, pad[1]:pad[1] + self.cols])
+        else:
+            for r, c in zip(*np.nonzero(hist)):
+                self._stamp(grid, r - pad[0], c - pad[1], int(hist[r, c]), stencils)
+        return grid
+
+    def _stamp(self, grid: np.ndarray, row: int, col: int, weight: int, stencils: List[np.ndarray]):
+        """Add weight x each stencil centred on (row, col), clipped to the grid"""
+        for t, stencil in enumerate(stencils):
+            half_r, half_c = stencil.shape[0] // 2, stencil.shape[1] // 2
+            r0, r1 = max(0, row - half_r), min(self.rows, row + half_r + 1)
+            c0, c1 = max(0, col - half_c), min(self.cols, col + half_c + 1)
+            if r0 < r1 and c0 < c1:
+                grid[t, r0:r1, c0:c1] += weight * stencil[
+                    r0 - row + half_r:r1 - row + half_r, c0 - col + half_c:c1 - col + half_c
+                ]
+
+    # ---------- VOLUNTEERS ----------
+
+    def volunteer_coverage(self, db: Session, skill: Optional[str] = None,
+                           available_for_hours: int = 1) -> Dict:
+        """Coverage of volunteers (with `skill`) available for the next hours"""
+        hour = hour_of_week()
+        key = ("volunteer", skill, hour, available_for_hours)
+        snapshot = self.pool.snapshot(db)
+
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry
+
+        rows = np.isfinite(snapshot.latitudes) & np.isfinite(snapshot.longitudes)
+        if available_for_hours:
+            rows &= covers(snapshot.availability_masks, next_hours_mask(available_for_hours))
+        if skill:
+            rows &= snapshot.has_skill(skill)
+
+        speed = GeoOptimizer.SPEEDS[self.VOLUNTEER_TYPE]
+        entry = {
+            "grid": self._coverage(snapshot.latitudes[rows], snapshot.longitudes[rows], speed),
+            "total": int(rows.sum()),
+            "version": snapshot.version,
+            "computed_at": time.time(),
+            "window": next_hours_mask(available_for_hours) if available_for_hours else 0
+        }
+        # A pool update landed mid-computation and was not patched in
+        return self._store(key, entry) if self.pool.version == snapshot.version else entry
+
+    def _counts(self, key: tuple, entry: Dict, record: Optional[VolunteerRecord]) -> bool:
+        _, skill, _, _ = key
+        return (
+            record is not None
+            and record.latitude is not None and record.longitude is not None
+            and (record.availability_mask & entry["window"]) == entry["window"]
+            and (not skill or skill in record.skills)
+        )
+
+    def _on_pool_change(self, changes: Optional[Dict[str, Tuple]]):
+        """
+        Pool listener: patch every cached volunteer grid by the stencils of
+        the moved / changed volunteers; a full rebuild drops them instead
+        """
+        with self._lock:
+            keys = [k for k in self._cache if k[0] == "volunteer"]
+            if changes is None:
+                for key in keys:
+                    del self._cache[key]
+                self.stats["invalidated"] += len(keys)
+                return
+
+            stencils = self._stencils_for(GeoOptimizer.SPEEDS[self.VOLUNTEER_TYPE])
+            for key in keys:
+                entry = self._cache[key]
+                grid = entry["grid"].copy()
+                for old, new in changes.values():
+                    for record, weight in ((old, -1), (new, 1)):
+                        if self._counts(key, entry, record):
+                            self._stamp_point(grid, record.latitude, record.longitude, weight, stencils)
+                            entry["total"] += weight
+                # Readers holding the old grid keep a consistent copy
+                entry["grid"] = grid
+                entry["version"] = self.pool.version
+            self.stats["patched"] += len(keys)
+
+    def _stamp_point(self, grid: np.ndarray, lat: float, lon: float, weight: int, stencils: List[np.ndarray]):
+        south, _, west, _ = self.bounds
+        self._stamp(grid, int(math.floor((lat - south) / self.cell_deg)),
+                    int(math.floor((lon - west) / self.cell_deg)), weight, stencils)
+
+    # ---------- RESOURCES ----------
+
+    def resource_coverage(self, db: Session, resource_type: Optional[str] = None) -> Dict:
+        """Coverage of available resources (of one type), each at its own speed"""
+        key = ("resource", resource_type, None, None)
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and time.time() - entry["computed_at"] < self.resource_ttl:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry
+
+        query = db.query(models.Resource.type, models.Resource.location).filter(models.Resource.available.is_(True))
+        if resource_type:
+            query = query.filter(models.Resource.type == resource_type)
+
+        by_type: Dict[str, List[Dict]] = {}
+        for res_type, location in query.all():
+            by_type.setdefault(res_type, []).append(location or {})
+
+        grid = np.zeros((len(self.thresholds), self.rows, self.cols), dtype=np.int32)
+        for res_type, locations in by_type.items():
+            lats, lons = self._geo._coords_arrays(locations)
+            grid += self._coverage(lats, lons, GeoOptimizer.SPEEDS.get(res_type, 40))
+
+        entry = {
+            "grid": grid,
+            "total": sum(len(locs) for locs in by_type.values()),
+            "version": None,
+            "computed_at": time.time()
+        }
+        return self._store(key, entry)
+
+    # ---------- CACHE / OUTPUT ----------
+
+    def _store(self, key: tuple, entry: Dict) -> Dict:
+        with self._lock:
+            self._cache[key] = entry
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+            self.stats["computed"] += 1
+        return entry
+
+    def encode(self, entry: Dict) -> Dict:
+        """
+        Compact heatmap payload: uint16 counts, shape (thresholds, rows,
+        cols), row-major from the south-west cell, base64 encoded
+        """
+        grid = entry["grid"]
+        data = np.clip(grid, 0, np.iinfo(np.uint16).max).astype("<u2")
+        south, north, west, east = self.bounds
+        return {
+            "bounds": {"south": south, "north": north, "west": west, "east": east},
+            "cell_deg": self.cell_deg,
+            "thresholds_min": list(self.thresholds),
+            "shape": list(data.shape),
+            "dtype": "uint16le",
+            "data": base64.b64encode(data.tobytes()).decode(),
+            "max": [int(m) for m in grid.reshape(len(self.thresholds), -1).max(axis=1)],
+            "total": entry["total"],
+            "version": entry["version"],
+            "computed_at": entry["computed_at"]
+        }
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def get_statistics(self) -> Dict:
+        return {
+            **self.stats,
+            "cached": len(self._cache),
+            "grid": [self.rows, self.cols],
+            "engine": "fft" if fftconvolve is not None else "stencil"
+        }
+
+
+# Process-wide engine, patched by the shared volunteer pool
+coverage_engine = CoverageEngine()
@@ -0,0 +1,200 @@
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from db.models import PerformanceMetric
+from ws.events import EventType, build_event
+
+logger = logging.getLogger(__name__)
+
+
+class DispatchQueue:
+    """
+    In-process queue for assignment side effects:
+    - Allocation publishes events after its single commit and returns
+    - A daemon worker drains events in batches (batch_size, or whatever
+      arrived within flush_interval seconds)
+    - Per batch: one bulk metrics insert per database and one WebSocket
+      broadcast (volunteers have no Telegram chat on record, so there is
+      no per-assignee Telegram message)
+    """
+
+    def __init__(self, batch_size: int = 50, flush_interval: float = 0.5, max_pending: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Dict]" = queue.Queue(maxsize=max_pending)
+        self._dispatch_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._loop = None
+        self._broadcaster: Optional[Callable] = None
+        self.stats = {"published": 0, "dispatched": 0, "batches": 0, "dropped": 0, "errors": 0}
+
+    # ---------- LIFECYCLE ----------
+
+    def start(self, loop=None, broadcaster: Optional[Callable] = None):
+        """
+        Start the worker; `loop` and `broadcaster` (an async
+        broadcast(message, role)) enable WebSocket sends from the worker
+        """
+        if loop is not None:
+            self._loop = loop
+        if broadcaster is not None:
+            self._broadcaster = broadcaster
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._stopping.clear()
+                self._worker = threading.Thread(target=self._run, name="dispatch-queue", daemon=True)
+                self._worker.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker, dispatching whatever is still queued"""
+        self._stopping.set()
+        if self._worker is not None:
+            self._worker.join(timeout)
+            self._worker = None
+        self.flush()
+
+    # ---------- PUBLISH ----------
+
+    def publish(self, db: Session, assignments: List[Dict], crises: Dict[str, object]):
+        """
+        Queue assignment events (call after they are committed)
+
+        `crises` maps crisis_id to the crisis row; metrics are written to
+        the same database as `db`.
+        """
+        bind = db.get_bind() if db is not None else None
+        for assignment in assignments:
+            crisis = crises.get(assignment["crisis_id"])
+            event = {
+                "bind": bind,
+                "assignment": assignment,
+                "crisis_title": getattr(crisis, "title", None),
+                "published_at": time.time()
+            }
+            try:
+                self._queue.put_nowait(event)
+                self.stats["published"] += 1
+            except queue.Full:
+                self.stats["dropped"] += 1
+                logger.warning(f"Dispatch queue full, dropped event for task {assignment['task_id']}")
+
+        if assignments:
+            self.start()
+
+    def flush(self):
+        """Dispatch everything queued now, in the calling thread"""
+        while True:
+            batch = self._drain(block=False)
+            if not batch:
+                break
+            self._dispatch(batch)
+        # Wait out a batch the worker may still be collecting or sending
+        self._queue.join()
+
+    # ---------- WORKER ----------
+
+    def _run(self):
+        while not self._stopping.is_set():
+            batch = self._drain(block=True)
+            if batch:
+                self._dispatch(batch)
+
+    def _drain(self, block: bool) -> List[Dict]:
+        """Up to batch_size events; when blocking, waits flush_interval for stragglers"""
+        batch = []
+        try:
+            batch.append(self._queue.get(timeout=self.flush_interval) if block else self._queue.get_nowait())
+        except queue.Empty:
+            return batch
+
+        deadline = time.monotonic() + (self.flush_interval if block else 0)
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _dispatch(self, batch: List[Dict]):
+        with self._dispatch_lock:
+            for step in (self._write_metrics, self._send_websocket):
+                try:
+                    step(batch)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.warning(f"Dispatch {step.__name__} failed: {e}")
+            self.stats["dispatched"] += len(batch)
+            self.stats["batches"] += 1
+        for _ in batch:
+            self._queue.task_done()
+
+    def _write_metrics(self, batch: List[Dict]):
+        """One bulk insert + commit per database"""
+        by_bind = {}
+        for event in batch:
+            if event["bind"] is not None:
+                by_bind.setdefault(event["bind"], []).append(event["assignment"])
+
+        for bind, assignments in by_bind.items():
+            with Session(bind=bind) as db:
+                db.add_all([
+                    PerformanceMetric(
+                        entity_type="task",
+                        entity_id=a["task_id"],
+                        metric_type="assignment_score",
+                        metric_value=a["score"],
+                        crisis_id=a["crisis_id"],
+                        task_id=a["task_id"],
+                        context_data=a["breakdown"]
+                    )
+                    for a in assignments
+                ])
+                db.commit()
+
+    def _send_websocket(self, batch: List[Dict]):
+        """One broadcast to volunteer dashboards on the app's event loop"""
+        if self._broadcaster is None or self._loop is None or self._loop.is_closed():
+            return
+        message = json.dumps(build_event(
+            event_type=EventType.TASK_ASSIGNED,
+            payload={
+                "assignments": [self._summary(event) for event in batch],
+                "timestamp": datetime.utcnow().isoformat()
+            },
+            target="volunteer"
+        ))
+        asyncio.run_coroutine_threadsafe(self._broadcaster(message, "volunteer"), self._loop)
+
+    @staticmethod
+    def _summary(event: Dict) -> Dict:
+        a = event["assignment"]
+        return {
+            "task_id": a["task_id"],
+            "volunteer_id": a["volunteer_id"],
+            "volunteer": a["volunteer_name"],
+            "task": a["task_title"],
+            "crisis": event["crisis_title"],
+            "eta": a["eta_minutes"]
+        }
+
+    def get_statistics(self) -> Dict:
+        return {
+            **self.stats,
+            "pending": self._queue.qsize(),
+            "worker_alive": bool(self._worker and self._worker.is_alive())
+        }
+
+
+# Process-wide queue; main.py starts it with the app's event loop
+dispatch_queue = DispatchQueue()
@@ -1,7 +1,68 @@
 import math
-from typing import List, Dict, Optional
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
+import numpy as np
+
+from core.geo import haversine_matrix
+from .road_network import RoadNetwork, get_road_network
+
+
+class DistanceCache:
+    """
+    Bounded LRU for point-to-point distances
+
+    Keys are coordinate tuples quantized to `precision` decimals (5 is
+    ~1 m), so nearby repeats hit and key building stays cheap.
+    """
+
+    def __init__(self, maxsize: int = 10000, precision: int = 5):
+        self.maxsize = maxsize
+        self.precision = precision
+        self._data: "OrderedDict[Tuple[float, float, float, float], float]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def key(self, lat1: float, lon1: float, lat2: float, lon2: float) -> Tuple[float, float, float, float]:
+        p = self.precision
+        return (round(lat1, p), round(lon1, p), round(lat2, p), round(lon2, p))
+
+    def get(self, key) -> Optional[float]:
+        value = self._data.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value: float):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = self.evictions = 0
+
+    def get_statistics(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0
+        }
+
 
 class GeoOptimizer:
     
@@ -23,9 +84,17 @@ class GeoOptimizer:
         "late": 1.2
     }
 
-    def __init__(self, db=None):
+    # Distance reported for resources without usable coordinates
+    UNKNOWN_DIST = 9999.0
+
+    # Road-graph times are for a car; other types scale by speed relative to it
+    ROAD_REFERENCE_TYPE = "volunteer_car"
+
+    def __init__(self, db=None, cache_size: int = 10000, road_network: RoadNetwork = None):
         self.db = db
-        self.cache = {}
+        self.cache = DistanceCache(maxsize=cache_size)
+        # Offline road graph when one is installed; straight-line ETAs otherwise
+        self.road_network = road_network if road_network is not None else get_road_network()
 
     def _safe_coords(self, loc: Dict) -> Optional[Dict]:
         if not loc:
@@ -47,16 +116,18 @@ class GeoOptimizer:
         p2 = self._safe_coords(loc2)
 
         if not p1 or not p2:
-            return 9999.0
+            return self.UNKNOWN_DIST
 
-        cache_key = f"{p1['lat']},{p1['lon']}-{p2['lat']},{p2['lon']}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        cache_key = self.cache.key(p1["lat"], p1["lon"], p2["lat"], p2["lon"])
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
 
-        lat1 = math.radians(p1["lat"])
-        lon1 = math.radians(p1["lon"])
-        lat2 = math.radians(p2["lat"])
-        lon2 = math.radians(p2["lon"])
+        # Computed from the quantized key so every hit returns the same value
+        lat1 = math.radians(cache_key[0])
+        lon1 = math.radians(cache_key[1])
+        lat2 = math.radians(cache_key[2])
+        lon2 = math.radians(cache_key[3])
 
         dlat = lat2 - lat1
         dlon = lon2 - lon1
@@ -65,9 +136,76 @@ class GeoOptimizer:
         c = 2 * math.asin(math.sqrt(a))
         dist = round(self.EARTH_R * c, 2)
         
-        self.cache[cache_key] = dist
+        self.cache.put(cache_key, dist)
         return dist
 
+    # ---------- BATCH (NumPy) ----------
+
+    def _coords_arrays(self, locs: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+        """(lats, lons) arrays; NaN where a location has no usable coordinates"""
+        coords = [self._safe_coords(loc) for loc in locs]
+        lats = np.array([c["lat"] if c else np.nan for c in coords], dtype=np.float64)
+        lons = np.array([c["lon"] if c else np.nan for c in coords], dtype=np.float64)
+        return lats, lons
+
+    def distance_matrix(self, origins: List[Dict], destinations: List[Dict]) -> np.ndarray:
+        """
+        Distances (km, 2 dp) for every origin x destination pair in one
+        broadcast; missing coordinates give UNKNOWN_DIST like haversine_distance
+        """
+        lats1, lons1 = self._coords_arrays(origins)
+        lats2, lons2 = self._coords_arrays(destinations)
+        dist = np.round(haversine_matrix(lats1, lons1, lats2, lons2), 2)
+        return np.where(np.isnan(dist), self.UNKNOWN_DIST, dist)
+
+    def eta_matrix(self, distances: np.ndarray, res_types: List[str], traffic: str = "normal") -> np.ndarray:
+        """
+        calc_eta over a (resources x destinations) distance matrix, with one
+        resource type per row
+        """
+        distances = np.asarray(distances, dtype=np.float64)
+        traffic_factor = self.TRAFFIC_MULT.get(traffic, 1.0)
+        speeds = np.array([self.SPEEDS.get(t, 40) for t in res_types], dtype=np.float64) * traffic_factor
+
+        eta = np.floor(distances / speeds.reshape(-1, *([1] * (distances.ndim - 1))) * 60)
+        return np.where(distances <= 0, 1, np.maximum(1, eta)).astype(int)
+
+    def road_eta_matrix(self, resources: List[Dict], crises: List[Dict], traffic: str = "normal") -> np.ndarray:
+        """
+        Road-network ETAs (minutes) for every resource x crisis pair; NaN
+        where there is no graph or a point is off the network
+        """
+        result = np.full((len(resources), len(crises)), np.nan)
+        if self.road_network is None or not resources:
+            return result
+
+        lats, lons = self._coords_arrays([r.get("location", {}) for r in resources])
+        reference = self.SPEEDS[self.ROAD_REFERENCE_TYPE]
+        scale = np.array([
+            reference / self.SPEEDS.get(r.get("type", "unknown"), reference) for r in resources
+        ]) / self.TRAFFIC_MULT.get(traffic, 1.0)
+
+        for j, crisis in enumerate(crises):
+            loc = self._safe_coords(crisis)
+            if loc:
+                # Many-to-one: one reverse Dijkstra from the crisis, cached per node
+                result[:, j] = self.road_network.travel_times_to(loc["lat"], loc["lon"], lats, lons) * scale
+        return result
+
+    def resource_crisis_matrices(self, resources: List[Dict], crises: List[Dict],
+                                 traffic: str = None) -> Dict[str, np.ndarray]:
+        """Full resources x crises distance and ETA matrices (road ETAs when available)"""
+        traffic = traffic or self.get_traffic_condition()
+        distances = self.distance_matrix([r.get("location", {}) for r in resources], crises)
+        etas = self.eta_matrix(distances, [r.get("type", "unknown") for r in resources], traffic)
+        if self.road_network is not None:
+            road = self.road_eta_matrix(resources, crises, traffic)
+            etas = np.where(np.isnan(road), etas, np.maximum(1, np.floor(np.nan_to_num(road)))).astype(int)
+        return {"distance_km": distances, "eta_minutes": etas}
+
+    def get_cache_stats(self) -> Dict:
+        return self.cache.get_statistics()
+
     def calc_eta(self, dist_km: float, res_type: str, traffic: str = "normal") -> int:
         if dist_km <= 0:
             return 1
@@ -97,13 +235,14 @@ class GeoOptimizer:
 
         traffic = self.get_traffic_condition()
         scored = []
+        if not resources:
+            return []
 
-        for r in resources:
-            r_loc = self._safe_coords(r.get("location", {}))
-            
-            dist = self.haversine_distance(r_loc or {}, crisis_loc)
-            eta = self.calc_eta(dist, r.get("type", "unknown"), traffic)
-            
+        matrices = self.resource_crisis_matrices(resources, [crisis_loc], traffic)
+        dists = matrices["distance_km"][:, 0].tolist()
+        etas = matrices["eta_minutes"][:, 0].tolist()
+
+        for r, dist, eta in zip(resources, dists, etas):
             reliability = self._get_reliability(r)
             score = self._calc_score(dist, eta, crisis_pri, reliability)
 
@@ -167,14 +306,13 @@ class GeoOptimizer:
         if not resources or not center:
             return 0.0
 
-        max_dist = 0.0
-        for r in resources:
-            r_loc = self._safe_coords(r.get("location", {}))
-            if r_loc:
-                d = self.haversine_distance(r_loc, center)
-                max_dist = max(max_dist, d)
-        
-        return round(max_dist, 2)
+        lats, lons = self._coords_arrays([r.get("location", {}) for r in resources])
+        known = ~np.isnan(lats)
+        if not known.any():
+            return 0.0
+
+        dists = haversine_matrix(lats[known], lons[known], [center["lat"]], [center["lon"]])
+        return round(float(np.round(dists, 2).max()), 2)
 
     def find_staging_point(self, crisis_locs: List[Dict]) -> Dict:
         valid = [self._safe_coords(loc) for loc in crisis_locs]
@@ -193,14 +331,13 @@ class GeoOptimizer:
         if not loc:
             return resources[:count]
 
-        with_dist = []
-        for r in resources:
-            r_loc = self._safe_coords(r.get("location", {}))
-            dist = self.haversine_distance(r_loc or {}, loc)
-            with_dist.append({**r, "distance_km": dist})
+        if not resources:
+            return []
 
-        with_dist.sort(key=lambda x: x["distance_km"])
-        return with_dist[:count]
+        dists = self.distance_matrix([r.get("location", {}) for r in resources], [loc])[:, 0]
+        # Stable, so ties keep input order as the old sort did
+        nearest = np.argsort(dists, kind="stable")[:count]
+        return [{**resources[i], "distance_km": float(dists[i])} for i in nearest]
 
     def estimate_response_coverage(self, volunteers: List[Dict], crisis_loc: Dict, time_limit: int = 30) -> Dict:
         crisis_loc = self._safe_coords(crisis_loc)
@@ -208,16 +345,11 @@ class GeoOptimizer:
             return {"reachable": 0, "total": len(volunteers), "coverage": 0.0}
 
         reachable = 0
-        for v in volunteers:
-            v_loc = self._safe_coords(v.get("location", {}))
-            if not v_loc:
-                continue
-            
-            dist = self.haversine_distance(v_loc, crisis_loc)
-            eta = self.calc_eta(dist, "volunteer_car")
-            
-            if eta <= time_limit:
-                reachable += 1
+        if volunteers:
+            # Volunteers without a location get UNKNOWN_DIST and never count
+            cars = [{"location": v.get("location", {}), "type": "volunteer_car"} for v in volunteers]
+            etas = self.resource_crisis_matrices(cars, [crisis_loc], "normal")["eta_minutes"]
+            reachable = int((etas <= time_limit).sum())
 
         coverage = reachable / len(volunteers) if volunteers else 0.0
         
@@ -228,7 +360,18 @@ class GeoOptimizer:
             "time_limit_mins": time_limit
         }
 
-    def suggest_deployment_zones(self, crises: List[Dict], num_zones: int = 3) -> List[Dict]:
+    def suggest_deployment_zones(self, crises: List[Dict], num_zones: int = 3, weighted: bool = False,
+                                 max_iter: int = 50, seed: int = 0) -> List[Dict]:
+        """
+        Staging zones from k-means++ over crisis locations
+
+        Points are projected to a local km plane (equirectangular around the
+        mean latitude), which keeps distances faithful at city scale. With
+        `weighted`, each crisis counts by its priority ("priority" or
+        "calculated_priority", default 1), pulling staging points towards
+        the urgent incidents. Lloyd iterations stop on convergence or after
+        `max_iter`.
+        """
         valid_crises = [c for c in crises if self._safe_coords(c)]
         
         if not valid_crises:
@@ -239,22 +382,97 @@ class GeoOptimizer:
                 {
                     "zone_id": i,
                     "center": self._safe_coords(c),
-                    "crisis_ids": [c.get("id")]
+                    "crisis_ids": [c.get("id")],
+                    "crisis_count": 1,
+                    "radius_km": 0.0
                 }
                 for i, c in enumerate(valid_crises)
             ]
 
+        lats, lons = self._coords_arrays(valid_crises)
+        weights = None
+        if weighted:
+            weights = np.array([
+                float(c.get("priority") or c.get("calculated_priority") or 1) for c in valid_crises
+            ])
+
+        # Local tangent plane in km
+        lat0 = math.radians(float(lats.mean()))
+        points = np.column_stack([
+            np.radians(lons) * math.cos(lat0) * self.EARTH_R,
+            np.radians(lats) * self.EARTH_R
+        ])
+
+        centers, labels = kmeans_plus_plus(points, num_zones, weights, max_iter, np.random.default_rng(seed))
+
+        center_lats = np.degrees(centers[:, 1] / self.EARTH_R)
+        center_lons = np.degrees(centers[:, 0] / (math.cos(lat0) * self.EARTH_R))
+        radii = np.zeros(num_zones)
+        np.maximum.at(radii, labels, np.linalg.norm(points - centers[labels], axis=1))
+
         zones = []
         for i in range(num_zones):
-            subset = valid_crises[i::num_zones]
-            center = self.find_staging_point([c for c in subset])
-            crisis_ids = [c.get("id") for c in subset]
-            
+            members = np.flatnonzero(labels == i)
+            if members.size == 0:
+                continue
+            crisis_ids = [valid_crises[j].get("id") for j in members]
             zones.append({
-                "zone_id": i,
-                "center": center,
+                "zone_id": len(zones),
+                "center": {"lat": round(float(center_lats[i]), 6), "lon": round(float(center_lons[i]), 6)},
                 "crisis_ids": crisis_ids,
-                "crisis_count": len(crisis_ids)
+                "crisis_count": len(crisis_ids),
+                "radius_km": round(float(radii[i]), 2)
             })
 
-        return zones
\ No newline at end of file
+        return zones
+
+
+def kmeans_plus_plus(points: np.ndarray, k: int, weights: Optional[np.ndarray] = None,
+                     max_iter: int = 50, rng: np.random.Generator = None,
+                     tol: float = 1e-4) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Weighted k-means with k-means++ seeding on (n, 2) planar points
+
+    Returns (centers (k, 2), labels (n,)). Every step is a NumPy pass over
+    an (n, k) distance matrix, so thousands of points take milliseconds.
+    """
+    rng = rng or np.random.default_rng()
+    n = len(points)
+    weights = np.ones(n) if weights is None else np.asarray(weights, dtype=np.float64)
+
+    # Seeding: first center by weight, then proportional to weight x D^2
+    centers = np.empty((k, points.shape[1]))
+    centers[0] = points[rng.choice(n, p=weights / weights.sum())]
+    closest = ((points - centers[0]) ** 2).sum(axis=1)
+    for i in range(1, k):
+        probs = weights * closest
+        total = probs.sum()
+        idx = rng.choice(n, p=probs / total) if total > 0 else rng.integers(n)
+        centers[i] = points[idx]
+        closest = np.minimum(closest, ((points - centers[i]) ** 2).sum(axis=1))
+
+    labels = np.zeros(n, dtype=int)
+    for _ in range(max_iter):
+        dist2 = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2)
+        labels = dist2.argmin(axis=1)
+
+        totals = np.bincount(labels, weights=weights, minlength=k)
+        new_centers = np.column_stack([
+            np.bincount(labels, weights=weights * points[:, d], minlength=k)
+            for d in range(points.shape[1])
+        ])
+        empty = totals == 0
+        new_centers[~empty] /= totals[~empty, None]
+        # An emptied cluster restarts at the point worst served by the others
+        for i in np.flatnonzero(empty):
+            worst = dist2[np.arange(n), labels].argmax()
+            new_centers[i] = points[worst]
+            dist2[worst] = 0
+
+        shift = np.abs(new_centers - centers).max()
+        centers = new_centers
+        if shift < tol:
+            break
+
+    labels = ((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2).argmin(axis=1)
+    return centers, labels
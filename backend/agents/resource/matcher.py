@@ -1,17 +1,82 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+from collections import OrderedDict
 from datetime import datetime
+import json
+import logging
+import os
+import threading
 import uuid
 
+logger = logging.getLogger(__name__)
+
+DEFAULT_HISTORY_PATH = os.path.join(
+    os.path.dirname(__file__), '..', '..', 'data', 'allocation_history.jsonl'
+)
+
 
 class ResourceMatcher:
     """
-    Round-1 MVP:
+    Round-2:
     - Bundles matched resources and volunteers into a single allocation
-    - Keeps allocation logic simple and demo-safe
+    - Allocations are kept in an id-keyed dict (O(1) lookup), bounded to
+      the newest max_history
+    - History is persisted as an append-only JSON-lines file, loaded on
+      first use and compacted once it holds twice max_history records
     """
 
-    def __init__(self):
-        self.allocation_history = []
+    def __init__(self, history_path: str = None, max_history: int = 1000):
+        self.history_path = history_path or DEFAULT_HISTORY_PATH
+        self.max_history = max_history
+        self._allocations: Optional["OrderedDict[str, Dict]"] = None
+        self._records_on_disk = 0
+        self._lock = threading.Lock()
+
+    # ---------- HISTORY ----------
+
+    @property
+    def allocation_history(self) -> List[Dict]:
+        """Retained allocations, oldest first"""
+        with self._lock:
+            return list(self._history().values())
+
+    def _history(self) -> "OrderedDict[str, Dict]":
+        # Callers hold self._lock
+        if self._allocations is None:
+            self._allocations = OrderedDict()
+            if os.path.exists(self.history_path):
+                try:
+                    with open(self.history_path, 'r') as f:
+                        for line in f:
+                            if line.strip():
+                                allocation = json.loads(line)
+                                self._allocations[allocation["allocation_id"]] = allocation
+                                self._records_on_disk += 1
+                except Exception as e:
+                    logger.warning(f"Failed to load allocation history: {e}")
+                self._evict()
+        return self._allocations
+
+    def _evict(self):
+        while len(self._allocations) > self.max_history:
+            self._allocations.popitem(last=False)
+
+    def _persist(self, allocation: Dict):
+        """Append one record; rewrite the file when stale records pile up"""
+        try:
+            os.makedirs(os.path.dirname(self.history_path), exist_ok=True)
+            if self._records_on_disk >= 2 * self.max_history:
+                tmp_path = f"{self.history_path}.tmp"
+                with open(tmp_path, 'w') as f:
+                    for record in self._allocations.values():
+                        f.write(json.dumps(record, default=str) + "\n")
+                os.replace(tmp_path, self.history_path)
+                self._records_on_disk = len(self._allocations)
+            else:
+                with open(self.history_path, 'a') as f:
+                    f.write(json.dumps(allocation, default=str) + "\n")
+                self._records_on_disk += 1
+        except Exception as e:
+            logger.warning(f"Failed to save allocation history: {e}")
 
     def create_allocation(
         self,
@@ -33,7 +98,10 @@ class ResourceMatcher:
             "status": "allocated"
         }
 
-        self.allocation_history.append(allocation)
+        with self._lock:
+            self._history()[allocation_id] = allocation
+            self._evict()
+            self._persist(allocation)
         return allocation
 
     # ---------- FORMATTERS ----------
@@ -71,10 +139,18 @@ class ResourceMatcher:
 
         return min(r.get("eta_minutes", 999) for r in resources)
 
-    # ---------- OPTIONAL (ROUND-2) ----------
+    # ---------- LOOKUP ----------
 
     def get_allocation_by_id(self, allocation_id: str) -> Dict | None:
-        for allocation in self.allocation_history:
-            if allocation["allocation_id"] == allocation_id:
-                return allocation
-        return None
+        with self._lock:
+            return self._history().get(allocation_id)
+
+    def mark_released(self, allocation_id: str) -> Dict | None:
+        """Set an allocation's status to released (persisted)"""
+        with self._lock:
+            allocation = self._history().get(allocation_id)
+            if allocation is not None:
+                allocation["status"] = "released"
+                allocation["released_at"] = datetime.utcnow().isoformat()
+                self._persist(allocation)
+            return allocation
@@ -0,0 +1,120 @@
+import heapq
+import itertools
+import math
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from core.geo import bounding_box, haversine_distance
+
+
+class PreemptionIndex:
+    """
+    Index of deployed assets for preemption lookups:
+    - Bucketed by geocell (GEOCELL_DEG squares), per asset kind
+    - Each bucket is a min-heap on current allocation priority
+    - Updates are lazy: a re-added asset leaves a stale heap entry that
+      queries skip and compaction drops
+    """
+
+    GEOCELL_DEG = 0.1  # ~11 km
+
+    def __init__(self):
+        # (kind, cell) -> heap of (priority, seq, asset_id)
+        self._buckets: Dict[Tuple[str, Tuple[int, int]], List[Tuple[float, int, str]]] = {}
+        # (kind, asset_id) -> (priority, seq, cell, lat, lon, asset)
+        self._entries: Dict[Tuple[str, str], Tuple[float, int, Tuple[int, int], float, float, Dict]] = {}
+        self._seq = itertools.count()
+        self._stale = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return (math.floor(lat / self.GEOCELL_DEG), math.floor(lon / self.GEOCELL_DEG))
+
+    # ---------- WRITES ----------
+
+    def add(self, asset: Dict, kind: str, lat: float, lon: float, priority: float):
+        """Index (or re-index) a deployed asset: O(log n)"""
+        key = (kind, asset["id"])
+        if key in self._entries:
+            self._stale += 1
+        seq = next(self._seq)
+        cell = self._cell(lat, lon)
+        self._entries[key] = (priority, seq, cell, lat, lon, asset)
+        heapq.heappush(self._buckets.setdefault((kind, cell), []), (priority, seq, asset["id"]))
+        self._maybe_compact()
+
+    def remove(self, kind: str, asset_id: str):
+        """Drop an asset (released or freed): O(1), heap entry goes stale"""
+        if self._entries.pop((kind, asset_id), None) is not None:
+            self._stale += 1
+            self._maybe_compact()
+
+    def get(self, kind: str, asset_id: str) -> Optional[Tuple[float, float, float]]:
+        """(priority, lat, lon) as indexed, or None"""
+        entry = self._entries.get((kind, asset_id))
+        return None if entry is None else (entry[0], entry[3], entry[4])
+
+    def asset(self, kind: str, asset_id: str) -> Optional[Dict]:
+        """The indexed asset dict, or None"""
+        entry = self._entries.get((kind, asset_id))
+        return None if entry is None else entry[5]
+
+    def _is_live(self, kind: str, seq: int, asset_id: str) -> bool:
+        entry = self._entries.get((kind, asset_id))
+        return entry is not None and entry[1] == seq
+
+    def _maybe_compact(self):
+        # Rebuild once stale entries outnumber live ones
+        if self._stale <= max(64, len(self._entries)):
+            return
+        buckets = {}
+        for (kind, asset_id), (priority, seq, cell, _, _, _) in self._entries.items():
+            buckets.setdefault((kind, cell), []).append((priority, seq, asset_id))
+        for heap in buckets.values():
+            heapq.heapify(heap)
+        self._buckets = buckets
+        self._stale = 0
+
+    # ---------- QUERIES ----------
+
+    def candidates(
+        self,
+        kind: str,
+        lat: float,
+        lon: float,
+        max_distance_km: float,
+        below_priority: float
+    ) -> Iterator[Tuple[Dict, float, float]]:
+        """
+        Deployed assets of `kind` within max_distance_km whose current
+        priority is below `below_priority`, lowest priority first
+
+        Yields (asset, current_priority, distance_km). Heaps are walked
+        without popping (a side heap of positions), so each candidate costs
+        O(log n) and the index is not modified.
+        """
+        min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, max_distance_km)
+        lo, hi = self._cell(min_lat, min_lon), self._cell(max_lat, max_lon)
+
+        frontier = []
+        for row in range(lo[0], hi[0] + 1):
+            for col in range(lo[1], hi[1] + 1):
+                heap = self._buckets.get((kind, (row, col)))
+                if heap and heap[0][0] < below_priority:
+                    frontier.append((heap[0][0], heap[0][1], id(heap), heap, 0))
+        heapq.heapify(frontier)
+
+        while frontier:
+            priority, seq, _, heap, pos = heapq.heappop(frontier)
+            for child in (2 * pos + 1, 2 * pos + 2):
+                if child < len(heap) and heap[child][0] < below_priority:
+                    heapq.heappush(frontier, (heap[child][0], heap[child][1], id(heap), heap, child))
+
+            asset_id = heap[pos][2]
+            if not self._is_live(kind, seq, asset_id):
+                continue
+            _, _, _, a_lat, a_lon, asset = self._entries[(kind, asset_id)]
+            distance = haversine_distance(lat, lon, a_lat, a_lon)
+            if distance <= max_distance_km:
+                yield asset, priority, distance
@@ -1,6 +1,22 @@
-from typing import Dict, List
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
 from datetime import datetime
 
+# Past performance per crisis type, shared by every engine in the process:
+# crisis type -> (success ratio or None, expires_at)
+_past_performance_cache: Dict[str, Tuple[Optional[float], float]] = {}
+_past_performance_lock = threading.Lock()
+
+
+def invalidate_past_performance(crisis_type: str = None):
+    """Drop cached past performance (call when a crisis resolves)"""
+    with _past_performance_lock:
+        if crisis_type is None:
+            _past_performance_cache.clear()
+        else:
+            _past_performance_cache.pop(crisis_type, None)
+
 
 class PriorityEngine:
     
@@ -18,6 +34,10 @@ class PriorityEngine:
         "violence": 9
     }
 
+    # Resolved crises per type considered, and how long a ratio stays cached
+    PAST_CRISES_LIMIT = 10
+    PAST_PERFORMANCE_TTL = 300
+
     def __init__(self, db=None):
         self.db = db
         self.history = []
@@ -131,32 +151,69 @@ class PriorityEngine:
     def _get_past_performance(self, ctype: str) -> float:
         if not self.db or not ctype:
             return None
-        
+
+        with _past_performance_lock:
+            cached = _past_performance_cache.get(ctype)
+        if cached and cached[1] > time.time():
+            return cached[0]
+
+        return self._load_past_performance([ctype]).get(ctype)
+
+    def _load_past_performance(self, ctypes: Iterable[str]) -> Dict[str, Optional[float]]:
+        """
+        Share of the last PAST_CRISES_LIMIT resolved crises per type that
+        completed >= 70% of their tasks, for every type in one query
+        """
+        ctypes = list(ctypes)
         try:
+            from sqlalchemy import case, func, select
             from db import models
-            
-            past = self.db.query(models.Crisis).filter(
-                models.Crisis.crisis_type == ctype,
+
+            ranked = select(
+                models.Crisis.id,
+                models.Crisis.crisis_type,
+                func.row_number().over(
+                    partition_by=models.Crisis.crisis_type,
+                    order_by=models.Crisis.resolved_at.desc()
+                ).label("rn")
+            ).where(
+                models.Crisis.crisis_type.in_(ctypes),
                 models.Crisis.status == "resolved"
-            ).limit(10).all()
-            
-            if not past:
-                return None
-            
-            success_count = 0
-            for c in past:
-                tasks = self.db.query(models.Task).filter(
-                    models.Task.crisis_id == c.id
-                ).all()
-                
-                if tasks:
-                    completed = len([t for t in tasks if t.status == models.TaskStatus.COMPLETED])
-                    if completed / len(tasks) >= 0.7:
-                        success_count += 1
-            
-            return success_count / len(past)
-        except:
-            return None
+            ).subquery()
+
+            per_crisis = select(
+                ranked.c.crisis_type,
+                func.count(models.Task.id).label("total"),
+                func.sum(case((models.Task.status == "completed", 1), else_=0)).label("completed")
+            ).select_from(ranked).outerjoin(
+                models.Task, models.Task.crisis_id == ranked.c.id
+            ).where(
+                ranked.c.rn <= self.PAST_CRISES_LIMIT
+            ).group_by(ranked.c.crisis_type, ranked.c.id).subquery()
+
+            rows = self.db.execute(
+                select(
+                    per_crisis.c.crisis_type,
+                    func.count(),
+                    func.sum(case(
+                        ((per_crisis.c.total > 0) & (per_crisis.c.completed >= 0.7 * per_crisis.c.total), 1),
+                        else_=0
+                    ))
+                ).group_by(per_crisis.c.crisis_type)
+            ).all()
+        except Exception:
+            return {}
+
+        results = {ctype: None for ctype in ctypes}
+        for ctype, crises, successes in rows:
+            results[ctype] = successes / crises
+
+        expires = time.time() + self.PAST_PERFORMANCE_TTL
+        with _past_performance_lock:
+            for ctype, value in results.items():
+                _past_performance_cache[ctype] = (value, expires)
+
+        return results
 
     def compare_priorities(self, c1: Dict, c2: Dict) -> Dict:
         p1 = self.calculate_priority(c1)
@@ -171,6 +228,17 @@ class PriorityEngine:
 
     def batch_prioritize(self, crises: List[Dict]) -> List[Dict]:
         results = []
+
+        # One query warms past performance for every uncached type in the batch
+        if self.db:
+            now = time.time()
+            with _past_performance_lock:
+                missing = {
+                    typ for typ in (c.get("type") or c.get("crisis_type") for c in crises)
+                    if typ and not (typ in _past_performance_cache and _past_performance_cache[typ][1] > now)
+                }
+            if missing:
+                self._load_past_performance(missing)
         
         for c in crises:
             calc_pri = self.calculate_priority(c)
@@ -1,7 +1,10 @@
-from typing import List, Dict
+import threading
+from typing import List, Dict, Optional
 from datetime import datetime
 from .priority_engine import PriorityEngine
 from .geo_optimizer import GeoOptimizer
+from .preemption_index import PreemptionIndex
+from core.geo import haversine_distance
 
 
 class ReassignmentEngine:
@@ -16,22 +19,102 @@ class ReassignmentEngine:
     MAX_RESOURCE_DISTANCE_KM = 25
     MAX_VOLUNTEER_DISTANCE_KM = 15
 
-    def __init__(self):
-        self.priority_engine = PriorityEngine()
+    def __init__(self, db=None, index: Optional[PreemptionIndex] = None):
+        # With a session, priorities weigh in past performance per crisis type
+        self.priority_engine = PriorityEngine(db=db)
         self.geo_optimizer = GeoOptimizer()
         self.reassignment_log = []
+        # Deployed assets by geocell, lowest current priority first; shared
+        # by every engine in the process unless one is passed
+        self.index = deployment_index if index is None else index
+
+    # ---------- INDEX MAINTENANCE ----------
+
+    def track(self, asset: Dict, is_resource: bool):
+        """
+        Index an asset's current deployment (or drop it when available)
+        """
+        kind = "resource" if is_resource else "volunteer"
+        loc = self.geo_optimizer._safe_coords(asset.get("location", {}))
+
+        with _index_lock:
+            if asset.get("available", True) or not loc:
+                self.index.remove(kind, asset["id"])
+                return
+
+            priority = asset.get("allocation_priority", 0)
+            if self.index.get(kind, asset["id"]) != (priority, loc["lat"], loc["lon"]):
+                self.index.add(asset, kind, loc["lat"], loc["lon"], priority)
+
+    def release(self, asset_id: str, is_resource: bool, task_id: Optional[str] = None):
+        """
+        Drop an asset's deployment; with task_id, only if it is still
+        indexed for that task (a newer deployment is kept)
+        """
+        kind = "resource" if is_resource else "volunteer"
+        with _index_lock:
+            if task_id is not None:
+                asset = self.index.asset(kind, asset_id)
+                if asset is None or asset.get("task_id") != task_id:
+                    return
+            self.index.remove(kind, asset_id)
+
+    def load_deployments(self, db):
+        """
+        Index every volunteer with an active task, once per process, so a
+        restart does not forget deployments made before it
+        """
+        global _deployments_loaded
+        if _deployments_loaded or self.index is not deployment_index:
+            return
+        from db import models
+        from db.volunteer_pool import ACTIVE_TASK_STATUSES
+
+        with _load_lock:
+            if _deployments_loaded:
+                return
+            rows = db.query(
+                models.Task.id, models.Task.crisis_id, models.Task.volunteer_id,
+                models.Task.latitude, models.Task.longitude, models.Task.priority
+            ).filter(
+                models.Task.status.in_(ACTIVE_TASK_STATUSES),
+                models.Task.volunteer_id.isnot(None)
+            ).order_by(models.Task.assigned_at).all()
+            for task_id, crisis_id, volunteer_id, lat, lon, priority in rows:
+                self.track(deployment(volunteer_id, task_id, crisis_id, lat, lon, priority), is_resource=False)
+            _deployments_loaded = True
+
+    def _scan(self, assets: List[Dict], lat: float, lon: float, max_distance: float, below: float) -> List[Dict]:
+        """Deployed assets in range below `below`, lowest priority first (linear)"""
+        found = []
+        for asset in assets:
+            loc = self.geo_optimizer._safe_coords(asset.get("location", {}))
+            priority = asset.get("allocation_priority", 0)
+            if asset.get("available", True) or not loc or priority >= below:
+                continue
+            if haversine_distance(lat, lon, loc["lat"], loc["lon"]) <= max_distance:
+                found.append((priority, asset))
+        found.sort(key=lambda entry: entry[0])
+        return [asset for _, asset in found]
 
     # ---------- CORE LOGIC ----------
 
     def analyze_reassignment_need(
         self,
         new_crisis: Dict,
-        resources: List[Dict],
-        volunteers: List[Dict]
+        resources: Optional[List[Dict]] = None,
+        volunteers: Optional[List[Dict]] = None,
+        limit: Optional[int] = None
     ) -> Dict:
         """
         Analyzes whether reassignment is justified and proposes candidates.
-        Does NOT mutate state.
+        Does NOT mutate assets.
+
+        Candidates are the deployed assets lowest current priority first.
+        For a kind passed as None they come from the shared preemption
+        index (O(log n) per candidate), which the resource agent keeps
+        current as it assigns and releases volunteers. Passed
+        resources/volunteers are searched as given, with a linear scan.
         """
 
         new_priority = self.priority_engine.calculate_priority(new_crisis)
@@ -43,13 +126,23 @@ class ReassignmentEngine:
             "reassignment_recommended": False
         }
 
-        for r in resources:
-            if self._is_reassignable(r, new_priority, new_crisis, is_resource=True):
-                candidates["resources"].append(r)
-
-        for v in volunteers:
-            if self._is_reassignable(v, new_priority, new_crisis, is_resource=False):
-                candidates["volunteers"].append(v)
+        loc = self.geo_optimizer._safe_coords(new_crisis.get("location", {}))
+        if loc:
+            # new_priority > current + threshold  <=>  current < new - threshold
+            below = new_priority - self.PRIORITY_DELTA_THRESHOLD
+            for kind, key, assets, max_distance in (
+                ("resource", "resources", resources, self.MAX_RESOURCE_DISTANCE_KM),
+                ("volunteer", "volunteers", volunteers, self.MAX_VOLUNTEER_DISTANCE_KM)
+            ):
+                if assets is not None:
+                    found = self._scan(assets, loc["lat"], loc["lon"], max_distance, below)
+                    candidates[key] = found[:limit] if limit else found
+                    continue
+                with _index_lock:
+                    for asset, _, _ in self.index.candidates(kind, loc["lat"], loc["lon"], max_distance, below):
+                        candidates[key].append(asset)
+                        if limit and len(candidates[key]) >= limit:
+                            break
 
         if candidates["resources"] or candidates["volunteers"]:
             candidates["reassignment_recommended"] = True
@@ -75,10 +168,12 @@ class ReassignmentEngine:
 
         for r in approved_resources:
             self._apply_reassignment(r, crisis_id, new_priority)
+            self.track(r, is_resource=True)
             reassigned.append({"resource_id": r["id"]})
 
         for v in approved_volunteers:
             self._apply_reassignment(v, crisis_id, new_priority)
+            self.track(v, is_resource=False)
             reassigned.append({"volunteer_id": v["id"]})
 
         record = {
@@ -93,40 +188,6 @@ class ReassignmentEngine:
 
     # ---------- INTERNAL HELPERS ----------
 
-    def _is_reassignable(
-        self,
-        asset: Dict,
-        new_priority: int,
-        new_crisis: Dict,
-        is_resource: bool
-    ) -> bool:
-        """
-        Determines whether an asset can be reassigned based on:
-        - Allocation status
-        - Priority delta
-        - Distance feasibility
-        """
-
-        if asset.get("available", True):
-            return False
-
-        current_priority = asset.get("allocation_priority", 0)
-
-        if new_priority <= current_priority + self.PRIORITY_DELTA_THRESHOLD:
-            return False
-
-        distance = self.geo_optimizer.haversine_distance(
-            asset["location"], new_crisis["location"]
-        )
-
-        max_distance = (
-            self.MAX_RESOURCE_DISTANCE_KM
-            if is_resource
-            else self.MAX_VOLUNTEER_DISTANCE_KM
-        )
-
-        return distance <= max_distance
-
     def _apply_reassignment(
         self,
         asset: Dict,
@@ -137,3 +198,23 @@ class ReassignmentEngine:
         asset["allocation_priority"] = priority
         asset["allocated_at"] = datetime.utcnow().isoformat()
         asset["available"] = False
+
+
+def deployment(volunteer_id: str, task_id: str, crisis_id: str,
+               lat: Optional[float], lon: Optional[float], priority: Optional[int]) -> Dict:
+    """Preemption-index asset for a volunteer deployed on a task"""
+    return {
+        "id": volunteer_id,
+        "task_id": task_id,
+        "allocated_to": crisis_id,
+        "location": {"lat": lat, "lon": lon},
+        "allocation_priority": priority or 5,
+        "available": False
+    }
+
+
+# Process-wide index of deployed assets, kept current by the resource agent
+deployment_index = PreemptionIndex()
+_index_lock = threading.RLock()
+_load_lock = threading.Lock()
+_deployments_loaded = False
@@ -0,0 +1,432 @@
+"""
+Offline road-network travel times
+
+The graph is a compact .npz file (node coordinates plus a CSR adjacency
+array of edge travel times), built once from an OSM extract:
+
+    python -m backend.agents.resource.road_network build dehradun.osm backend/data/dehradun_roads.npz
+
+Queries snap points to their nearest road node and run Dijkstra over the
+graph (scipy.sparse.csgraph when installed, a heap-based fallback
+otherwise). One-to-many and many-to-one queries are a single Dijkstra
+from the shared endpoint; the full per-node result is cached per origin
+node, so popular origin cells are answered from memory.
+"""
+
+import heapq
+import math
+import os
+import sys
+import threading
+import xml.etree.ElementTree as ET
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra as csgraph_dijkstra
+    from scipy.spatial import cKDTree
+except ImportError:
+    csr_matrix = None
+    csgraph_dijkstra = None
+    cKDTree = None
+
+DEFAULT_GRAPH_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'dehradun_roads.npz')
+
+EARTH_R = 6371.0
+
+# Default car speeds (km/h) by OSM highway class when a way has no maxspeed
+HIGHWAY_SPEEDS = {
+    "motorway": 80, "motorway_link": 50,
+    "trunk": 60, "trunk_link": 40,
+    "primary": 50, "primary_link": 35,
+    "secondary": 40, "secondary_link": 30,
+    "tertiary": 35, "tertiary_link": 25,
+    "unclassified": 30,
+    "residential": 25,
+    "living_street": 10,
+    "service": 15,
+    "road": 25,
+    "track": 10
+}
+
+
+class RoadNetwork:
+    """
+    Directed road graph with travel times in seconds
+
+    - node_lat / node_lon: node coordinates
+    - indptr / indices / travel_s: CSR adjacency (edge u -> indices[k])
+    """
+
+    # Off-road leg from a point to its snapped node
+    ACCESS_SPEED_KMH = 15.0
+    # Points further than this from any road are left unrouted (NaN)
+    MAX_SNAP_KM = 2.0
+    # Snapping grid cell (degrees, ~1 km at Dehradun's latitude)
+    GRID_DEG = 0.01
+
+    def __init__(self, node_lat, node_lon, indptr, indices, travel_s, cache_size: int = 64):
+        self.node_lat = np.asarray(node_lat, dtype=np.float64)
+        self.node_lon = np.asarray(node_lon, dtype=np.float64)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        # csgraph treats zero weights as missing edges
+        self.travel_s = np.maximum(np.asarray(travel_s, dtype=np.float64), 0.01)
+        self.num_nodes = len(self.node_lat)
+
+        self._forward = self._reverse = None
+        if csr_matrix is not None:
+            self._forward = csr_matrix((self.travel_s, self.indices, self.indptr), shape=(self.num_nodes,) * 2)
+            self._reverse = self._forward.T.tocsr()
+
+        # Snapping: KD-tree on a local km plane with scipy, grid buckets without
+        self._tree = None
+        self._lat0 = math.radians(float(self.node_lat.mean())) if self.num_nodes else 0.0
+        if cKDTree is not None and self.num_nodes:
+            self._tree = cKDTree(self._project(self.node_lat, self.node_lon))
+        else:
+            self._build_grid()
+
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[int, bool], np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "dijkstra_runs": 0}
+
+    # ---------- LOAD / SAVE ----------
+
+    @classmethod
+    def load(cls, path: str, cache_size: int = 64) -> "RoadNetwork":
+        with np.load(path) as data:
+            return cls(data["node_lat"], data["node_lon"], data["indptr"], data["indices"],
+                       data["travel_s"], cache_size=cache_size)
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        np.savez_compressed(
+            path,
+            node_lat=self.node_lat, node_lon=self.node_lon,
+            indptr=self.indptr, indices=self.indices,
+            travel_s=self.travel_s.astype(np.float32)
+        )
+
+    @classmethod
+    def from_edges(cls, node_lat, node_lon, edges_from, edges_to, travel_s, **kwargs) -> "RoadNetwork":
+        """Build the CSR arrays from parallel edge lists"""
+        edges_from = np.asarray(edges_from, dtype=np.int64)
+        order = np.argsort(edges_from, kind="stable")
+        counts = np.bincount(edges_from, minlength=len(node_lat))
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        return cls(node_lat, node_lon, indptr, np.asarray(edges_to)[order], np.asarray(travel_s)[order], **kwargs)
+
+    # ---------- SNAPPING ----------
+
+    def _project(self, lats, lons) -> np.ndarray:
+        return np.column_stack([
+            np.radians(lons) * math.cos(self._lat0) * EARTH_R,
+            np.radians(lats) * EARTH_R
+        ])
+
+    def _build_grid(self):
+        cells = self._cells(self.node_lat, self.node_lon)
+        order = np.argsort(cells, kind="stable")
+        sorted_cells = cells[order]
+        bounds = np.flatnonzero(np.diff(sorted_cells)) + 1
+        starts = np.concatenate([[0], bounds])
+        ends = np.concatenate([bounds, [len(order)]])
+        self._grid: Dict[int, np.ndarray] = {
+            int(sorted_cells[s]): order[s:e] for s, e in zip(starts, ends)
+        } if len(order) else {}
+
+    def _cells(self, lats, lons) -> np.ndarray:
+        row = np.floor(np.asarray(lats) / self.GRID_DEG).astype(np.int64)
+        col = np.floor(np.asarray(lons) / self.GRID_DEG).astype(np.int64)
+        return row * 100000 + col
+
+    def snap(self, lats, lons) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest node per point and the distance to it (km); -1 when too far"""
+        lats = np.atleast_1d(np.asarray(lats, dtype=np.float64))
+        lons = np.atleast_1d(np.asarray(lons, dtype=np.float64))
+        nodes = np.full(len(lats), -1, dtype=np.int64)
+        dists = np.full(len(lats), np.nan)
+
+        if self._tree is not None:
+            valid = ~(np.isnan(lats) | np.isnan(lons))
+            if valid.any():
+                _, ids = self._tree.query(self._project(lats[valid], lons[valid]))
+                d = _haversine_pairs(lats[valid], lons[valid], self.node_lat[ids], self.node_lon[ids])
+                close = d <= self.MAX_SNAP_KM
+                rows = np.flatnonzero(valid)[close]
+                nodes[rows], dists[rows] = ids[close], d[close]
+            return nodes, dists
+
+        lat_rings = int(math.ceil(self.MAX_SNAP_KM / (self.GRID_DEG * 111.0)))
+
+        # Points in the same cell share one candidate set
+        neighbourhoods: Dict[Tuple[int, int], Optional[np.ndarray]] = {}
+        for i, (lat, lon) in enumerate(zip(lats, lons)):
+            if np.isnan(lat) or np.isnan(lon):
+                continue
+            row, col = int(math.floor(lat / self.GRID_DEG)), int(math.floor(lon / self.GRID_DEG))
+            if (row, col) not in neighbourhoods:
+                lon_rings = int(math.ceil(
+                    self.MAX_SNAP_KM / (self.GRID_DEG * 111.0 * max(math.cos(math.radians(lat)), 0.1))
+                ))
+                found = [
+                    self._grid.get((row + dr) * 100000 + col + dc)
+                    for dr in range(-lat_rings, lat_rings + 1)
+                    for dc in range(-lon_rings, lon_rings + 1)
+                ]
+                found = [f for f in found if f is not None]
+                neighbourhoods[(row, col)] = np.concatenate(found) if found else None
+            ids = neighbourhoods[(row, col)]
+            if ids is None:
+                continue
+            d = _haversine(lat, lon, self.node_lat[ids], self.node_lon[ids])
+            best = int(d.argmin())
+            if d[best] <= self.MAX_SNAP_KM:
+                nodes[i], dists[i] = ids[best], d[best]
+        return nodes, dists
+
+    # ---------- SHORTEST PATHS ----------
+
+    def node_times(self, node: int, reverse: bool = False) -> np.ndarray:
+        """
+        Seconds from `node` to every node (or from every node to it with
+        `reverse`); LRU-cached per (node, direction)
+        """
+        key = (int(node), reverse)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats["hits"] += 1
+                return cached
+            self.stats["misses"] += 1
+
+        times = self._dijkstra([node], reverse)
+        times.setflags(write=False)
+
+        with self._lock:
+            self._cache[key] = times
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return times
+
+    def nearest_source_times(self, nodes: List[int], reverse: bool = False) -> np.ndarray:
+        """Multi-source Dijkstra: seconds to every node from the closest source"""
+        return self._dijkstra(list(nodes), reverse)
+
+    def _dijkstra(self, sources: List[int], reverse: bool) -> np.ndarray:
+        self.stats["dijkstra_runs"] += 1
+        if csgraph_dijkstra is not None:
+            graph = self._reverse if reverse else self._forward
+            result = csgraph_dijkstra(graph, directed=True, indices=sources, min_only=True)
+            return np.asarray(result, dtype=np.float64)
+        return self._dijkstra_heap(sources, reverse)
+
+    def _dijkstra_heap(self, sources: List[int], reverse: bool) -> np.ndarray:
+        if reverse:
+            if not hasattr(self, "_rev_csr"):
+                order = np.argsort(self.indices, kind="stable")
+                tails = np.repeat(np.arange(self.num_nodes), np.diff(self.indptr))
+                counts = np.bincount(self.indices, minlength=self.num_nodes)
+                self._rev_csr = (
+                    np.concatenate([[0], np.cumsum(counts)]), tails[order], self.travel_s[order]
+                )
+            indptr, indices, weights = self._rev_csr
+        else:
+            indptr, indices, weights = self.indptr, self.indices, self.travel_s
+
+        dist = np.full(self.num_nodes, np.inf)
+        heap = []
+        for s in sources:
+            dist[s] = 0.0
+            heap.append((0.0, int(s)))
+        heapq.heapify(heap)
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for k in range(indptr[u], indptr[u + 1]):
+                v = indices[k]
+                nd = d + weights[k]
+                if nd < dist[v]:
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, int(v)))
+        return dist
+
+    # ---------- TRAVEL TIMES (minutes) ----------
+
+    def _access_minutes(self, snap_km) -> np.ndarray:
+        return np.asarray(snap_km) / self.ACCESS_SPEED_KMH * 60
+
+    def _point_times(self, lat: float, lon: float, lats, lons, reverse: bool) -> np.ndarray:
+        anchor, anchor_km = self.snap([lat], [lon])
+        result = np.full(len(np.atleast_1d(lats)), np.nan)
+        if anchor[0] < 0:
+            return result
+
+        nodes, snap_km = self.snap(lats, lons)
+        ok = nodes >= 0
+        times = self.node_times(int(anchor[0]), reverse=reverse)
+        seconds = times[nodes[ok]]
+        result[ok] = seconds / 60 + self._access_minutes(snap_km[ok]) + self._access_minutes(anchor_km[0])
+        result[np.isinf(result)] = np.nan
+        return result
+
+    def travel_times_from(self, lat: float, lon: float, lats, lons) -> np.ndarray:
+        """One-to-many: minutes from (lat, lon) to each point; NaN if unroutable"""
+        return self._point_times(lat, lon, lats, lons, reverse=False)
+
+    def travel_times_to(self, lat: float, lon: float, lats, lons) -> np.ndarray:
+        """Many-to-one: minutes from each point to (lat, lon); NaN if unroutable"""
+        return self._point_times(lat, lon, lats, lons, reverse=True)
+
+    def travel_time(self, lat1: float, lon1: float, lat2: float, lon2: float) -> Optional[float]:
+        """Point-to-point minutes, or None if either end is off the network"""
+        value = self.travel_times_from(lat1, lon1, [lat2], [lon2])[0]
+        return None if np.isnan(value) else float(value)
+
+    def precompute(self, locations: List[Tuple[float, float]], reverse: bool = True):
+        """Warm the cache for known hot spots (hospitals, fire stations, ...)"""
+        nodes, _ = self.snap([l[0] for l in locations], [l[1] for l in locations])
+        for node in nodes[nodes >= 0]:
+            self.node_times(int(node), reverse=reverse)
+
+    def get_statistics(self) -> Dict:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            "nodes": self.num_nodes,
+            "edges": int(len(self.indices)),
+            "engine": "scipy" if csgraph_dijkstra is not None else "heapq",
+            "cached_origins": len(self._cache),
+            "cache_size": self.cache_size,
+            "hit_ratio": round(self.stats["hits"] / lookups, 3) if lookups else 0.0,
+            **self.stats
+        }
+
+
+def _haversine(lat: float, lon: float, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    phi1 = math.radians(lat)
+    lats = np.radians(lats)
+    a = (
+        np.sin((lats - phi1) / 2) ** 2
+        + math.cos(phi1) * np.cos(lats) * np.sin((np.radians(lons) - math.radians(lon)) / 2) ** 2
+    )
+    return 2 * EARTH_R * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _haversine_pairs(lats1, lons1, lats2, lons2) -> np.ndarray:
+    lat1, lat2 = np.radians(lats1), np.radians(lats2)
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((np.radians(lons2) - np.radians(lons1)) / 2) ** 2
+    )
+    return 2 * EARTH_R * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+# ---------- OSM IMPORT ----------
+
+def _maxspeed(tags: Dict[str, str]) -> Optional[float]:
+    value = tags.get("maxspeed", "")
+    digits = "".join(ch for ch in value.split(";")[0] if ch.isdigit() or ch == ".")
+    try:
+        speed = float(digits)
+    except ValueError:
+        return None
+    return speed * 1.609 if "mph" in value else speed
+
+
+def build_from_osm(osm_path: str) -> RoadNetwork:
+    """
+    Convert an OSM XML extract into a RoadNetwork
+
+    Keeps drivable highways only, honours oneway tags and uses maxspeed
+    where present (HIGHWAY_SPEEDS otherwise).
+    """
+    coords: Dict[str, Tuple[float, float]] = {}
+    ways = []
+
+    for _, elem in ET.iterparse(osm_path, events=("end",)):
+        if elem.tag == "node":
+            coords[elem.get("id")] = (float(elem.get("lat")), float(elem.get("lon")))
+            elem.clear()
+        elif elem.tag == "way":
+            tags = {t.get("k"): t.get("v") for t in elem.findall("tag")}
+            highway = tags.get("highway")
+            if highway in HIGHWAY_SPEEDS:
+                refs = [nd.get("ref") for nd in elem.findall("nd")]
+                speed = _maxspeed(tags) or HIGHWAY_SPEEDS[highway]
+                oneway = tags.get("oneway")
+                ways.append((refs, speed, oneway))
+            elem.clear()
+
+    index: Dict[str, int] = {}
+    edges_from, edges_to, travel_s = [], [], []
+
+    def node_id(ref):
+        if ref not in index:
+            index[ref] = len(index)
+        return index[ref]
+
+    for refs, speed, oneway in ways:
+        refs = [r for r in refs if r in coords]
+        if oneway == "-1":
+            refs = refs[::-1]
+        for a, b in zip(refs, refs[1:]):
+            (lat1, lon1), (lat2, lon2) = coords[a], coords[b]
+            seconds = float(_haversine(lat1, lon1, np.array([lat2]), np.array([lon2]))[0]) / speed * 3600
+            u, v = node_id(a), node_id(b)
+            edges_from.append(u)
+            edges_to.append(v)
+            travel_s.append(seconds)
+            if oneway not in ("yes", "true", "1", "-1"):
+                edges_from.append(v)
+                edges_to.append(u)
+                travel_s.append(seconds)
+
+    node_lat = np.empty(len(index))
+    node_lon = np.empty(len(index))
+    for ref, i in index.items():
+        node_lat[i], node_lon[i] = coords[ref]
+
+    return RoadNetwork.from_edges(node_lat, node_lon, edges_from, edges_to, travel_s)
+
+
+# ---------- SHARED INSTANCE ----------
+
+_network = None
+_network_lock = threading.Lock()
+
+
+def get_road_network(path: str = None) -> Optional[RoadNetwork]:
+    """
+    The process-wide road network, or None when no graph file exists
+
+    ROAD_GRAPH_PATH overrides the default backend/data/dehradun_roads.npz.
+    """
+    global _network
+    if _network is not None:
+        return _network or None
+    with _network_lock:
+        if _network is None:
+            path = path or os.getenv("ROAD_GRAPH_PATH") or DEFAULT_GRAPH_PATH
+            # False marks "looked, not found" so we don't stat the file every call
+            _network = RoadNetwork.load(path) if os.path.exists(path) else False
+    return _network or None
+
+
+def main():
+    if len(sys.argv) != 4 or sys.argv[1] != "build":
+        print("Usage: python -m backend.agents.resource.road_network build <extract.osm> <output.npz>")
+        sys.exit(1)
+    network = build_from_osm(sys.argv[2])
+    network.save(sys.argv[3])
+    print(f"Saved {network.num_nodes} nodes / {len(network.indices)} edges to {sys.argv[3]}")
+
+
+if __name__ == "__main__":
+    main()
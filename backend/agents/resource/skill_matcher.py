@@ -1,11 +1,31 @@
-from typing import List, Dict
+import itertools
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from db.volunteer_pool import SkillRegistry
+
+
+# Set bits per byte, for NumPy without bitwise_count (< 2.0)
+_BYTE_BITS = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def _popcount(words: np.ndarray) -> np.ndarray:
+    """Set bits per row of an (n, words) uint64 array"""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words).sum(axis=1, dtype=np.int64)
+    return _BYTE_BITS[np.ascontiguousarray(words).view(np.uint8)].reshape(len(words), -1).sum(axis=1, dtype=np.int64)
 
 
 class SkillMatcher:
     """
     Optimized SkillMatcher:
-    - Non-mutating
-    - Deterministic ranking
+    - Non-mutating; only team members are copied (with match_score)
+    - Skills are uint64 bitmasks against a SkillRegistry; coverage and
+      priority-weighted quality are popcounts over the whole pool in one
+      NumPy pass
+    - Deterministic ranking (score, then input order), sorted lazily in
+      top-k chunks as far as team selection reads
     - Round-2 learning friendly
     """
 
@@ -21,6 +41,12 @@ class SkillMatcher:
         "communication": 4,
         "driver": 4
     }
+    DEFAULT_PRIORITY = 3
+
+    def __init__(self, registry: Optional[SkillRegistry] = None):
+        self.registry = registry or SkillRegistry()
+        # The volunteer list last encoded, its length and its masks
+        self._encoded = (None, 0, None)
 
     # ---------- PUBLIC API ----------
 
@@ -33,29 +59,36 @@ class SkillMatcher:
         """
         Returns a ranked and diverse volunteer team
         """
+        if not volunteers:
+            return []
 
-        scored = [
-            {
-                **v,
-                "match_score": self._calculate_match_score(
-                    v.get("skills", []),
-                    required_skills
-                )
-            }
-            for v in volunteers
-        ]
-
-        ranked = sorted(
-            scored,
-            key=lambda v: v["match_score"],
-            reverse=True
-        )
+        masks = self.encode(volunteers)
+        scores = self._batch_scores(masks, required_skills)
+        team = self._select_diverse_team(masks, scores, required_skills, max_team_size)
 
-        return self._select_diverse_team(
-            ranked,
-            required_skills,
-            max_team_size
-        )
+        return [{**volunteers[i], "match_score": float(scores[i])} for i in team]
+
+    def encode(self, volunteers: List[Dict]) -> np.ndarray:
+        """
+        (n, words) uint64 skill masks; the last list is cached by identity
+        and length (as in AvailabilityManager.track), so edit skills by
+        passing a new list
+        """
+        cached, size, masks = self._encoded
+        if volunteers is cached and len(volunteers) == size:
+            return masks
+
+        skills = [v.get("skills") or () for v in volunteers]
+        names = list(itertools.chain.from_iterable(skills))
+        # One registry lookup per distinct skill, not per volunteer skill
+        bit = {name: self.registry.bit(name, create=True) for name in set(names)}
+        rows = np.repeat(np.arange(len(skills)), [len(s) for s in skills])
+        flat = np.fromiter((bit[name] for name in names), dtype=np.int64, count=len(names))
+
+        masks = np.zeros((len(volunteers), self.registry.words), dtype=np.uint64)
+        np.bitwise_or.at(masks, (rows, flat // 64), np.left_shift(np.uint64(1), (flat % 64).astype(np.uint64)))
+        self._encoded = (volunteers, len(volunteers), masks)
+        return masks
 
     # ---------- SCORING ----------
 
@@ -64,6 +97,7 @@ class SkillMatcher:
         volunteer_skills: List[str],
         required_skills: List[str]
     ) -> float:
+        """Scalar form of _batch_scores (one volunteer)"""
         if not required_skills:
             return 50.0
 
@@ -75,7 +109,7 @@ class SkillMatcher:
         coverage_ratio = len(matched) / len(required_skills)
 
         quality_score = sum(
-            self.SKILL_PRIORITY.get(skill, 3)
+            self.SKILL_PRIORITY.get(skill, self.DEFAULT_PRIORITY)
             for skill in matched
         ) / (len(required_skills) * 10)
 
@@ -84,35 +118,97 @@ class SkillMatcher:
 
         return round(min(100.0, score), 2)
 
+    def _batch_scores(self, masks: np.ndarray, required_skills: List[str]) -> np.ndarray:
+        """_calculate_match_score for every row of `masks`"""
+        if not required_skills:
+            return np.full(len(masks), 50.0)
+
+        # Required skills grouped by priority: matched count and quality
+        # are one popcount per group
+        groups: Dict[int, List[str]] = {}
+        for skill in set(required_skills):
+            groups.setdefault(self.SKILL_PRIORITY.get(skill, self.DEFAULT_PRIORITY), []).append(skill)
+
+        matched = np.zeros(len(masks), dtype=np.int64)
+        quality = np.zeros(len(masks), dtype=np.int64)
+        for priority, skills in groups.items():
+            required, _ = self._required_mask(skills, masks.shape[1])
+            count = _popcount(masks & required)
+            matched += count
+            quality += priority * count
+
+        total = len(required_skills)
+        # Balanced coverage + skill depth
+        score = np.minimum(100.0, (matched / total) * 70 + (quality / (total * 10)) * 30)
+        return np.where(matched > 0, np.round(score, 2), 0.0)
+
+    def _required_mask(self, skills: Sequence[str], words: int) -> Tuple[np.ndarray, bool]:
+        """Mask of the registered skills, and whether every skill is representable"""
+        mask = np.zeros(words, dtype=np.uint64)
+        complete = True
+        for skill in skills:
+            b = self.registry.bit(skill)
+            if b is None or b // 64 >= words:
+                # Unregistered: no encoded volunteer has it
+                complete = False
+                continue
+            mask[b // 64] |= np.uint64(1) << np.uint64(b % 64)
+        return mask, complete
+
     # ---------- TEAM SELECTION ----------
 
+    @staticmethod
+    def _ranked(scores: np.ndarray, chunk: int) -> Iterator[int]:
+        """
+        Rows by score (desc), ties in input order; each round partitions
+        out a top-k four times larger instead of sorting the whole pool
+        """
+        n = len(scores)
+        # Scores have two decimals in [0, 100]: one unique integer key per row
+        key = -np.rint(scores * 100).astype(np.int64) * n + np.arange(n)
+        done = 0
+        while done < n:
+            k = min(n, max(chunk, done * 4))
+            top = np.argpartition(key, k - 1)[:k] if k < n else np.arange(n)
+            top = top[np.argsort(key[top])]
+            yield from top[done:].tolist()
+            done = k
+
+    @staticmethod
+    def _as_int(words: np.ndarray) -> int:
+        return sum(int(w) << (64 * i) for i, w in enumerate(words))
+
     def _select_diverse_team(
         self,
-        ranked_volunteers: List[Dict],
+        masks: np.ndarray,
+        scores: np.ndarray,
         required_skills: List[str],
         max_team_size: int
-    ) -> List[Dict]:
+    ) -> List[int]:
+        required, complete = self._required_mask(set(required_skills), masks.shape[1])
+        required = self._as_int(required)
+
         selected = []
-        covered_skills = set()
+        covered_skills = 0
 
-        for v in ranked_volunteers:
-            v_skills = set(v.get("skills", []))
+        for i in self._ranked(scores, max(16, 4 * max_team_size)):
+            v_skills = self._as_int(masks[i])
 
             # Always take top-ranked initially
             if len(selected) < 2:
-                selected.append(v)
+                selected.append(i)
                 covered_skills |= v_skills
                 continue
 
             # Add only if it improves coverage
-            if v_skills - covered_skills:
-                selected.append(v)
+            if v_skills & ~covered_skills:
+                selected.append(i)
                 covered_skills |= v_skills
 
             if len(selected) >= max_team_size:
                 break
 
-            if set(required_skills).issubset(covered_skills):
+            if complete and not required & ~covered_skills:
                 break
 
         return selected
@@ -0,0 +1,60 @@
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+import pytest
+
+from agents.resource.allocation_queue import AllocationQueue
+from agents.resource.dispatch_queue import dispatch_queue
+from benchmarks.allocation_benchmark import build_city, generate_crises
+from db import models
+from db.volunteer_pool import volunteer_pool
+
+
+@pytest.fixture
+def city(tmp_path):
+    Session, engine, city = build_city(f"sqlite:///{tmp_path / 'alloc.db'}", 200, 10, 2, seed=3)
+    volunteer_pool.invalidate()
+    yield Session, city
+    dispatch_queue.flush()
+    volunteer_pool.invalidate()
+    engine.dispose()
+
+
+def test_allocates_crisis_saved_after_submit(city):
+    Session, _ = city
+    # The worker never wakes up during the test; flush() drives it
+    queue = AllocationQueue(flush_interval=3600, session_factory=Session)
+    crisis = generate_crises(1, random.Random(5), 'vq')[0]
+    crisis['status'] = 'Detected'
+
+    queue.submit(crisis['id'])
+    # Not committed yet: stays queued
+    assert queue.flush() is None
+    assert queue.get_statistics()['pending'] == 1
+
+    with Session() as db:
+        db.add(models.Crisis(**crisis))
+        db.commit()
+
+    result = queue.flush()
+    assert [c['crisis_id'] for c in result['crises']] == [crisis['id']]
+    assert result['assignments']
+    assert queue.get_statistics()['pending'] == 0
+
+
+def test_skips_closed_and_expires_unknown(city):
+    Session, city_data = city
+    queue = AllocationQueue(flush_interval=3600, max_wait=0, session_factory=Session)
+    closed = city_data['crises'][0]['id']
+    with Session() as db:
+        db.query(models.Crisis).filter(models.Crisis.id == closed).update({'status': 'resolved'})
+        db.commit()
+
+    queue.submit(closed)
+    queue.submit('never-saved')
+    result = queue.flush()
+    assert result['crises'] == []
+    assert queue.get_statistics()['expired'] == 1
@@ -0,0 +1,60 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+import pytest
+
+from agents.resource.dispatch_queue import dispatch_queue
+from agents.resource.preemption_index import PreemptionIndex
+from agents.resource.reassignment_engine import ReassignmentEngine, deployment, deployment_index
+from agents.resource_agent import ResourceAgent
+from benchmarks.allocation_benchmark import build_city
+from db.volunteer_pool import volunteer_pool
+
+
+@pytest.fixture
+def city(tmp_path):
+    Session, engine, city = build_city(f"sqlite:///{tmp_path / 'reassign.db'}", 200, 10, 3, seed=11)
+    volunteer_pool.invalidate()
+    yield Session, city
+    dispatch_queue.flush()
+    volunteer_pool.invalidate()
+    engine.dispose()
+
+
+def indexed_task(volunteer_id):
+    asset = deployment_index.asset("volunteer", volunteer_id)
+    return asset and asset["task_id"]
+
+
+def test_index_follows_assignments_and_reassignment(city):
+    Session, _ = city
+    with Session() as db:
+        agent = ResourceAgent(db)
+        assignments = agent.allocate_open_crises()["assignments"]
+        assert assignments
+        for a in assignments:
+            assert indexed_task(a["volunteer_id"]) == a["task_id"]
+
+        failed = assignments[0]
+        result = agent.reassign_failed_task(failed["task_id"])
+        assert indexed_task(failed["volunteer_id"]) is None
+        assert indexed_task(result["new_volunteer_id"]) == failed["task_id"]
+
+
+def test_passed_assets_are_scanned_lowest_priority_first():
+    engine = ReassignmentEngine(index=PreemptionIndex())
+    volunteers = [
+        deployment("v1", "t1", "c1", 30.32, 78.03, 4),
+        deployment("v2", "t2", "c1", 30.33, 78.04, 2),
+        deployment("v3", "t3", "c2", 31.50, 79.50, 1),  # out of range
+        {**deployment("v4", "t4", "c2", 30.32, 78.03, 1), "available": True}
+    ]
+    crisis = {"id": "c9", "crisis_type": "medical", "trust_score": 1.0,
+              "location": {"lat": 30.32, "lon": 78.03}}
+
+    result = engine.analyze_reassignment_need(crisis, resources=[], volunteers=volunteers)
+    assert [v["id"] for v in result["volunteers"]] == ["v2", "v1"]
+    # The shared index is not consulted for passed lists
+    assert len(engine.index) == 0
@@ -1,20 +1,26 @@
-from fastapi import APIRouter, HTTPException, Header, Depends
+from fastapi import APIRouter, HTTPException, Header, Depends, Query
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 from math import radians, sin, cos, sqrt, atan2
 import json
 import logging
+import numpy as np
 from db.database import get_db
 from db import crud, models
+from db.volunteer_pool import ACTIVE_TASK_STATUSES, VolunteerRecord, volunteer_pool
 from .resource.matcher import ResourceMatcher
 from .resource.geo_optimizer import GeoOptimizer
 from .resource.availability_manager import AvailabilityManager
 from .resource.priority_engine import PriorityEngine
 from .resource.skill_matcher import SkillMatcher
-from .resource.reassignment_engine import ReassignmentEngine
-from backend.api.notify import notify
+from .resource.reassignment_engine import ReassignmentEngine, deployment
+from .resource.assignment_solver import AssignmentSolver
+from .resource.dispatch_queue import dispatch_queue
+from .resource.coverage_engine import coverage_engine
 from backend.core.role_guard import require_role
+from core.geo import haversine_distances
 
 router = APIRouter(prefix="/resource", tags=["resource"])
 logger = logging.getLogger(__name__)
@@ -22,16 +28,28 @@ logger = logging.getLogger(__name__)
 
 class ResourceAgent:
 
+    OPEN_CRISIS_STATUSES = ("pending", "accepted", "in_progress")
+    CLOSED_CRISIS_STATUSES = ("resolved", "rejected")
+
     def __init__(self, db: Session = None):
         self.db = db
         
         self.matcher = ResourceMatcher()
         self.geo_optimizer = GeoOptimizer()
         self.availability_manager = AvailabilityManager()
-        self.priority_engine = PriorityEngine()
+        self.priority_engine = PriorityEngine(db=db)
         self.skill_matcher = SkillMatcher()
-        self.reassignment_engine = ReassignmentEngine()
+        # Shares the process-wide preemption index, kept current below
+        self.reassignment_engine = ReassignmentEngine(db=db)
+        if db is not None:
+            self.reassignment_engine.load_deployments(db)
         self.max_search_radius_km = 50.0
+        self.assignment_solver = AssignmentSolver(max_distance_km=self.max_search_radius_km)
+        self.average_speed_kmh = 30.0
+        self.availability_window_hours = 1  # must be on shift now and for this many hours
+        # Candidate searches read this instead of the users table
+        self.volunteer_pool = volunteer_pool
+        self.dispatch_queue = dispatch_queue
     
     
     #DISTANCE & ETA CALCULATIONS
@@ -49,66 +67,42 @@ class ResourceAgent:
         
         return R * c
     
-    def release_resources(self, allocation_id: str):
-        self.availability_manager.release(allocation_id, self.resources, self.volunteers)
-        self.save_resources()
-
-agent = ResourceAgent()
-
-@router.post("/allocate")
-async def allocate_resources(crisis: Dict, token: str = Header(...)):
-    require_role(token, ["authority"])
-    try:
-        allocation = agent.allocate_resources(crisis)
-        return {"status": "success", "allocation": allocation}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@router.post("/reassign")
-async def reassign_resources(crisis: Dict, token: str = Header(...)):
-    require_role(token, ["authority"])
-    try:
-        reassignment = agent.handle_reassignment(crisis)
-        return {"status": "success", "reassignment": reassignment}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@router.post("/release/{allocation_id}")
-async def release_resources(allocation_id: str, token: str = Header(...)):
-    require_role(token, ["authority"])
-    try:
-        agent.release_resources(allocation_id)
-        return {"status": "success", "message": "Resources released"}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
-
-@router.get("/status")
-async def get_status(token: str = Header(...)):
-    require_role(token, ["authority"])
-    available = len([r for r in agent.resources if r['available']])
-    total = len(agent.resources)
-    return {
-        "available_resources": available,
-        "total_resources": total,
-        "utilization": round((1 - available/total) * 100, 2) if total > 0 else 0
-    }
-
-@router.post("/volunteer/register")
-async def register_volunteer(volunteer: Dict, token: str = Header(None)):
-    # Allow anonymous registration from frontend for demo/dev flows.
-    # In production, re-enable role checks via require_role(token, ["volunteer"]).
-    try:
-        if not volunteer.get('name') or not volunteer.get('skills') or not volunteer.get('location'):
-            raise HTTPException(status_code=400, detail="Name, skills, and location are required")
-        
-        # Factors:
-        # - Skill match: 40%
-        # - Distance: 30%
-        # - Reliability: 20%
-        # - Availability: 10%
-        # 
-        # Returns: (total_score, breakdown_dict)
-        # """
+    
+    def calculate_eta(self, distance_km: float, severity: str = "medium", travel_minutes: float = None) -> int:
+        """
+        Estimated arrival time in minutes
+        
+        Travel time (road-network minutes when given, otherwise distance at
+        an average urban speed) plus a dispatch delay that is shorter for
+        more severe crises.
+        """
+        dispatch_minutes = {"critical": 2, "high": 5, "medium": 10, "low": 15}
+        if travel_minutes is None:
+            travel_minutes = (distance_km or 0) / self.average_speed_kmh * 60
+        return int(round(travel_minutes + dispatch_minutes.get(str(severity).lower(), 10)))
+    
+    
+    # ============= SCORING =============
+    
+    def score_volunteer(
+        self,
+        volunteer: models.User,
+        task: models.Task,
+        crisis: models.Crisis,
+        distance_km: Optional[float] = None
+    ) -> Tuple[float, Dict]:
+        """
+        Score a volunteer for a task (0-100)
+        
+        Factors:
+        - Skill match: 40%
+        - Distance: 30%
+        - Reliability: 20%
+        - Availability: 10%
+        
+        Returns: (total_score, breakdown_dict)
+        """
+        weights = AssignmentSolver
         breakdown = {}
         total_score = 0.0
         
@@ -116,48 +110,46 @@ async def register_volunteer(volunteer: Dict, token: str = Header(None)):
         skill_score = 0
         if task.required_skill:
             if volunteer.skills and task.required_skill in volunteer.skills:
-                skill_score = 40
+                skill_score = weights.SKILL_EXACT
                 breakdown["skill_match"] = "exact"
             else:
-                skill_score = 10
+                skill_score = weights.SKILL_PARTIAL
                 breakdown["skill_match"] = "partial"
         else:
-            skill_score = 30
+            skill_score = weights.SKILL_NOT_REQUIRED
             breakdown["skill_match"] = "not_required"
         
         total_score += skill_score
         
         # 2. Distance Score (30 points)
-        if volunteer.latitude and volunteer.longitude and task.latitude and task.longitude:
-            distance = self.calculate_distance(
+        # distance_km comes precomputed from the radius search when available
+        if distance_km is None and volunteer.latitude and volunteer.longitude and task.latitude and task.longitude:
+            distance_km = self.calculate_distance(
                 volunteer.latitude, volunteer.longitude,
                 task.latitude, task.longitude
             )
-            
-            if distance <= 5:
-                distance_score = 30
-            elif distance <= 15:
-                distance_score = 20
-            elif distance <= 30:
-                distance_score = 10
-            else:
-                distance_score = 5
-            
+        
+        if distance_km is not None:
+            distance = distance_km
+            distance_score = next(
+                (points for limit, points in weights.DISTANCE_BANDS if distance <= limit),
+                weights.DISTANCE_FAR
+            )
             breakdown["distance_km"] = round(distance, 2)
         else:
-            distance_score = 15
+            distance_score = weights.DISTANCE_UNKNOWN
             breakdown["distance_km"] = None
         
         breakdown["distance_score"] = distance_score
         total_score += distance_score
         
         # 3. Reliability (20 points)
-        reliability_score = volunteer.reliability_score * 20
+        reliability_score = volunteer.reliability_score * weights.RELIABILITY_WEIGHT
         breakdown["reliability"] = round(volunteer.reliability_score, 2)
         total_score += reliability_score
         
         # 4. Availability (10 points)
-        availability_score = 10 if volunteer.availability else 0
+        availability_score = weights.AVAILABILITY_POINTS if volunteer.availability else 0
         breakdown["available"] = volunteer.availability
         total_score += availability_score
         
@@ -213,10 +205,11 @@ async def register_volunteer(volunteer: Dict, token: str = Header(None)):
         Process:
         1. Get crisis details
         2. Generate appropriate tasks
-        3. Find available volunteers
-        4. Score all volunteers for each task
-        5. Assign best matches
-        6. Record metrics
+        3. Find available volunteers (one radius search for all tasks)
+        4. Score every task x volunteer pair in one matrix
+        5. Solve the assignment globally (no double booking)
+        6. Commit tasks and assignments once; notifications and metrics
+           go to the dispatch queue
         
         Returns: List of assignments
         """
@@ -231,11 +224,191 @@ async def register_volunteer(volunteer: Dict, token: str = Header(None)):
             logger.error(f"Crisis {crisis_id} not found")
             return []
         
-        # Generate tasks
-        task_templates = self.generate_tasks_for_crisis(crisis)
-        assignments = []
+        try:
+            # Generate tasks
+            tasks = self._create_crisis_tasks(crisis, commit=False)
+            
+            # Find volunteers (with distances) in the in-memory pool
+            candidates = self.volunteer_pool.snapshot(self.db).within_radius(
+                latitude=crisis.latitude,
+                longitude=crisis.longitude,
+                max_distance_km=self.max_search_radius_km,
+                available_for_hours=self.availability_window_hours
+            )
+            
+            matches = self.solve_assignments(tasks, candidates)
+            assignments = [
+                self._commit_assignment(task, volunteer, distance_km, crisis, commit=False)
+                for task, volunteer, distance_km in matches
+            ]
+            deployed = [self._deployment(task, volunteer) for task, volunteer, _ in matches]
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        self._track_deployments(deployed)
+        
+        matched_tasks = {a["task_id"] for a in assignments}
+        for task in tasks:
+            if task.id not in matched_tasks:
+                logger.warning(f"⚠️ No volunteers available for {task.title}")
+        
+        self.dispatch_queue.publish(self.db, assignments, {crisis.id: crisis})
+        
+        return assignments
+    
+    # ============= BATCH ALLOCATION =============
+    
+    def allocate_open_crises(
+        self,
+        crisis_ids: Optional[List[str]] = None,
+        max_active_tasks: int = 1
+    ) -> Dict:
+        """
+        Joint allocation across every open crisis
+        
+        Process:
+        1. Load open crises (or the given ids, unless closed) and rank
+           them with PriorityEngine.batch_prioritize
+        2. Collect their unfilled tasks, generating tasks for crises that
+           have none yet
+        3. Build one shared candidate set from the volunteer pool; busy
+           volunteers keep max_active_tasks - active slots
+        4. Solve a single assignment, weighting each task by crisis rank
+        5. Commit tasks and assignments in one transaction, then hand
+           notifications and metrics to the dispatch queue
+        
+        Concurrent crises no longer race for volunteers in arrival order.
+        """
+        if not self.db:
+            raise Exception("Database session required")
+        
+        query = self.db.query(models.Crisis)
+        if crisis_ids:
+            # Explicit ids (e.g. freshly verified alerts) may carry a
+            # detection status; only finished crises are skipped
+            query = query.filter(
+                models.Crisis.id.in_(crisis_ids),
+                or_(models.Crisis.status.is_(None), models.Crisis.status.notin_(self.CLOSED_CRISIS_STATUSES))
+            )
+        else:
+            query = query.filter(models.Crisis.status.in_(self.OPEN_CRISIS_STATUSES))
+        crises = {c.id: c for c in query.all()}
+        
+        if not crises:
+            return {"crises": [], "assignments": [], "unfilled_tasks": []}
+        
+        ranked = self.priority_engine.batch_prioritize([
+            {
+                "id": c.id,
+                "crisis_type": c.crisis_type,
+                "timestamp": c.created_at,
+                "trust_score": c.trust_score
+            }
+            for c in crises.values()
+        ])
+        crisis_priority = {entry["id"]: entry["calculated_priority"] for entry in ranked}
+        
+        # Unfilled tasks and which crises already have tasks (two queries)
+        pending = {}
+        for task in self.db.query(models.Task).filter(
+            models.Task.crisis_id.in_(list(crises)),
+            models.Task.status == "pending"
+        ).order_by(models.Task.priority.desc()).all():
+            pending.setdefault(task.crisis_id, []).append(task)
+        with_tasks = {
+            row[0] for row in self.db.query(models.Task.crisis_id).filter(
+                models.Task.crisis_id.in_(list(crises))
+            ).distinct()
+        }
+        
+        try:
+            tasks, task_priority = [], []
+            for entry in ranked:
+                crisis = crises[entry["id"]]
+                if crisis.id in with_tasks:
+                    crisis_tasks = pending.get(crisis.id, [])
+                else:
+                    crisis_tasks = self._create_crisis_tasks(crisis, commit=False)
+                for task in crisis_tasks:
+                    tasks.append(task)
+                    # Crisis rank x task priority, back on the 1-10 scale
+                    task_priority.append(crisis_priority[crisis.id] * (task.priority or 5) / 10)
+            
+            # Shared candidate set: union of every crisis's radius search
+            snapshot = self.volunteer_pool.snapshot(self.db)
+            volunteers = {}
+            for entry in ranked:
+                crisis = crises[entry["id"]]
+                for volunteer, _ in snapshot.within_radius(
+                    crisis.latitude, crisis.longitude, self.max_search_radius_km,
+                    available_for_hours=self.availability_window_hours
+                ):
+                    volunteers.setdefault(volunteer.id, volunteer)
+            
+            matches = []
+            if tasks and volunteers:
+                records = list(volunteers.values())
+                origin = (tasks[0].latitude, tasks[0].longitude)
+                origin_distances = haversine_distances(
+                    origin[0], origin[1],
+                    [v.latitude for v in records],
+                    [v.longitude for v in records]
+                ) if None not in origin else np.full(len(records), np.nan)
+                capacity = [
+                    max(0, max_active_tasks - int(snapshot.active_tasks[snapshot.index[v.id]]))
+                    for v in records
+                ]
+                matches = self.solve_assignments(
+                    tasks,
+                    list(zip(records, origin_distances.tolist())),
+                    task_priority=task_priority,
+                    candidate_capacity=capacity
+                )
+            
+            assignments = [
+                self._commit_assignment(task, volunteer, distance_km, crises[task.crisis_id], commit=False)
+                for task, volunteer, distance_km in matches
+            ]
+            deployed = [self._deployment(task, volunteer) for task, volunteer, _ in matches]
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        self._track_deployments(deployed)
+        
+        self.dispatch_queue.publish(self.db, assignments, crises)
+        
+        matched_tasks = {a["task_id"] for a in assignments}
+        unfilled = [
+            {"task_id": t.id, "task_title": t.title, "crisis_id": t.crisis_id}
+            for t in tasks if t.id not in matched_tasks
+        ]
+        
+        logger.info(
+            f" [Resource Agent V2] Batch allocation: {len(crises)} crises, "
+            f"{len(tasks)} tasks, {len(assignments)} assigned, {len(unfilled)} unfilled"
+        )
         
-        for template in task_templates:
+        return {
+            "crises": [
+                {
+                    "crisis_id": entry["id"],
+                    "priority": entry["calculated_priority"],
+                    "priority_label": entry["priority_label"],
+                    "assigned": sum(1 for a in assignments if a["crisis_id"] == entry["id"])
+                }
+                for entry in ranked
+            ],
+            "assignments": assignments,
+            "unfilled_tasks": unfilled
+        }
+    
+    def _create_crisis_tasks(self, crisis: models.Crisis, commit: bool = True) -> List[models.Task]:
+        """Create the template tasks for a crisis"""
+        tasks = []
+        
+        for template in self.generate_tasks_for_crisis(crisis):
             # Create task in database
             task = crud.create_task(
                 self.db,
@@ -246,92 +419,124 @@ async def register_volunteer(volunteer: Dict, token: str = Header(None)):
                 description=f"Auto-generated for {crisis.crisis_type} crisis",
                 latitude=crisis.latitude,
                 longitude=crisis.longitude,
-                priority=template.get("priority", 5)
+                priority=template.get("priority", 5),
+                commit=commit
             )
+            tasks.append(task)
             
             logger.info(f" Created task: {task.title}")
-            
-            # Find volunteers
-            volunteers = crud.get_available_volunteers(
-                self.db,
-                latitude=crisis.latitude,
-                longitude=crisis.longitude,
-                required_skill=template.get("skill"),
-                max_distance_km=self.max_search_radius_km
-            )
-            
-            if not volunteers:
-                logger.warning(f"⚠️ No volunteers available for {task.title}")
+        
+        return tasks
+    
+    def solve_assignments(
+        self,
+        tasks: List[models.Task],
+        candidates: List[Tuple[VolunteerRecord, float]],
+        task_priority: Optional[List[float]] = None,
+        candidate_capacity: Optional[List[int]] = None
+    ) -> List[Tuple[models.Task, VolunteerRecord, float]]:
+        """
+        Jointly assign tasks to (volunteer, distance_km) candidates
+        
+        Scores every pair in one matrix and solves it as an assignment
+        problem, so each volunteer gets at most candidate_capacity tasks
+        (default one) and contested volunteers go where they add the most
+        (weighted by task priority). Candidate distances are measured from
+        the first task's location; other task locations are computed once each.
+        """
+        if not tasks or not candidates:
+            return []
+        
+        volunteers = [v for v, _ in candidates]
+        vol_lats = np.array([np.nan if v.latitude is None else v.latitude for v in volunteers], dtype=np.float64)
+        vol_lons = np.array([np.nan if v.longitude is None else v.longitude for v in volunteers], dtype=np.float64)
+        by_location = {
+            (tasks[0].latitude, tasks[0].longitude): np.array([d for _, d in candidates], dtype=np.float64)
+        }
+        
+        distances = np.empty((len(tasks), len(volunteers)))
+        for i, task in enumerate(tasks):
+            if task.latitude is None or task.longitude is None:
+                distances[i] = np.nan
                 continue
-            
-            # Score all volunteers
-            scored_volunteers = []
-            for volunteer in volunteers:
-                score, breakdown = self.score_volunteer(volunteer, task, crisis)
-                scored_volunteers.append({
-                    "volunteer": volunteer,
-                    "score": score,
-                    "breakdown": breakdown
-                })
-            
-            # Sort by score
-            scored_volunteers.sort(key=lambda x: x["score"], reverse=True)
-            
-            # Assign to best volunteer
-            best = scored_volunteers[0]
-            volunteer = best["volunteer"]
-            
-            crud.assign_task(self.db, task.id, volunteer.id)
-            
-            # Calculate ETA
-            distance = best["breakdown"].get("distance_km", 0) or 0
-            eta = self.calculate_eta(distance, crisis.severity)
-            
-            # Record performance metric
-            crud.record_metric(
-                self.db,
-                entity_type="task",
-                entity_id=task.id,
-                metric_type="assignment_score",
-                metric_value=best["score"],
-                crisis_id=crisis.id,
-                task_id=task.id,
-                metadata=best["breakdown"]
-            )
-            
-            logger.info(
-                f" Assigned {volunteer.name} to {task.title} "
-                f"(score: {best['score']}, ETA: {eta}min)"
-            )
-            
-            assignment = {
-                "task_id": task.id,
-                "task_title": task.title,
-                "task_type": task.task_type,
-                "volunteer_id": volunteer.id,
-                "volunteer_name": volunteer.name,
-                "volunteer_phone": volunteer.phone,
-                "score": best["score"],
-                "breakdown": best["breakdown"],
-                "eta_minutes": eta,
-                "priority": task.priority
-            }
-            
-            assignments.append(assignment)
-            
-            # Notify volunteer
-            try:
-                notify({
-                    "type": "task_assignment",
-                    "volunteer": volunteer.name,
-                    "task": task.title,
-                    "crisis": crisis.title,
-                    "eta": eta
-                })
-            except Exception as e:
-                logger.warning(f"Notification failed: {e}")
+            location = (task.latitude, task.longitude)
+            if location not in by_location:
+                by_location[location] = haversine_distances(task.latitude, task.longitude, vol_lats, vol_lons)
+            distances[i] = by_location[location]
+        
+        scores, feasible = self.assignment_solver.score_matrix(
+            task_skills=[t.required_skill for t in tasks],
+            candidate_skills=[v.skills or [] for v in volunteers],
+            distances=distances,
+            reliability=[v.reliability_score if v.reliability_score is not None else 1.0 for v in volunteers],
+            available=[bool(v.availability) for v in volunteers]
+        )
         
-        return assignments
+        pairs = self.assignment_solver.solve(
+            scores,
+            feasible,
+            task_priority=task_priority or [t.priority or 5 for t in tasks],
+            candidate_capacity=candidate_capacity
+        )
+        
+        return [
+            (tasks[i], volunteers[j], None if np.isnan(distances[i, j]) else float(distances[i, j]))
+            for i, j in pairs
+        ]
+    
+    def _commit_assignment(
+        self,
+        task: models.Task,
+        volunteer: VolunteerRecord,
+        distance_km: Optional[float],
+        crisis: models.Crisis,
+        commit: bool = True
+    ) -> Dict:
+        """Persist one solved match (its metric is written by the dispatch queue)"""
+        score, breakdown = self.score_volunteer(volunteer, task, crisis, distance_km)
+        
+        crud.assign_task(self.db, task.id, volunteer.id, commit=commit)
+        
+        # Calculate ETA (road network when available)
+        distance = breakdown.get("distance_km", 0) or 0
+        eta = self.calculate_eta(distance, crisis.severity, self._road_minutes(volunteer, task))
+        
+        logger.info(
+            f" Assigned {volunteer.name} to {task.title} "
+            f"(score: {score}, ETA: {eta}min)"
+        )
+        
+        return {
+            "task_id": task.id,
+            "task_title": task.title,
+            "task_type": task.task_type,
+            "crisis_id": crisis.id,
+            "volunteer_id": volunteer.id,
+            "volunteer_name": volunteer.name,
+            "volunteer_phone": volunteer.phone,
+            "score": score,
+            "breakdown": breakdown,
+            "eta_minutes": eta,
+            "priority": task.priority
+        }
+    
+    def _deployment(self, task: models.Task, volunteer: VolunteerRecord) -> Dict:
+        """Preemption-index entry for a match (read before commit expires the task)"""
+        return deployment(volunteer.id, task.id, task.crisis_id, task.latitude, task.longitude, task.priority)
+    
+    def _track_deployments(self, deployed: List[Dict]):
+        """Index committed assignments so preemption lookups see them"""
+        for asset in deployed:
+            self.reassignment_engine.track(asset, is_resource=False)
+    
+    def _road_minutes(self, volunteer: VolunteerRecord, task: models.Task) -> Optional[float]:
+        """Volunteer -> task travel time on the road graph, if one is loaded"""
+        road_network = self.geo_optimizer.road_network
+        if road_network is None or None in (volunteer.latitude, volunteer.longitude, task.latitude, task.longitude):
+            return None
+        # Many-to-one from the task, so its Dijkstra is shared by every volunteer
+        minutes = road_network.travel_times_to(task.latitude, task.longitude, [volunteer.latitude], [volunteer.longitude])[0]
+        return None if np.isnan(minutes) else float(minutes)
     
     
     # ============= REASSIGNMENT =============
@@ -375,34 +580,37 @@ async def register_volunteer(volunteer: Dict, token: str = Header(None)):
         task.volunteer_id = None
         task.status = "pending"
         self.db.commit()
+        if old_volunteer_id:
+            self.reassignment_engine.release(old_volunteer_id, is_resource=False, task_id=task.id)
         
-        # Find alternative volunteers
+        # Find alternative volunteers, excluding the one who failed
+        # (the pool already reflects the commits above)
         crisis = crud.get_crisis_by_id(self.db, task.crisis_id)
-        volunteers = crud.get_available_volunteers(
-            self.db,
+        volunteers = self.volunteer_pool.snapshot(self.db).within_radius(
             latitude=task.latitude or crisis.latitude,
             longitude=task.longitude or crisis.longitude,
+            max_distance_km=self.max_search_radius_km,
             required_skill=task.required_skill,
-            max_distance_km=self.max_search_radius_km
+            exclude=[old_volunteer_id] if old_volunteer_id else (),
+            available_for_hours=self.availability_window_hours
         )
         
-        # Exclude failed volunteer
-        volunteers = [v for v in volunteers if v.id != old_volunteer_id]
-        
         if not volunteers:
             logger.warning(f" No alternative volunteers for task {task_id}")
             return None
         
         # Score and assign
         scored = []
-        for v in volunteers:
-            score, breakdown = self.score_volunteer(v, task, crisis)
+        for v, distance_km in volunteers:
+            score, breakdown = self.score_volunteer(v, task, crisis, distance_km)
             scored.append({"volunteer": v, "score": score, "breakdown": breakdown})
         
         scored.sort(key=lambda x: x["score"], reverse=True)
         best = scored[0]
         
+        deployed = self._deployment(task, best["volunteer"])
         crud.assign_task(self.db, task.id, best["volunteer"].id)
+        self._track_deployments([deployed])
         
         logger.info(f" Reassigned to {best['volunteer'].name} (score: {best['score']})")
         
@@ -416,6 +624,21 @@ async def register_volunteer(volunteer: Dict, token: str = Header(None)):
         }
 
 
+# ============= MODULE-LEVEL AGENT =============
+# Session-less agent for callers outside a request (e.g. the trust agent);
+# built on first use rather than at import time.
+_agent = None
+
+
+def __getattr__(name):
+    global _agent
+    if name == 'agent':
+        if _agent is None:
+            _agent = ResourceAgent()
+        return _agent
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # ============= API ENDPOINTS =============
 
 # Create global agent (will be initialized per request with DB session)
@@ -449,6 +672,31 @@ async def allocate_resources(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/allocate/batch")
+async def allocate_open_crises(
+    crisis_ids: Optional[List[str]] = Query(None),
+    max_active_tasks: int = 1,
+    token: str = Header(...),
+    agent: ResourceAgent = Depends(get_agent)
+):
+    """
+    Jointly allocate volunteers across all open crises (or the given ids)
+    """
+    require_role(token, ["authority", "ngo"])
+    
+    try:
+        result = agent.allocate_open_crises(crisis_ids, max_active_tasks)
+        
+        return {
+            "status": "success",
+            "assignments_count": len(result["assignments"]),
+            **result
+        }
+    except Exception as e:
+        logger.error(f"Batch allocation failed: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @router.post("/reassign/{task_id}")
 async def reassign_task(
     task_id: int,
@@ -477,15 +725,13 @@ async def reassign_task(
 
 
 @router.get("/volunteer/tasks/{volunteer_id}")
-async def get_volunteer_tasks(volunteer_id: str, token: str = Header(None)):
+async def get_volunteer_tasks(
+    volunteer_id: str,
+    token: str = Header(None),
+    db: Session = Depends(get_db)
+):
     # Allow anonymous access in dev/demo mode. In production, enforce role checks:
     # require_role(token, ["volunteer"])
-
-    try:
-        with open('data/assignments_log.json', 'r') as f:
-            assignments = json.load(f)
-    except FileNotFoundError:
-        assignments = []
     
     tasks = crud.get_tasks_by_volunteer(db, volunteer_id)
     
@@ -516,19 +762,33 @@ async def get_volunteer_tasks(volunteer_id: str, token: str = Header(None)):
     return {"status": "success", "tasks": result}
 
 @router.get("/volunteer/profile/{volunteer_id}")
-async def get_volunteer_profile(volunteer_id: str, token: str = Header(None)):
+async def get_volunteer_profile(
+    volunteer_id: str,
+    token: str = Header(None),
+    db: Session = Depends(get_db)
+):
     # Allow anonymous access in dev/demo mode. In production, enforce role checks:
     # require_role(token, ["volunteer"])
 
-    try:
-        volunteer = next((v for v in agent.volunteers if v['id'] == volunteer_id), None)
-        
-        if not volunteer:
-            raise HTTPException(status_code=404, detail="Volunteer not found")
-        
-        return {"status": "success", "volunteer": volunteer}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    volunteer = crud.get_volunteer_by_id(db, volunteer_id)
+    if not volunteer:
+        raise HTTPException(status_code=404, detail="Volunteer not found")
+    
+    return {
+        "status": "success",
+        "volunteer": {
+            "id": volunteer.id,
+            "name": volunteer.name,
+            "phone": volunteer.phone,
+            "skills": volunteer.skills,
+            "availability": volunteer.availability,
+            "reliability_score": volunteer.reliability_score,
+            "location": {
+                "latitude": volunteer.latitude,
+                "longitude": volunteer.longitude
+            }
+        }
+    }
 
 @router.put("/volunteer/profile/{volunteer_id}")
 async def update_volunteer_profile(
@@ -548,7 +808,7 @@ async def update_volunteer_profile(
     if "name" in updates:
         volunteer.name = updates["name"]
     if "skills" in updates:
-        volunteer.skills = updates["skills"]
+        crud.set_volunteer_skills(db, volunteer, updates["skills"])
     if "availability" in updates:
         volunteer.availability = updates["availability"]
     if "latitude" in updates:
@@ -592,7 +852,7 @@ async def get_resource_status(
     
     available_volunteers = db.query(func.count(models.User.id)).filter(
         models.User.role == "volunteer",
-        models.User.availability == True
+        crud.available_during()
     ).scalar()
     
     # Count active tasks
@@ -609,7 +869,10 @@ async def get_resource_status(
         },
         "tasks": {
             "active": active_tasks
-        }
+        },
+        "volunteer_pool": volunteer_pool.get_statistics(),
+        "dispatch_queue": dispatch_queue.get_statistics(),
+        "coverage": coverage_engine.get_statistics()
     }
 
 
@@ -629,6 +892,10 @@ async def update_task_status(
     if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
+    # A finished task no longer holds its volunteer (for preemption)
+    if status not in ACTIVE_TASK_STATUSES and task.volunteer_id:
+        ReassignmentEngine().release(task.volunteer_id, is_resource=False, task_id=task.id)
+    
     # If task completed successfully, reward volunteer
     if status == "completed" and task.volunteer_id:
         volunteer = crud.get_user_by_id(db, task.volunteer_id)
@@ -4,6 +4,9 @@ from .cross_verification import CrossVerifier
 from .duplicate_detector import DuplicateDetector
 from .source_reputation import ReputationManager
 from .rate_limiter import RateLimiter
+from .verification_cache import VerificationCache
+from .retention import TrustRetention
+from .state_backend import InMemoryStateBackend, SQLiteStateBackend, get_state_backend
 
 try:
     from .database import TrustDatabase
@@ -17,5 +20,10 @@ __all__ = [
     'CrossVerifier',
     'DuplicateDetector',
     'ReputationManager',
-    'RateLimiter'
+    'RateLimiter',
+    'VerificationCache',
+    'TrustRetention',
+    'InMemoryStateBackend',
+    'SQLiteStateBackend',
+    'get_state_backend'
 ]
\ No newline at end of file
@@ -0,0 +1,41 @@
+import copy
+import json
+import os
+import threading
+from typing import Dict
+
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), 'trust_thresholds.json')
+
+_config_cache: Dict[str, Dict] = {}
+_config_lock = threading.Lock()
+
+
+def load_trust_config(config_path: str = None) -> Dict:
+    """
+    Load trust_thresholds.json once per process
+
+    Every trust component used to open and parse the file in its own
+    __init__, so one TrustAgent read it four times. The parsed file is now
+    cached per path and each caller gets its own deep copy, so components
+    that tweak their weights or limits at runtime don't leak into each other.
+    """
+    path = os.path.abspath(config_path or CONFIG_PATH)
+
+    config = _config_cache.get(path)
+    if config is None:
+        with _config_lock:
+            config = _config_cache.get(path)
+            if config is None:
+                with open(path, 'r') as f:
+                    config = json.load(f)
+                _config_cache[path] = config
+
+    return copy.deepcopy(config)
+
+
+def reload_trust_config(config_path: str = None) -> Dict:
+    """Drop the cached copy and read the file again (after editing thresholds)"""
+    path = os.path.abspath(config_path or CONFIG_PATH)
+    with _config_lock:
+        _config_cache.pop(path, None)
+    return load_trust_config(path)
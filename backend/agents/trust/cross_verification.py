@@ -1,9 +1,8 @@
-import json
-import os
 import math
 import hashlib
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
+from .config_loader import load_trust_config
 
 class CrossVerifier:
     """
@@ -18,9 +17,7 @@ class CrossVerifier:
     """
  
     def __init__(self, data_handler=None):
-        config_path = os.path.join(os.path.dirname(__file__), 'trust_thresholds.json')
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        config = load_trust_config()
         
         self.config = config.get('cross_verification', {})
         
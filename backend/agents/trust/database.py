@@ -3,15 +3,34 @@ from datetime import datetime, timedelta
 from typing import Optional, List, Dict
 import json
 import os
+import threading
+
+from .retention import SUMMARY_TABLE
 
 class TrustDatabase:
     """SQLite database for Trust Agent"""
+
+    # Schema is created once per database file per process; every later
+    # TrustDatabase on the same path skips the CREATE TABLE round trip.
+    _initialized_paths = set()
+    _init_lock = threading.Lock()
     
     def __init__(self, db_path: str = None):
         if db_path is None:
             db_path = os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'crisisnet.db')
         self.db_path = db_path
-        self.init_database()
+        self._ensure_schema()
+
+    def _ensure_schema(self):
+        """Run init_database() only the first time this path is opened"""
+        key = os.path.abspath(self.db_path)
+        if key in TrustDatabase._initialized_paths:
+            return
+        with TrustDatabase._init_lock:
+            if key in TrustDatabase._initialized_paths:
+                return
+            self.init_database()
+            TrustDatabase._initialized_paths.add(key)
     
     def get_connection(self):
         """Create database connection"""
@@ -354,8 +373,9 @@ class TrustDatabase:
         conn.commit()
         conn.close()
 
-    def get_agent_performance_history(self, agent_type: str, days: int = 30) -> List[Dict]:
-        """Get agent performance history"""
+    def get_agent_performance_history(self, agent_type: str, days: int = 30,
+                                      limit: Optional[int] = None) -> List[Dict]:
+        """Get agent performance history (raw rows, newest first)"""
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute("""
@@ -363,28 +383,49 @@ class TrustDatabase:
             WHERE agent_type = ? 
             AND timestamp > datetime('now', '-' || ? || ' days')
             ORDER BY timestamp DESC
-        """, (agent_type, days))
+            LIMIT ?
+        """, (agent_type, days, -1 if limit is None else limit))
         rows = cursor.fetchall()
         conn.close()
         return [dict(row) for row in rows]
 
-    def calculate_agent_success_rate(self, agent_type: str, days: int = 7) -> float:
-        """Calculate agent success rate over time period"""
+    def get_agent_performance_totals(self, agent_type: str, days: int = 7) -> Dict:
+        """
+        Task and success counts over the last `days`: raw rows plus the
+        daily summaries that retention rolled older rows into (whole days)
+        """
         conn = self.get_connection()
         cursor = conn.cursor()
         cursor.execute("""
             SELECT 
                 COUNT(*) as total,
-                SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END) as successes
+                COALESCE(SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END), 0) as successes
             FROM agent_performance 
             WHERE agent_type = ? 
             AND timestamp > datetime('now', '-' || ? || ' days')
         """, (agent_type, days))
         row = cursor.fetchone()
+        totals = {'total': row['total'], 'successes': row['successes']}
+        try:
+            cursor.execute(f"""
+                SELECT COALESCE(SUM(total), 0) as total, COALESCE(SUM(successes), 0) as successes
+                FROM {SUMMARY_TABLE}
+                WHERE agent_type = ?
+                AND day >= date('now', '-' || ? || ' days')
+            """, (agent_type, days))
+            row = cursor.fetchone()
+            totals['total'] += row['total']
+            totals['successes'] += row['successes']
+        except sqlite3.OperationalError:
+            pass  # retention has not run yet, so there are no summaries
         conn.close()
-        
-        if row and row['total'] > 0:
-            return row['successes'] / row['total']
+        return totals
+
+    def calculate_agent_success_rate(self, agent_type: str, days: int = 7) -> float:
+        """Calculate agent success rate over time period"""
+        totals = self.get_agent_performance_totals(agent_type, days)
+        if totals['total'] > 0:
+            return totals['successes'] / totals['total']
         return 0.5  # Default neutral score
 
     def save_source_reputation(self, source_type: str, source_id: str, 
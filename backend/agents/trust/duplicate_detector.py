@@ -2,25 +2,70 @@ from datetime import datetime, timedelta
 from typing import List, Dict
 import hashlib
 
+from .state_backend import get_state_backend
+
+STREAM = 'duplicate_reports'
+
+
 class DuplicateDetector:
     
-    def __init__(self):
-        self.recent_reports: List[Dict] = []
+    def __init__(self, state=None):
+        # Recent reports live in the state backend so every worker sees them
+        self.state = state or get_state_backend()
         self.max_history = 100
         self.similarity_window_hours = 2
     
+    @property
+    def recent_reports(self) -> List[Dict]:
+        """Reports still inside the cleanup window, oldest first"""
+        cutoff = datetime.now() - timedelta(hours=self.similarity_window_hours * 2)
+        return self._load_reports(cutoff)
+    
+    def _load_reports(self, since: datetime) -> List[Dict]:
+        reports = self.state.read(STREAM, since=since.timestamp())
+        for report in reports:
+            report['timestamp'] = datetime.fromtimestamp(report['ts'])
+        return reports
+    
     def check_duplicate(self, alert: Dict) -> tuple:
         """Check if alert is duplicate"""
+        # One read covers all three checks (the widest window is the similarity one)
+        reports = self._load_reports(datetime.now() - timedelta(hours=self.similarity_window_hours))
+        return self._classify(alert, self._create_fingerprint(alert), reports)
+
+    def check_and_record(self, alert: Dict) -> tuple:
+        """
+        check_duplicate + record_report as one atomic step: the report is
+        stored unless it is a duplicate, and a concurrent worker handling
+        the same report sees it
+        """
         fingerprint = self._create_fingerprint(alert)
-  
-        if self._find_exact_match(fingerprint, alert.get('user_id')):
+        now = datetime.now()
+
+        def check(reports):
+            for report in reports:
+                report['timestamp'] = datetime.fromtimestamp(report['ts'])
+            verdict = self._classify(alert, fingerprint, reports)
+            return not verdict[0], verdict
+
+        verdict = self.state.check_and_append(
+            STREAM, self._report_record(alert, fingerprint), check,
+            since=(now - timedelta(hours=self.similarity_window_hours)).timestamp(),
+            ts=now.timestamp()
+        )
+        if not verdict[0]:
+            self._cleanup_old_reports()
+        return verdict
+
+    def _classify(self, alert: Dict, fingerprint: str, reports: List[Dict]) -> tuple:
+        if self._find_exact_match(fingerprint, alert.get('user_id'), reports):
             return True, 0.8, "Exact duplicate from same user"
  
-        similarity = self._check_user_repetition(alert)
+        similarity = self._check_user_repetition(alert, reports)
         if similarity > 0.7:
             return True, 0.6, "Very similar to recent report"
         
-        flooding = self._check_flooding_pattern(alert)
+        flooding = self._check_flooding_pattern(alert, reports)
         if flooding > 0.8:
             return False, -0.2, "Multiple sources confirming"
         
@@ -28,44 +73,41 @@ class DuplicateDetector:
     
     def record_report(self, alert: Dict):
         """Store report for future checks"""
-        report_record = {
-            'fingerprint': self._create_fingerprint(alert),
+        report_record = self._report_record(alert, self._create_fingerprint(alert))
+        self.state.append(STREAM, report_record, ts=datetime.now().timestamp())
+        self._cleanup_old_reports()
+
+    def _report_record(self, alert: Dict, fingerprint: str) -> Dict:
+        return {
+            'fingerprint': fingerprint,
             'user_id': alert.get('user_id'),
             'crisis_type': alert.get('crisis_type'),
             'location': alert.get('location'),
-            'timestamp': datetime.now(),
             'message': alert.get('message', '')[:100]
         }
-        
-        self.recent_reports.append(report_record)
-        
-        if len(self.recent_reports) > self.max_history:
-            self.recent_reports.pop(0)
-        
-        self._cleanup_old_reports()
     
     def _create_fingerprint(self, alert: Dict) -> str:
         """Create unique hash for alert"""
         content = f"{alert.get('crisis_type', '')}|{alert.get('location', '')}|{alert.get('message', '')}"
         return hashlib.md5(content.encode()).hexdigest()
     
-    def _find_exact_match(self, fingerprint: str, user_id: str) -> bool:
+    def _find_exact_match(self, fingerprint: str, user_id: str, reports: List[Dict]) -> bool:
         """Check exact match from same user"""
         cutoff = datetime.now() - timedelta(hours=self.similarity_window_hours)
         
-        for report in self.recent_reports:
+        for report in reports:
             if (report['fingerprint'] == fingerprint and 
                 report['user_id'] == user_id and
                 report['timestamp'] > cutoff):
                 return True
         return False
     
-    def _check_user_repetition(self, alert: Dict) -> float:
+    def _check_user_repetition(self, alert: Dict, reports: List[Dict]) -> float:
         """Check similarity to user's recent reports"""
         user_id = alert.get('user_id')
         cutoff = datetime.now() - timedelta(hours=self.similarity_window_hours)
         
-        user_reports = [r for r in self.recent_reports 
+        user_reports = [r for r in reports 
                        if r['user_id'] == user_id and r['timestamp'] > cutoff]
         
         if not user_reports:
@@ -83,11 +125,11 @@ class DuplicateDetector:
         
         return similar_count / len(user_reports) if user_reports else 0.0
     
-    def _check_flooding_pattern(self, alert: Dict) -> float:
+    def _check_flooding_pattern(self, alert: Dict, reports: List[Dict]) -> float:
         """Check if many reports about same crisis (good sign)"""
         cutoff = datetime.now() - timedelta(minutes=30)
         
-        similar = [r for r in self.recent_reports
+        similar = [r for r in reports
                   if (r['crisis_type'] == alert.get('crisis_type') and
                       r['location'] == alert.get('location') and
                       r['timestamp'] > cutoff and
@@ -98,11 +140,12 @@ class DuplicateDetector:
     def _cleanup_old_reports(self):
         """Remove old reports"""
         cutoff = datetime.now() - timedelta(hours=self.similarity_window_hours * 2)
-        self.recent_reports = [r for r in self.recent_reports if r['timestamp'] > cutoff]
+        self.state.trim(STREAM, before=cutoff.timestamp(), keep_last=self.max_history)
     
     def get_statistics(self) -> Dict:
         """Get detector statistics"""
         return {
-            'total_reports_tracked': len(self.recent_reports),
-            'window_hours': self.similarity_window_hours
+            'total_reports_tracked': self.state.count(STREAM),
+            'window_hours': self.similarity_window_hours,
+            'state_backend': self.state.name
         }
\ No newline at end of file
@@ -3,27 +3,63 @@ import os
 from datetime import datetime, timedelta
 from typing import Optional, List, Dict
 
+from .state_backend import get_state_backend
+
+# State backend namespaces/streams for the runtime stores
+REPUTATION_NS = 'json_user_reputation'
+BLOCKED_NS = 'json_blocked_users'
+REPUTATION_HISTORY = 'json_reputation_history'
+ALERT_HISTORY = 'json_alert_history'
+RATE_LIMITS = 'json_rate_limits'
+
+
 class JsonDataHandler:
     
-    def __init__(self, mock_alerts_path: str = None):
+    def __init__(self, mock_alerts_path: str = None, state=None):
         if mock_alerts_path is None:
             mock_alerts_path = os.path.join(os.path.dirname(__file__), 'mock_alerts.json')
         
         self.mock_alerts_path = mock_alerts_path
         self.load_mock_data()
         
-        # In-memory storage for runtime data
-        self.user_reputation = {}
-        self.reputation_history = []
-        self.alert_history = []
-        self.rate_limits = []
-        self.blocked_users = {}
+        # Runtime data lives in the state backend (in-process by default,
+        # shared SQLite when several workers serve JSON mode)
+        self.state = state or get_state_backend()
         
         # Initialize user reputations from mock data
         self._init_user_reputations()
         
         print("JSON Data Handler initialized (mock_alerts.json)")
     
+    # ---------- STORE VIEWS ----------
+    
+    @property
+    def user_reputation(self) -> Dict[str, Dict]:
+        return {u['user_id']: u for u in self.state.values(REPUTATION_NS)}
+    
+    @property
+    def blocked_users(self) -> Dict[str, Dict]:
+        return {b['user_id']: b for b in self.state.values(BLOCKED_NS)}
+    
+    @property
+    def reputation_history(self) -> List[Dict]:
+        return self._read(REPUTATION_HISTORY)
+    
+    @property
+    def alert_history(self) -> List[Dict]:
+        return self._read(ALERT_HISTORY)
+    
+    @property
+    def rate_limits(self) -> List[Dict]:
+        return self._read(RATE_LIMITS)
+    
+    def _read(self, stream: str, since: datetime = None, where: Dict = None) -> List[Dict]:
+        """Stream records with `timestamp` restored from the backend's ts"""
+        records = self.state.read(stream, since=since.timestamp() if since else None, where=where)
+        for record in records:
+            record['timestamp'] = datetime.fromtimestamp(record.pop('ts'))
+        return records
+    
     def load_mock_data(self):
         """Load mock alerts from JSON file"""
         try:
@@ -43,42 +79,31 @@ class JsonDataHandler:
         
         # Load trusted users
         for user in profiles.get('trusted_users', []):
-            self.user_reputation[user['user_id']] = {
-                'user_id': user['user_id'],
-                'reputation_score': user['reputation'],
-                'total_reports': user['total_reports'],
-                'accurate_reports': user['accurate_reports'],
-                'false_reports': user['false_reports'],
-                'last_updated': datetime.now(),
-                'created_at': datetime.fromisoformat(user['member_since'] + 'T00:00:00')
-            }
+            self._seed_reputation(user)
         
         # Load new users
         for user in profiles.get('new_users', []):
-            self.user_reputation[user['user_id']] = {
-                'user_id': user['user_id'],
-                'reputation_score': user['reputation'],
-                'total_reports': user['total_reports'],
-                'accurate_reports': user['accurate_reports'],
-                'false_reports': user['false_reports'],
-                'last_updated': datetime.now(),
-                'created_at': datetime.fromisoformat(user['member_since'] + 'T00:00:00')
-            }
+            self._seed_reputation(user)
         
         # Load suspicious users
         for user in profiles.get('suspicious_users', []):
-            self.user_reputation[user['user_id']] = {
-                'user_id': user['user_id'],
-                'reputation_score': user['reputation'],
-                'total_reports': user['total_reports'],
-                'accurate_reports': user['accurate_reports'],
-                'false_reports': user['false_reports'],
-                'last_updated': datetime.now(),
-                'created_at': datetime.fromisoformat(user['member_since'] + 'T00:00:00')
-            }
+            self._seed_reputation(user)
         
         print(f"Initialized {len(self.user_reputation)} user reputations from mock data")
     
+    def _seed_reputation(self, user: Dict):
+        """Seed a mock profile unless another worker already has live data for it"""
+        seed = {
+            'user_id': user['user_id'],
+            'reputation_score': user['reputation'],
+            'total_reports': user['total_reports'],
+            'accurate_reports': user['accurate_reports'],
+            'false_reports': user['false_reports'],
+            'last_updated': datetime.now().isoformat(),
+            'created_at': datetime.fromisoformat(user['member_since'] + 'T00:00:00').isoformat()
+        }
+        self.state.update(REPUTATION_NS, user['user_id'], lambda current: current or seed)
+    
     def get_connection(self):
         """Mock connection - returns None (compatibility with database interface)"""
         return None
@@ -89,51 +114,51 @@ class JsonDataHandler:
     
     def get_user_reputation(self, user_id: str) -> Optional[Dict]:
         """Get user's reputation data"""
-        return self.user_reputation.get(user_id)
+        return self.state.get(REPUTATION_NS, user_id)
     
     def create_user_reputation(self, user_id: str, initial_score: float = 0.5):
         """Create new user reputation entry"""
-        if user_id not in self.user_reputation:
-            self.user_reputation[user_id] = {
-                'user_id': user_id,
-                'reputation_score': float(initial_score),
-                'total_reports': 0,
-                'accurate_reports': 0,
-                'false_reports': 0,
-                'last_updated': datetime.now(),
-                'created_at': datetime.now()
-            }
+        now = datetime.now().isoformat()
+        self.state.update(REPUTATION_NS, user_id, lambda current: current or {
+            'user_id': user_id,
+            'reputation_score': float(initial_score),
+            'total_reports': 0,
+            'accurate_reports': 0,
+            'false_reports': 0,
+            'last_updated': now,
+            'created_at': now
+        })
     
     def update_user_reputation(self, user_id: str, new_score: float, was_accurate: bool, old_score: float):
         """Update user reputation based on accuracy"""
-        if user_id not in self.user_reputation:
+        if self.get_user_reputation(user_id) is None:
             self.create_user_reputation(user_id)
         
-        user = self.user_reputation[user_id]
-        user['reputation_score'] = float(new_score)
-        user['total_reports'] += 1
-        user['last_updated'] = datetime.now()
+        def apply(user: Dict) -> Dict:
+            user = dict(user)
+            user['reputation_score'] = float(new_score)
+            user['total_reports'] += 1
+            user['last_updated'] = datetime.now().isoformat()
+            
+            if was_accurate:
+                user['accurate_reports'] += 1
+            else:
+                user['false_reports'] += 1
+            return user
         
-        if was_accurate:
-            user['accurate_reports'] += 1
-        else:
-            user['false_reports'] += 1
+        self.state.update(REPUTATION_NS, user_id, apply)
         
         # Store history
-        self.reputation_history.append({
-            'id': len(self.reputation_history) + 1,
+        self.state.append(REPUTATION_HISTORY, {
             'user_id': user_id,
             'was_accurate': bool(was_accurate),
             'old_score': float(old_score),
-            'new_score': float(new_score),
-            'timestamp': datetime.now()
+            'new_score': float(new_score)
         })
     
     def save_alert(self, alert_data: Dict) -> int:
-        """Save alert to memory"""
-        alert_id = len(self.alert_history) + 1
-        alert = {
-            'id': alert_id,
+        """Save alert to the alert stream"""
+        return self.state.append(ALERT_HISTORY, {
             'user_id': alert_data['user_id'],
             'crisis_type': alert_data['crisis_type'],
             'location': alert_data['location'],
@@ -141,12 +166,9 @@ class JsonDataHandler:
             'longitude': alert_data.get('lon'),
             'message': alert_data.get('message', ''),
             'fingerprint': alert_data['fingerprint'],
-            'timestamp': datetime.now(),
             'verified': False,
             'trust_score': None
-        }
-        self.alert_history.append(alert)
-        return alert_id
+        })
     
     def find_similar_alerts(self, crisis_type: str, location: str, 
                            minutes: int = 30, exclude_user: str = None) -> List[Dict]:
@@ -154,63 +176,52 @@ class JsonDataHandler:
         cutoff = datetime.now() - timedelta(minutes=minutes)
         
         similar = []
-        for alert in self.alert_history:
-            if (alert['crisis_type'] == crisis_type and 
-                alert['location'] == location and
-                alert['timestamp'] > cutoff):
-                if exclude_user and alert['user_id'] == exclude_user:
-                    continue
-                similar.append(alert)
+        for alert in self._read(ALERT_HISTORY, since=cutoff,
+                                where={'crisis_type': crisis_type, 'location': location}):
+            if exclude_user and alert['user_id'] == exclude_user:
+                continue
+            similar.append(alert)
         
         return similar
     
     def record_activity(self, user_id: str):
         """Record user activity for rate limiting"""
-        self.rate_limits.append({
-            'id': len(self.rate_limits) + 1,
+        self.state.append(RATE_LIMITS, {
             'user_id': user_id,
-            'action_type': 'report',
-            'timestamp': datetime.now()
+            'action_type': 'report'
         })
     
     def get_user_activity(self, user_id: str, hours: int = 24) -> List[Dict]:
         """Get user's recent activity"""
         cutoff = datetime.now() - timedelta(hours=hours)
         
-        activities = []
-        for activity in self.rate_limits:
-            if activity['user_id'] == user_id and activity['timestamp'] > cutoff:
-                activity_copy = activity.copy()
-                activity_copy['timestamp'] = activity['timestamp'].isoformat()
-                activities.append(activity_copy)
+        activities = self._read(RATE_LIMITS, since=cutoff, where={'user_id': user_id})
+        for activity in activities:
+            activity['timestamp'] = activity['timestamp'].isoformat()
         
         return activities
     
     def is_user_blocked(self, user_id: str) -> tuple:
         """Check if user is currently blocked"""
-        if user_id in self.blocked_users:
-            blocked_until = self.blocked_users[user_id]['blocked_until']
-            if blocked_until > datetime.now():
-                return True, self.blocked_users[user_id]['reason']
+        blocked = self.state.get(BLOCKED_NS, user_id)
+        if blocked and datetime.fromisoformat(blocked['blocked_until']) > datetime.now():
+            return True, blocked['reason']
         
         return False, None
     
     def block_user(self, user_id: str, minutes: int, reason: str):
         """Block user temporarily"""
         blocked_until = datetime.now() + timedelta(minutes=minutes)
-        self.blocked_users[user_id] = {
+        self.state.set(BLOCKED_NS, user_id, {
             'user_id': user_id,
-            'blocked_until': blocked_until,
+            'blocked_until': blocked_until.isoformat(),
             'reason': reason or "No reason provided",
-            'created_at': datetime.now()
-        }
+            'created_at': datetime.now().isoformat()
+        })
     
     def get_reputation_history(self, user_id: str, limit: int = 10) -> list:
         """Get user's reputation change history"""
-        user_history = [
-            h for h in self.reputation_history 
-            if h['user_id'] == user_id
-        ]
+        user_history = self._read(REPUTATION_HISTORY, where={'user_id': user_id})
         sorted_history = sorted(user_history, key=lambda x: x['timestamp'], reverse=True)
         return sorted_history[:limit]
     
@@ -223,11 +234,12 @@ class JsonDataHandler:
         """Get system statistics"""
         return {
             'total_users': len(self.user_reputation),
-            'total_alerts': len(self.alert_history),
-            'total_activities': len(self.rate_limits),
+            'total_alerts': self.state.count(ALERT_HISTORY),
+            'total_activities': self.state.count(RATE_LIMITS),
             'blocked_users': len([u for u in self.blocked_users.values() 
-                                 if u['blocked_until'] > datetime.now()]),
-            'reputation_changes': len(self.reputation_history)
+                                 if datetime.fromisoformat(u['blocked_until']) > datetime.now()]),
+            'reputation_changes': self.state.count(REPUTATION_HISTORY),
+            'state_backend': self.state.name
         }
     
     def get_mock_scenarios(self) -> Dict:
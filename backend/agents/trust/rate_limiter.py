@@ -1,7 +1,10 @@
-import json
-import os
 from datetime import datetime, timedelta
 from typing import Tuple, Dict, List
+from .config_loader import load_trust_config
+from .state_backend import get_state_backend
+
+STATS_NAMESPACE = 'rate_limiter'
+STAT_KEYS = ('total_checks', 'blocked_attempts', 'warnings_issued')
 
 class RateLimiter:
     """
@@ -14,10 +17,8 @@ class RateLimiter:
     - Usage statistics tracking
     """
  
-    def __init__(self, data_handler=None):
-        config_path = os.path.join(os.path.dirname(__file__), 'trust_thresholds.json')
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+    def __init__(self, data_handler=None, state=None):
+        config = load_trust_config()
         
         # ROUND 2 FIX: Use 'rate_limiting' key from updated config
         self.limits = config.get('rate_limiting', config.get('rate_limits', {}))
@@ -41,12 +42,8 @@ class RateLimiter:
             self.db = data_handler
             self.db_mode = 'database' if hasattr(data_handler, 'save_agent_performance') else 'json'
         
-        # Statistics
-        self.stats = {
-            'total_checks': 0,
-            'blocked_attempts': 0,
-            'warnings_issued': 0
-        }
+        # Statistics are counters in the state backend, shared across workers
+        self.state = state or get_state_backend()
         
         print(f"RateLimiter initialized in {self.db_mode} mode")
     
@@ -57,12 +54,12 @@ class RateLimiter:
         Returns:
             (can_submit: bool, reason: str)
         """
-        self.stats['total_checks'] += 1
+        self._count('total_checks')
         
         # Step 1: Check if user is blocked
         is_blocked, reason = self.db.is_user_blocked(user_id)
         if is_blocked:
-            self.stats['blocked_attempts'] += 1
+            self._count('blocked_attempts')
             return False, f"Temporarily blocked: {reason}"
 
         # Step 2: Get recent activity
@@ -77,23 +74,31 @@ class RateLimiter:
         
         if reports_last_hour >= self.max_per_hour:
             self._apply_cooldown(user_id, 'hourly_limit')
-            self.stats['blocked_attempts'] += 1
+            self._count('blocked_attempts')
             return False, f"Hourly limit exceeded ({reports_last_hour}/{self.max_per_hour}). Please wait."
 
         # Step 4: Check daily limit
         if len(recent_activity) >= self.max_per_day:
             self._apply_cooldown(user_id, 'daily_limit')
-            self.stats['blocked_attempts'] += 1
+            self._count('blocked_attempts')
             return False, f"Daily limit reached ({len(recent_activity)}/{self.max_per_day}). Try tomorrow."
         
         # Step 5: Check for warnings
         warning = self._check_usage_warning(reports_last_hour, len(recent_activity))
         if warning:
-            self.stats['warnings_issued'] += 1
+            self._count('warnings_issued')
             return True, warning
         
         return True, "OK"
     
+    @property
+    def stats(self) -> Dict[str, int]:
+        counters = self.state.get_counters(STATS_NAMESPACE)
+        return {key: counters.get(key, 0) for key in STAT_KEYS}
+    
+    def _count(self, key: str):
+        self.state.incr(STATS_NAMESPACE, key)
+    
     def _parse_timestamp(self, timestamp) -> datetime:
         """Parse timestamp safely"""
         if isinstance(timestamp, str):
@@ -302,14 +307,15 @@ class RateLimiter:
         Returns:
             Dictionary with statistics
         """
+        stats = self.stats
         block_rate = 0
-        if self.stats['total_checks'] > 0:
-            block_rate = self.stats['blocked_attempts'] / self.stats['total_checks'] * 100
+        if stats['total_checks'] > 0:
+            block_rate = stats['blocked_attempts'] / stats['total_checks'] * 100
         
         return {
-            'total_checks': self.stats['total_checks'],
-            'blocked_attempts': self.stats['blocked_attempts'],
-            'warnings_issued': self.stats['warnings_issued'],
+            'total_checks': stats['total_checks'],
+            'blocked_attempts': stats['blocked_attempts'],
+            'warnings_issued': stats['warnings_issued'],
             'block_rate_percent': round(block_rate, 2),
             'current_limits': {
                 'max_reports_per_hour': self.max_per_hour,
@@ -321,11 +327,7 @@ class RateLimiter:
     
     def reset_statistics(self):
         """Reset statistics counters"""
-        self.stats = {
-            'total_checks': 0,
-            'blocked_attempts': 0,
-            'warnings_issued': 0
-        }
+        self.state.reset_counters(STATS_NAMESPACE)
         print("Rate limiter statistics reset")
     
     def is_suspicious_pattern(self, user_id: str) -> Tuple[bool, str]:
@@ -371,6 +373,7 @@ class RateLimiter:
         """Get current rate limiter configuration"""
         return {
             'mode': self.db_mode,
+            'state_backend': self.state.name,
             'limits': {
                 'max_reports_per_hour': self.max_per_hour,
                 'max_reports_per_day': self.max_per_day,
@@ -0,0 +1,290 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from typing import Dict, List
+from urllib.request import pathname2url
+
+from .config_loader import load_trust_config
+
+
+# (hot table, retention config key) - rows older than the window move to <table>_archive
+ARCHIVED_TABLES = [
+    ('alert_history', 'alert_history_days'),
+    ('reputation_history', 'reputation_history_days'),
+    ('trust_decisions_audit', 'trust_decisions_days'),
+    ('cross_verification_logs', 'cross_verification_days'),
+]
+
+SUMMARY_TABLE = 'agent_performance_daily'
+
+
+def _cutoff(**delta) -> str:
+    """UTC time `delta` ago, formatted like CURRENT_TIMESTAMP (bind it to every statement of a step)"""
+    return (datetime.utcnow() - timedelta(**delta)).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class TrustRetention:
+    """
+    Retention and compaction for the trust SQLite tables
+
+    The hot tables are append-only and every verification reads from them,
+    so without pruning they grow forever. One run:
+
+    - purges rate_limits rows older than the rate-limit window (24h)
+    - moves old alert/reputation/decision/cross-verification rows into
+      <table>_archive tables
+    - rolls old agent_performance rows into per-day summaries
+    - drops archived rows past the archive window
+    - runs an incremental VACUUM to hand freed pages back to the OS
+
+    Each step computes its cutoff once, so a row can't fall between an
+    INSERT ... SELECT and the DELETE that follows it. Archive/summary
+    tables are created by the first write step; the size report only reads.
+    """
+
+    def __init__(self, db, config: Dict = None):
+        self.db = db
+        self.config = config or load_trust_config().get('retention', {})
+
+        self.rate_limit_hours = self.config.get('rate_limit_hours', 24)
+        self.archive_days = self.config.get('archive_days', 365)
+        self.performance_days = self.config.get('agent_performance_days', 30)
+        self.vacuum_pages = self.config.get('vacuum_pages', 2000)
+
+        self._tables_ready = False
+
+    # ---------- SCHEMA ----------
+
+    def _ensure_tables(self):
+        if self._tables_ready:
+            return
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+
+        for table, _ in ARCHIVED_TABLES:
+            # Same columns as the hot table, so rows can be moved with SELECT *
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {table}_archive AS SELECT * FROM {table} WHERE 0")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_archive_time ON {table}_archive(timestamp)")
+
+        # Sums rather than averages so repeated roll-ups into one day stay exact
+        cursor.execute(f"""
+            CREATE TABLE IF NOT EXISTS {SUMMARY_TABLE} (
+                day TEXT NOT NULL,
+                agent_type TEXT NOT NULL,
+                agent_id TEXT NOT NULL,
+                task_type TEXT NOT NULL,
+                total INTEGER NOT NULL DEFAULT 0,
+                successes INTEGER NOT NULL DEFAULT 0,
+                response_time_sum REAL NOT NULL DEFAULT 0,
+                response_time_count INTEGER NOT NULL DEFAULT 0,
+                accuracy_sum REAL NOT NULL DEFAULT 0,
+                accuracy_count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (day, agent_type, agent_id, task_type)
+            )
+        """)
+
+        # Retention deletes by age, so the hot tables need a timestamp index too
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_rate_time ON rate_limits(timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_rep_history_time ON reputation_history(timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_decisions_time ON trust_decisions_audit(timestamp)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_cross_verify_time ON cross_verification_logs(timestamp)")
+
+        conn.commit()
+        conn.close()
+        self._tables_ready = True
+
+    # ---------- RETENTION STEPS ----------
+
+    def purge_rate_limits(self) -> int:
+        """Raw rate-limit rows are only read inside the 24h window"""
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cursor.execute(
+            "DELETE FROM rate_limits WHERE timestamp < ?",
+            (_cutoff(hours=self.rate_limit_hours),)
+        )
+        purged = cursor.rowcount
+        # Blocks that ran out more than a day ago
+        cursor.execute("DELETE FROM blocked_users WHERE blocked_until < ?", (_cutoff(days=1),))
+        conn.commit()
+        conn.close()
+        return purged
+
+    def archive_table(self, table: str, days: int) -> int:
+        """Move rows older than `days` into <table>_archive in one transaction"""
+        self._ensure_tables()
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cutoff = (_cutoff(days=days),)
+        try:
+            cursor.execute(
+                f"INSERT INTO {table}_archive SELECT * FROM {table} WHERE timestamp < ?",
+                cutoff
+            )
+            cursor.execute(f"DELETE FROM {table} WHERE timestamp < ?", cutoff)
+            moved = cursor.rowcount
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return moved
+
+    def summarize_agent_performance(self) -> int:
+        """Aggregate old agent_performance rows into daily summaries, then drop them"""
+        self._ensure_tables()
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cutoff = (_cutoff(days=self.performance_days),)
+        try:
+            cursor.execute(f"""
+                INSERT INTO {SUMMARY_TABLE}
+                    (day, agent_type, agent_id, task_type, total, successes,
+                     response_time_sum, response_time_count, accuracy_sum, accuracy_count)
+                SELECT date(timestamp), agent_type, agent_id, task_type,
+                       COUNT(*),
+                       SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END),
+                       COALESCE(SUM(response_time), 0), COUNT(response_time),
+                       COALESCE(SUM(accuracy_score), 0), COUNT(accuracy_score)
+                FROM agent_performance
+                WHERE timestamp < ?
+                GROUP BY date(timestamp), agent_type, agent_id, task_type
+                ON CONFLICT(day, agent_type, agent_id, task_type) DO UPDATE SET
+                    total = total + excluded.total,
+                    successes = successes + excluded.successes,
+                    response_time_sum = response_time_sum + excluded.response_time_sum,
+                    response_time_count = response_time_count + excluded.response_time_count,
+                    accuracy_sum = accuracy_sum + excluded.accuracy_sum,
+                    accuracy_count = accuracy_count + excluded.accuracy_count
+            """, cutoff)
+            cursor.execute("DELETE FROM agent_performance WHERE timestamp < ?", cutoff)
+            summarized = cursor.rowcount
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        return summarized
+
+    def purge_archives(self) -> int:
+        """Drop archived rows past the archive window"""
+        self._ensure_tables()
+        conn = self.db.get_connection()
+        cursor = conn.cursor()
+        cutoff = _cutoff(days=self.archive_days)
+        purged = 0
+        for table, _ in ARCHIVED_TABLES:
+            cursor.execute(f"DELETE FROM {table}_archive WHERE timestamp < ?", (cutoff,))
+            purged += cursor.rowcount
+        cursor.execute(f"DELETE FROM {SUMMARY_TABLE} WHERE day < ?", (cutoff[:10],))
+        conn.commit()
+        conn.close()
+        return purged
+
+    def incremental_vacuum(self) -> int:
+        """
+        Release up to `vacuum_pages` free pages
+
+        auto_vacuum can only be switched on by a full VACUUM, so the first
+        run on an existing database pays for one; later runs are incremental.
+        """
+        conn = self.db.get_connection()
+        conn.isolation_level = None
+        try:
+            mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+            if mode != 2:
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+            free_before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            conn.execute(f"PRAGMA incremental_vacuum({int(self.vacuum_pages)})").fetchall()
+            free_after = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        finally:
+            conn.close()
+        return free_before - free_after
+
+    # ---------- REPORT ----------
+
+    def get_size_report(self) -> Dict:
+        """
+        Database size, free pages and row counts of hot/archive/summary
+        tables, over a read-only connection (tables not created yet count 0)
+        """
+        uri = 'file:' + pathname2url(os.path.abspath(self.db.db_path)) + '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True)
+        cursor = conn.cursor()
+        existing = {row[0] for row in cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+        def count(sql: str, table: str) -> int:
+            return cursor.execute(sql.format(table=table)).fetchone()[0] if table in existing else 0
+
+        page_size = cursor.execute("PRAGMA page_size").fetchone()[0]
+        page_count = cursor.execute("PRAGMA page_count").fetchone()[0]
+        freelist = cursor.execute("PRAGMA freelist_count").fetchone()[0]
+
+        tables: Dict[str, Dict] = {}
+        for table in ['rate_limits', 'agent_performance'] + [t for t, _ in ARCHIVED_TABLES]:
+            row = {'rows': count("SELECT COUNT(*) FROM {table}", table)}
+            if table not in ('rate_limits', 'agent_performance'):
+                row['archived_rows'] = count("SELECT COUNT(*) FROM {table}", f'{table}_archive')
+            tables[table] = row
+        tables['agent_performance']['summary_days'] = count("SELECT COUNT(DISTINCT day) FROM {table}", SUMMARY_TABLE)
+
+        conn.close()
+
+        return {
+            'db_path': os.path.abspath(self.db.db_path),
+            'file_bytes': os.path.getsize(self.db.db_path) if os.path.exists(self.db.db_path) else 0,
+            'page_size': page_size,
+            'page_count': page_count,
+            'free_pages': freelist,
+            'tables': tables
+        }
+
+    # ---------- RUN ----------
+
+    def run(self) -> Dict:
+        """Run every retention step and return what changed plus a size report"""
+        started = datetime.now()
+        before = self.get_size_report()
+
+        actions: Dict[str, int] = {'rate_limits_purged': self.purge_rate_limits()}
+        for table, key in ARCHIVED_TABLES:
+            actions[f'{table}_archived'] = self.archive_table(table, self.config.get(key, 30))
+        actions['agent_performance_summarized'] = self.summarize_agent_performance()
+        actions['archive_rows_purged'] = self.purge_archives()
+        actions['pages_vacuumed'] = self.incremental_vacuum()
+
+        after = self.get_size_report()
+
+        return {
+            'started_at': started.isoformat(),
+            'duration_ms': round((datetime.now() - started).total_seconds() * 1000, 1),
+            'actions': actions,
+            'bytes_before': before['file_bytes'],
+            'bytes_after': after['file_bytes'],
+            'report': after
+        }
+
+
+def run_trust_retention(db=None) -> Dict:
+    """Entry point for the scheduler: run retention on the default trust DB"""
+    if db is None:
+        from .database import TrustDatabase
+        db = TrustDatabase()
+    return TrustRetention(db).run()
+
+
+def format_size_report(result: Dict) -> List[str]:
+    """Human-readable lines for logs"""
+    report = result.get('report', result)
+    lines = [
+        f"Trust DB {report['db_path']}: {report['file_bytes'] / 1024:.1f} KB, "
+        f"{report['page_count']} pages ({report['free_pages']} free)"
+    ]
+    if 'actions' in result:
+        lines.append("Retention: " + ', '.join(f"{k}={v}" for k, v in result['actions'].items()))
+    for table, counts in report['tables'].items():
+        lines.append(f"  {table}: " + ', '.join(f"{k}={v}" for k, v in counts.items()))
+    return lines
@@ -1,7 +1,6 @@
-import json
-import os
 from typing import Dict, Optional, List
 from datetime import datetime, timedelta
+from .config_loader import load_trust_config
 
 class ReputationManager:
     """
@@ -15,9 +14,7 @@ class ReputationManager:
     """
  
     def __init__(self, data_handler=None):
-        config_path = os.path.join(os.path.dirname(__file__), 'trust_thresholds.json')
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        config = load_trust_config()
         
         # Load user reputation config
         self.config = config.get('reputation_settings', config.get('reputation', {}))
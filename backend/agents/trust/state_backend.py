@@ -0,0 +1,364 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .config_loader import load_trust_config
+
+DEFAULT_STATE_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'services', 'trust_state.db')
+
+
+class InMemoryStateBackend:
+    """
+    Process-local state (the original behaviour)
+
+    Fast, but every uvicorn worker and the scheduler each see only the
+    reports that reached them. Use SQLiteStateBackend when scaling out.
+    """
+
+    name = 'memory'
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._counters: Dict[str, Dict[str, int]] = defaultdict(dict)
+        self._values: Dict[str, Dict[str, Dict]] = defaultdict(dict)
+        self._streams: Dict[str, List[Dict]] = defaultdict(list)
+        self._next_id: Dict[str, int] = defaultdict(int)
+
+    # ---------- COUNTERS ----------
+
+    def incr(self, namespace: str, key: str, amount: int = 1) -> int:
+        with self._lock:
+            value = self._counters[namespace].get(key, 0) + amount
+            self._counters[namespace][key] = value
+            return value
+
+    def get_counters(self, namespace: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._counters[namespace])
+
+    def reset_counters(self, namespace: str):
+        with self._lock:
+            self._counters.pop(namespace, None)
+
+    # ---------- KEY / VALUE ----------
+
+    def get(self, namespace: str, key: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._values[namespace].get(key)
+            return dict(value) if value is not None else None
+
+    def set(self, namespace: str, key: str, value: Dict):
+        with self._lock:
+            self._values[namespace][key] = value
+
+    def update(self, namespace: str, key: str, fn: Callable[[Optional[Dict]], Dict]) -> Dict:
+        """Atomically replace a value with fn(current)"""
+        with self._lock:
+            value = fn(self._values[namespace].get(key))
+            self._values[namespace][key] = value
+            return value
+
+    def values(self, namespace: str) -> List[Dict]:
+        with self._lock:
+            return [dict(v) for v in self._values[namespace].values()]
+
+    # ---------- EVENT STREAMS ----------
+
+    def append(self, stream: str, record: Dict, ts: float = None) -> int:
+        """Append a record to a time-ordered stream; returns its id"""
+        with self._lock:
+            self._next_id[stream] += 1
+            record_id = self._next_id[stream]
+            self._streams[stream].append({**record, 'id': record_id, 'ts': ts if ts is not None else time.time()})
+            return record_id
+
+    def check_and_append(self, stream: str, record: Dict, check: Callable[[List[Dict]], Tuple[bool, Any]],
+                         since: float = None, ts: float = None) -> Any:
+        """
+        Atomically read the stream (newer than `since`), call check(records)
+        -> (append, result) and append `record` if asked; returns result
+        """
+        with self._lock:
+            append, result = check(self.read(stream, since=since))
+            if append:
+                self.append(stream, record, ts=ts)
+            return result
+
+    def read(self, stream: str, since: float = None, where: Dict = None) -> List[Dict]:
+        """Records newer than `since` whose fields equal every `where` item, oldest first"""
+        with self._lock:
+            records = self._streams.get(stream, [])
+            # Copies, so callers can annotate records like the SQLite backend allows
+            return [
+                dict(r) for r in records
+                if (since is None or r['ts'] > since)
+                and (not where or all(r.get(k) == v for k, v in where.items()))
+            ]
+
+    def trim(self, stream: str, before: float = None, keep_last: int = None) -> int:
+        """Drop records older than `before` and all but the newest `keep_last`"""
+        with self._lock:
+            records = self._streams.get(stream, [])
+            kept = [r for r in records if before is None or r['ts'] >= before]
+            if keep_last is not None and len(kept) > keep_last:
+                kept = kept[-keep_last:]
+            self._streams[stream] = kept
+            return len(records) - len(kept)
+
+    def count(self, stream: str) -> int:
+        with self._lock:
+            return len(self._streams.get(stream, []))
+
+
+class SQLiteStateBackend:
+    """
+    Shared state in a local SQLite file
+
+    Every process pointing at the same file sees the same counters, values
+    and streams. Counter increments and value updates run inside
+    BEGIN IMMEDIATE so concurrent workers never lose an update; WAL mode
+    keeps readers from blocking the writer.
+    """
+
+    name = 'sqlite'
+
+    _initialized_paths = set()
+    _init_lock = threading.Lock()
+
+    def __init__(self, path: str = None, busy_timeout_ms: int = 5000):
+        self.path = os.path.abspath(path or DEFAULT_STATE_PATH)
+        self.busy_timeout_ms = busy_timeout_ms
+        self._ensure_schema()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        # WAL + NORMAL only syncs at checkpoints; losing the last few
+        # counter bumps on power loss is fine for this state
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _ensure_schema(self):
+        if self.path in SQLiteStateBackend._initialized_paths:
+            return
+        with SQLiteStateBackend._init_lock:
+            if self.path in SQLiteStateBackend._initialized_paths:
+                return
+            conn = self._connect()
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS state_counters (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS state_values (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS state_events (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    stream TEXT NOT NULL,
+                    ts REAL NOT NULL,
+                    payload TEXT NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_state_events_stream_ts ON state_events(stream, ts)")
+            conn.close()
+            SQLiteStateBackend._initialized_paths.add(self.path)
+
+    # ---------- COUNTERS ----------
+
+    def incr(self, namespace: str, key: str, amount: int = 1) -> int:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("""
+                INSERT INTO state_counters (namespace, key, value) VALUES (?, ?, ?)
+                ON CONFLICT(namespace, key) DO UPDATE SET value = value + excluded.value
+            """, (namespace, key, amount))
+            value = conn.execute(
+                "SELECT value FROM state_counters WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()[0]
+            conn.execute("COMMIT")
+            return value
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def get_counters(self, namespace: str) -> Dict[str, int]:
+        conn = self._connect()
+        rows = conn.execute("SELECT key, value FROM state_counters WHERE namespace = ?", (namespace,)).fetchall()
+        conn.close()
+        return {row['key']: row['value'] for row in rows}
+
+    def reset_counters(self, namespace: str):
+        conn = self._connect()
+        conn.execute("DELETE FROM state_counters WHERE namespace = ?", (namespace,))
+        conn.close()
+
+    # ---------- KEY / VALUE ----------
+
+    def get(self, namespace: str, key: str) -> Optional[Dict]:
+        conn = self._connect()
+        row = conn.execute(
+            "SELECT value FROM state_values WHERE namespace = ? AND key = ?", (namespace, key)
+        ).fetchone()
+        conn.close()
+        return json.loads(row['value']) if row else None
+
+    def set(self, namespace: str, key: str, value: Dict):
+        conn = self._connect()
+        conn.execute(
+            "INSERT OR REPLACE INTO state_values (namespace, key, value) VALUES (?, ?, ?)",
+            (namespace, key, json.dumps(value, default=str))
+        )
+        conn.close()
+
+    def update(self, namespace: str, key: str, fn: Callable[[Optional[Dict]], Dict]) -> Dict:
+        """Atomically replace a value with fn(current), across processes"""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT value FROM state_values WHERE namespace = ? AND key = ?", (namespace, key)
+            ).fetchone()
+            value = fn(json.loads(row['value']) if row else None)
+            conn.execute(
+                "INSERT OR REPLACE INTO state_values (namespace, key, value) VALUES (?, ?, ?)",
+                (namespace, key, json.dumps(value, default=str))
+            )
+            conn.execute("COMMIT")
+            return value
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def values(self, namespace: str) -> List[Dict]:
+        conn = self._connect()
+        rows = conn.execute("SELECT value FROM state_values WHERE namespace = ?", (namespace,)).fetchall()
+        conn.close()
+        return [json.loads(row['value']) for row in rows]
+
+    # ---------- EVENT STREAMS ----------
+
+    def append(self, stream: str, record: Dict, ts: float = None) -> int:
+        conn = self._connect()
+        cursor = conn.execute(
+            "INSERT INTO state_events (stream, ts, payload) VALUES (?, ?, ?)",
+            (stream, ts if ts is not None else time.time(), json.dumps(record, default=str))
+        )
+        record_id = cursor.lastrowid
+        conn.close()
+        return record_id
+
+    def check_and_append(self, stream: str, record: Dict, check: Callable[[List[Dict]], Tuple[bool, Any]],
+                         since: float = None, ts: float = None) -> Any:
+        """
+        Read + conditional append in one BEGIN IMMEDIATE transaction, so two
+        workers checking the same record cannot both miss each other
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            sql, params = self._read_query(stream, since)
+            records = [self._row_record(row) for row in conn.execute(sql, params).fetchall()]
+            append, result = check(records)
+            if append:
+                conn.execute(
+                    "INSERT INTO state_events (stream, ts, payload) VALUES (?, ?, ?)",
+                    (stream, ts if ts is not None else time.time(), json.dumps(record, default=str))
+                )
+            conn.execute("COMMIT")
+            return result
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _read_query(stream: str, since: float = None, where: Dict = None):
+        sql = "SELECT id, ts, payload FROM state_events WHERE stream = ?"
+        params: list = [stream]
+        if since is not None:
+            sql += " AND ts > ?"
+            params.append(since)
+        for field, value in (where or {}).items():
+            sql += " AND json_extract(payload, ?) = ?"
+            params.extend([f'$.{field}', value])
+        sql += " ORDER BY id"
+        return sql, params
+
+    @staticmethod
+    def _row_record(row) -> Dict:
+        return {**json.loads(row['payload']), 'id': row['id'], 'ts': row['ts']}
+
+    def read(self, stream: str, since: float = None, where: Dict = None) -> List[Dict]:
+        sql, params = self._read_query(stream, since, where)
+        conn = self._connect()
+        rows = conn.execute(sql, params).fetchall()
+        conn.close()
+        return [self._row_record(row) for row in rows]
+
+    def trim(self, stream: str, before: float = None, keep_last: int = None) -> int:
+        conn = self._connect()
+        removed = 0
+        if before is not None:
+            removed += conn.execute(
+                "DELETE FROM state_events WHERE stream = ? AND ts < ?", (stream, before)
+            ).rowcount
+        if keep_last is not None:
+            removed += conn.execute("""
+                DELETE FROM state_events WHERE stream = ? AND id NOT IN (
+                    SELECT id FROM state_events WHERE stream = ? ORDER BY id DESC LIMIT ?
+                )
+            """, (stream, stream, keep_last)).rowcount
+        conn.close()
+        return removed
+
+    def count(self, stream: str) -> int:
+        conn = self._connect()
+        value = conn.execute("SELECT COUNT(*) FROM state_events WHERE stream = ?", (stream,)).fetchone()[0]
+        conn.close()
+        return value
+
+
+def get_state_backend(backend_type: str = None, path: str = None):
+    """
+    Build the state backend named in trust_thresholds.json ("state_backend")
+
+    TRUST_STATE_BACKEND / TRUST_STATE_PATH override the config, so a
+    multi-worker deployment can switch to the shared backend without
+    editing the file. The memory backend is per caller, like the old
+    instance attributes; SQLite backends on one path share state.
+    """
+    config = load_trust_config().get('state_backend', {})
+    backend_type = backend_type or os.getenv('TRUST_STATE_BACKEND') or config.get('type', 'memory')
+
+    if backend_type == 'sqlite':
+        return SQLiteStateBackend(
+            path=path or os.getenv('TRUST_STATE_PATH') or config.get('path'),
+            busy_timeout_ms=config.get('busy_timeout_ms', 5000)
+        )
+    if backend_type != 'memory':
+        raise ValueError(f"Unknown trust state backend: {backend_type}")
+    return InMemoryStateBackend()
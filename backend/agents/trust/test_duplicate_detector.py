@@ -0,0 +1,37 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+import pytest
+
+from agents.trust.duplicate_detector import STREAM, DuplicateDetector
+from agents.trust.state_backend import InMemoryStateBackend, SQLiteStateBackend
+
+
+ALERT = {'user_id': 'u1', 'crisis_type': 'flood', 'location': 'Rajpur Road', 'message': 'Water rising'}
+
+
+@pytest.fixture(params=['memory', 'sqlite'])
+def state(request, tmp_path):
+    if request.param == 'sqlite':
+        return SQLiteStateBackend(str(tmp_path / 'state.db'))
+    return InMemoryStateBackend()
+
+
+def test_check_and_record_stores_only_new_reports(state):
+    detector = DuplicateDetector(state)
+    assert detector.check_and_record(ALERT)[0] is False
+    is_dup, penalty, _ = detector.check_and_record(ALERT)
+    assert is_dup and penalty > 0.5
+    assert state.count(STREAM) == 1
+
+
+def test_concurrent_workers_see_each_other(state):
+    # One detector per worker, sharing only the backend
+    detectors = [DuplicateDetector(state) for _ in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        verdicts = list(pool.map(lambda d: d.check_and_record(ALERT)[0], detectors))
+    assert verdicts.count(False) == 1
+    assert state.count(STREAM) == 1
@@ -0,0 +1,32 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(__file__))))
+
+from agents.trust.database import TrustDatabase
+from agents.trust.retention import TrustRetention
+
+
+def add_performance(db, days_ago, success):
+    conn = db.get_connection()
+    conn.execute("""
+        INSERT INTO agent_performance (agent_type, agent_id, task_type, success, timestamp)
+        VALUES ('trust', 'trust_agent', 'verification', ?, datetime('now', ?))
+    """, (success, f'-{days_ago} days'))
+    conn.commit()
+    conn.close()
+
+
+def test_performance_counts_survive_summarizing(tmp_path):
+    db = TrustDatabase(str(tmp_path / 'trust.db'))
+    for days_ago, success in [(1, 1), (5, 0), (45, 1), (60, 1), (80, 0), (120, 1)]:
+        add_performance(db, days_ago, success)
+    before = db.get_agent_performance_totals('trust', days=90)
+    assert before == {'total': 5, 'successes': 3}
+
+    summarized = TrustRetention(db, config={'agent_performance_days': 30}).summarize_agent_performance()
+    assert summarized == 4
+    assert db.get_agent_performance_totals('trust', days=90) == before
+    assert db.get_agent_performance_totals('trust', days=7) == {'total': 2, 'successes': 1}
+    assert db.calculate_agent_success_rate('trust', days=90) == 3 / 5
+    assert len(db.get_agent_performance_history('trust', days=90)) == 2
@@ -1,16 +1,13 @@
-import json
-import os
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List
 import math
+from .config_loader import load_trust_config
 
 class TrustScorer:
     """Enhanced Trust Scorer with Historical Data"""
 
     def __init__(self, db=None):
-        config_path = os.path.join(os.path.dirname(__file__), 'trust_thresholds.json')
-        with open(config_path, 'r') as f:
-            config = json.load(f)
+        config = load_trust_config()
         
         self.weights = config['scoring_weights']
         self.thresholds = config['verification_levels']
@@ -0,0 +1,153 @@
+import copy
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .config_loader import load_trust_config
+
+
+class VerificationCache:
+    """
+    Short-TTL cache of trust verification results
+
+    Keyed by (user_id, normalised alert fingerprint), so an app retry or the
+    same report arriving through both detection and the citizen app reuses
+    the first decision instead of re-running cross-verification and scoring.
+    """
+
+    def __init__(self, ttl_seconds: float = None, max_entries: int = None):
+        config = load_trust_config().get('result_cache', {})
+
+        self.enabled = config.get('enabled', True)
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else config.get('ttl_seconds', 60)
+        self.max_entries = max_entries if max_entries is not None else config.get('max_entries', 1000)
+        self.coord_precision = config.get('coord_precision', 3)
+
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'expired': 0,
+            'evicted': 0
+        }
+
+    # ---------- FINGERPRINT ----------
+
+    def fingerprint(self, alert: Dict) -> str:
+        """
+        Normalised content hash of an alert
+
+        Case, punctuation and whitespace in the text fields are ignored and
+        coordinates are rounded (~100m at 3 decimals), so trivially different
+        retries of the same report collide.
+        """
+        lat = alert.get('lat')
+        lon = alert.get('lon')
+        coords = ''
+        if lat is not None and lon is not None:
+            try:
+                coords = f"{round(float(lat), self.coord_precision)},{round(float(lon), self.coord_precision)}"
+            except (TypeError, ValueError):
+                coords = ''
+
+        content = '|'.join([
+            self._normalize(alert.get('crisis_type')),
+            self._normalize(alert.get('location')),
+            self._normalize(alert.get('message')),
+            self._normalize(alert.get('severity')),
+            coords,
+            '1' if alert.get('has_image') else '0'
+        ])
+        return hashlib.md5(content.encode()).hexdigest()
+
+    @staticmethod
+    def _normalize(value) -> str:
+        if value is None:
+            return ''
+        text = re.sub(r'[^\w\s]', ' ', str(value).lower())
+        return ' '.join(text.split())
+
+    # ---------- LOOKUP / STORE ----------
+
+    def get(self, user_id: str, fingerprint: str) -> Optional[Dict]:
+        """Return a copy of the cached result, or None on miss/expiry"""
+        if not self.enabled:
+            return None
+
+        key = (user_id, fingerprint)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+
+            stored_at, result = entry
+            if now - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            cached = copy.deepcopy(result)
+
+        cached.setdefault('metadata', {})['cache'] = {
+            'hit': True,
+            'age_seconds': round(now - stored_at, 2)
+        }
+        return cached
+
+    def put(self, user_id: str, fingerprint: str, result: Dict):
+        if not self.enabled:
+            return
+
+        key = (user_id, fingerprint)
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(result))
+            self._entries.move_to_end(key)
+            self.stats['stores'] += 1
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evicted'] += 1
+
+    def invalidate_user(self, user_id: str) -> int:
+        """Drop a user's cached results (their reputation just changed)"""
+        with self._lock:
+            keys = [k for k in self._entries if k[0] == user_id]
+            for k in keys:
+                del self._entries[k]
+        return len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    # ---------- STATISTICS ----------
+
+    def get_statistics(self) -> Dict:
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                'enabled': self.enabled,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl_seconds,
+                **self.stats,
+                'lookups': lookups,
+                'hit_ratio': round(self.stats['hits'] / lookups, 4) if lookups else 0.0
+            }
+
+    def reset_statistics(self):
+        with self._lock:
+            for k in self.stats:
+                self.stats[k] = 0
@@ -1,4 +1,5 @@
 from typing import Dict
+import threading
 import time
 from datetime import datetime
 
@@ -9,6 +10,8 @@ from .trust.cross_verification import CrossVerifier
 from .trust.duplicate_detector import DuplicateDetector
 from .trust.source_reputation import ReputationManager
 from .trust.rate_limiter import RateLimiter
+from .trust.verification_cache import VerificationCache
+from .trust.state_backend import get_state_backend
 
 
 try:
@@ -37,6 +40,10 @@ class TrustAgent:
             db_path: Path to SQLite database
             json_data_path: Path to JSON files (legacy mode)
         """
+        # Duplicate history, rate-limit counters and JSON-mode stores;
+        # set TRUST_STATE_BACKEND=sqlite to share them across workers
+        self.state = get_state_backend()
+
         #Default to database mode
         if use_database:
             self.db = TrustDatabase(db_path)
@@ -45,16 +52,17 @@ class TrustAgent:
         else:
             if JsonDataHandler is None:
                 raise ImportError("JsonDataHandler not available. Install it for legacy mode.")
-            self.db = JsonDataHandler(json_data_path)
+            self.db = JsonDataHandler(json_data_path, state=self.state)
             self.mode = 'json'
             print("Trust Agent using JSON data handler (Round 1 legacy mode)")
 
         # Initialize components with database connection
         self.scorer = TrustScorer(db=self.db)
         self.cross_verifier = CrossVerifier(self.db)
-        self.duplicate_detector = DuplicateDetector()
+        self.duplicate_detector = DuplicateDetector(self.state)
         self.reputation_manager = ReputationManager(self.db)
-        self.rate_limiter = RateLimiter(self.db)
+        self.rate_limiter = RateLimiter(self.db, state=self.state)
+        self.result_cache = VerificationCache()
         
         print("Trust Agent initialized with all components\n")
     
@@ -92,12 +100,21 @@ class TrustAgent:
             self._log_decision(alert_id, user_id, result)
             return result
         
+        # ========== STEP 1b: Result Cache ==========
+        # Retries of the same report reuse the earlier decision; only the
+        # rate/duplicate bookkeeping is applied again
+        fingerprint = self.result_cache.fingerprint(alert)
+        cached = self.result_cache.get(user_id, fingerprint)
+        if cached is not None:
+            return self._serve_cached_result(alert, cached, start_time)
+
         rate_penalty = self.rate_limiter.get_penalty_score(user_id)
         if rate_penalty > 0:
             print(f"   Rate penalty applied: -{rate_penalty:.2f}")
   
         # ========== STEP 2: Duplicate Check ==========
-        is_dup, dup_penalty, dup_reason = self.duplicate_detector.check_duplicate(alert)
+        # Checked and recorded atomically, so concurrent workers see each other's reports
+        is_dup, dup_penalty, dup_reason = self.duplicate_detector.check_and_record(alert)
         if is_dup and dup_penalty > 0.5:
             print(f"   REJECTED: {dup_reason}")
             result = self._create_rejection_result(
@@ -164,7 +181,6 @@ class TrustAgent:
         # ========== STEP 8: Log Activities ==========
         try:
             self.rate_limiter.record_activity(user_id)
-            self.duplicate_detector.record_report(alert)
         except Exception as e:
             print(f"   Activity logging failed: {e}")
 
@@ -192,20 +208,13 @@ class TrustAgent:
         print(f"{'='*60}\n")
 
         # ========== STEP 11: Resource Allocation (if verified) ==========
-        if decision == "VERIFIED":
+        # Queued for the next joint allocation round rather than run inline;
+        # the crisis row keyed by alert_id may still be about to be saved
+        if decision == "VERIFIED" and alert_id:
             try:
-                from backend.agents.resource_agent import agent as resource_agent
-                crisis = {
-                    "type": crisis_type,
-                    "location": alert.get("location"),
-                    "lat": alert.get("lat"),
-                    "lon": alert.get("lon"),
-                    "severity": alert.get("severity", "medium"),
-                    "required_skills": self._infer_required_skills(crisis_type),
-                    "alert_id": saved_alert_id
-                }
-                resource_agent.allocate_resources(crisis)
-                print(f"   Resources allocated for verified alert")
+                from backend.agents.resource.allocation_queue import allocation_queue
+                allocation_queue.submit(alert_id)
+                print(f"   Queued for resource allocation")
             except Exception as e:
                 print(f"   Resource allocation failed: {e}")
 
@@ -240,6 +249,8 @@ class TrustAgent:
         if 'historical_performance' in score_result:
             result['historical_performance'] = score_result['historical_performance']
 
+        self.result_cache.put(user_id, fingerprint, result)
+
         # ========== STEP 13: Audit Logging ==========
         self._log_decision(saved_alert_id, user_id, result)
         
@@ -250,6 +261,21 @@ class TrustAgent:
         
         return result
     
+    def _serve_cached_result(self, alert: Dict, cached: Dict, start_time: float) -> Dict:
+        """Return a cached decision after recording the repeat submission"""
+        try:
+            self.rate_limiter.record_activity(alert.get('user_id', 'unknown'))
+            self.duplicate_detector.record_report(alert)
+        except Exception as e:
+            print(f"   Activity logging failed: {e}")
+
+        response_time = time.time() - start_time
+        cached['metadata']['response_time_ms'] = round(response_time * 1000, 2)
+
+        print(f"   CACHED DECISION: {cached['decision']} "
+              f"(age {cached['metadata']['cache']['age_seconds']}s)\n")
+        return cached
+
     def _create_rejection_result(self, user_id: str, reason_type: str, 
                                  reason: str, score: float, alert_id) -> Dict:
         """Helper to create rejection result"""
@@ -322,6 +348,7 @@ class TrustAgent:
         """
         old_rep = self.reputation_manager.get_reputation_score(user_id)
         new_rep = self.reputation_manager.update_reputation(user_id, was_accurate)
+        self.result_cache.invalidate_user(user_id)
         
         change = new_rep - old_rep
         action = 'increased' if change > 0 else 'decreased'
@@ -365,13 +392,16 @@ class TrustAgent:
             'trust_agent': 'operational',
             'mode': self.mode,
             'database_type': 'SQLite' if self.mode == 'database' else 'JSON',
+            'state_backend': self.state.name,
             'components': {
                 'scorer': 'active',
                 'cross_verifier': 'active',
                 'duplicate_detector': 'active',
                 'reputation_manager': 'active',
-                'rate_limiter': 'active'
+                'rate_limiter': 'active',
+                'result_cache': 'active' if self.result_cache.enabled else 'disabled'
             },
+            'result_cache': self.result_cache.get_statistics(),
             'thresholds': self.scorer.get_thresholds(),
             'scoring_config': self.scorer.get_scoring_summary()
         }
@@ -424,19 +454,18 @@ class TrustAgent:
             return {'error': 'Only available in database mode'}
         
         try:
-            history = self.db.get_agent_performance_history('trust', days=days)
+            # Counts include the daily summaries of rows past retention
+            totals = self.db.get_agent_performance_totals('trust', days=days)
             success_rate = self.db.calculate_agent_success_rate('trust', days=days)
-            
-            total_tasks = len(history)
-            successful = sum(1 for h in history if h['success'])
+            history = self.db.get_agent_performance_history('trust', days=days, limit=10)
             
             return {
                 'agent_type': 'trust',
                 'period_days': days,
-                'total_tasks': total_tasks,
-                'successful_tasks': successful,
+                'total_tasks': totals['total'],
+                'successful_tasks': totals['successes'],
                 'success_rate': round(success_rate * 100, 1),
-                'recent_history': history[:10]
+                'recent_history': history
             }
         except Exception as e:
             return {'error': str(e)}
@@ -450,7 +479,7 @@ class TrustAgent:
         elif not use_database and self.mode == 'database':
             if JsonDataHandler:
                 print("Switching from Database to JSON mode...")
-                self.db = JsonDataHandler()
+                self.db = JsonDataHandler(state=self.state)
                 self.mode = 'json'
             else:
                 print("Cannot switch to JSON mode - JsonDataHandler not available")
@@ -459,18 +488,39 @@ class TrustAgent:
         self.scorer = TrustScorer(db=self.db)
         self.cross_verifier = CrossVerifier(self.db)
         self.reputation_manager = ReputationManager(self.db)
+        self.result_cache.clear()
         print(f"Now using {self.mode} mode")
 
 
 # ========== MODULE-LEVEL AGENT INSTANCE ==========
-# Create default agent instance for easy import
-agent = TrustAgent(use_database=True)
+# The default agent is built on first use, not at import time, so importing
+# this module (or any router that depends on it) doesn't open SQLite.
+_agent = None
+_agent_lock = threading.Lock()
+
+
+def get_trust_agent() -> TrustAgent:
+    """Return the shared database-mode TrustAgent, creating it on first call"""
+    global _agent
+    if _agent is None:
+        with _agent_lock:
+            if _agent is None:
+                _agent = TrustAgent(use_database=True)
+    return _agent
+
+
+def __getattr__(name):
+    # Keeps `from backend.agents.trust_agent import agent` working
+    if name == 'agent':
+        return get_trust_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 # For backward compatibility
 def verify_alert(alert: Dict) -> Dict:
     """Module-level function for direct verification"""
-    return agent.verify_alert(alert)
+    return get_trust_agent().verify_alert(alert)
 
 def update_user_feedback(user_id: str, was_accurate: bool) -> Dict:
     """Module-level function for feedback"""
-    return agent.update_user_feedback(user_id, was_accurate)
\ No newline at end of file
+    return get_trust_agent().update_user_feedback(user_id, was_accurate)
\ No newline at end of file
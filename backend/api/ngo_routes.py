@@ -4,6 +4,7 @@ from db.database import get_db
 from db import crud
 # from agents.resource.resource_agent import ResourceAgent
 from agents.learning.learning_agent import LearningAgent
+from backend.agents.resource.priority_engine import invalidate_past_performance
 from backend.core.role_guard import require_role
 from typing import List, Dict
 import logging
@@ -232,6 +233,9 @@ async def resolve_crisis(
     if not crisis:
         raise HTTPException(status_code=404, detail="Crisis not found")
     
+    # Its outcome changes the historical performance used for priorities
+    invalidate_past_performance(crisis.crisis_type)
+    
     # Trigger learning agent
     try:
         learning_agent = LearningAgent(db)
@@ -1,10 +1,12 @@
 from fastapi import APIRouter, Depends
+from typing import Optional
 import json
 from datetime import datetime
 from sqlalchemy.orm import Session
 
 from backend.agents.detection_agent import run_detection_pipeline
-from backend.agents.trust_agent import TrustAgent
+from backend.agents.trust_agent import get_trust_agent
+from backend.core.listing import list_page, select_fields, table_columns
 from backend.db.database import get_db
 from backend.db.models import Crisis, PipelineRun, VolunteerRequest, User
 # from backend.agents.resource_agent import ResourceAgent
@@ -69,7 +71,7 @@ def run_pipeline(db: Session = Depends(get_db)):
         # Stage 2: Trust Evaluation
         print(f"[Pipeline {run_id}] Starting Trust Agent...")
         try:
-            trust_agent = TrustAgent()
+            trust_agent = get_trust_agent()
             # Load alerts from alerts_log and verify them
             alerts = db.query(Crisis).order_by(Crisis.created_at.desc()).limit(5).all()
             verified_alerts = []
@@ -175,18 +177,14 @@ def run_pipeline(db: Session = Depends(get_db)):
 
 
 @router.get("/runs")
-def get_pipeline_runs(page: int = 1, per_page: int = 20, db: Session = Depends(get_db)):
-    """Retrieve pipeline run history"""
-    total = db.query(PipelineRun).count()
-    runs = db.query(PipelineRun).order_by(PipelineRun.timestamp.desc()).offset((page - 1) * per_page).limit(per_page).all()
-    
-    data = []
-    for r in runs:
-        data.append({c.name: getattr(r, c.name) for c in r.__table__.columns})
-    
-    return {
-        'items': data,
-        'page': page,
-        'per_page': per_page,
-        'total': total
-    }
+def get_pipeline_runs(page: int = 1, per_page: int = 20, cursor: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    """Retrieve pipeline run history (newest first; pass next_cursor to scroll)"""
+    return list_page(
+        db,
+        select_fields(table_columns(PipelineRun), fields),
+        sort_keys=[PipelineRun.timestamp, PipelineRun.run_id],
+        descending=True,
+        page=page,
+        per_page=per_page,
+        cursor=cursor
+    )
@@ -1,35 +1,39 @@
-from fastapi import APIRouter, HTTPException, Header, Depends
+from fastapi import APIRouter, HTTPException, Header, Depends, Query
 from typing import Optional
 import json
 from datetime import datetime
 from sqlalchemy.orm import Session
 
 from backend.core.role_guard import require_role
+from backend.core.listing import list_page, select_fields, table_columns
 from backend.db.database import get_db
 from backend.db.models import Resource, User, Assignment, VolunteerRequest, Crisis
+from backend.db.crud import (
+    has_skill, available_during, set_assignment_volunteers, add_request_volunteer,
+    get_volunteer_assignments, get_volunteer_accepted_requests
+)
+from backend.agents.resource.coverage_engine import coverage_engine
 
 router = APIRouter(prefix="/api/resource", tags=["resource-admin"])
 
 
 @router.get("/resources")
-def list_resources(page: int = 1, per_page: int = 20, type: Optional[str] = None, available: Optional[bool] = None, db: Session = Depends(get_db)):
-    query = db.query(Resource)
+def list_resources(page: int = 1, per_page: int = 20, type: Optional[str] = None, available: Optional[bool] = None, cursor: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    filters = []
     if type:
-        query = query.filter(Resource.type == type)
+        filters.append(Resource.type == type)
     if available is not None:
-        query = query.filter(Resource.available == available)
-
-    total = query.count()
-    resources = query.offset((page - 1) * per_page).limit(per_page).all()
-    
-    # Convert to dict
-    data = []
-    for r in resources:
-        data.append({c.name: getattr(r, c.name) for c in r.__table__.columns})
-
-    start = (page - 1) * per_page
-    end = start + per_page
-    return { 'items': data, 'page': page, 'per_page': per_page, 'total': total }
+        filters.append(Resource.available == available)
+
+    return list_page(
+        db,
+        select_fields(table_columns(Resource), fields),
+        sort_keys=[Resource.id],
+        filters=filters,
+        page=page,
+        per_page=per_page,
+        cursor=cursor
+    )
 
 
 @router.post("/resources")
@@ -112,38 +116,41 @@ def set_resource_availability(resource_id: str, payload: dict, token: str = Head
     return {'status': 'ok', 'resource': {c.name: getattr(resource, c.name) for c in resource.__table__.columns}}
 
 
+# Volunteer dict structure expected by frontend (User columns it maps from)
+VOLUNTEER_COLUMNS = {
+    "id": User.id,
+    "name": User.name,
+    "phone": User.phone,
+    "skills": User.skills,
+    "available": User.availability,
+    "location": User.location,
+    "latitude": User.latitude,
+    "longitude": User.longitude
+}
+
+
 @router.get('/volunteers')
-def list_volunteers(page: int = 1, per_page: int = 20, skill: Optional[str] = None, available: Optional[bool] = None, db: Session = Depends(get_db)):
+def list_volunteers(page: int = 1, per_page: int = 20, skill: Optional[str] = None, available: Optional[bool] = None, cursor: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
     # Volunteers are Users with role='volunteer'
-    query = db.query(User).filter(User.role == 'volunteer')
+    filters = [User.role == 'volunteer']
     
+    # Available = weekly availability mask covers the current hour
     if available is not None:
-        query = query.filter(User.availability == available)
+        filters.append(available_during() if available else ~available_during())
         
-    # Filter by skill in python since it's JSON
-    volunteers = query.all()
-    data = []
-    for v in volunteers:
-        # Map User model to volunteer dict structure expected by frontend
-        v_dict = {
-            "id": v.id,
-            "name": v.name,
-            "phone": v.phone,
-            "skills": v.skills,
-            "available": v.availability,
-            "location": v.location,
-            "latitude": v.latitude,
-            "longitude": v.longitude
-        }
-        data.append(v_dict)
-
+    # Skill filter is an index lookup on volunteer_skills
     if skill:
-        data = [v for v in data if skill in (v.get('skills') or [])]
-        
-    total = len(data)
-    start = (page - 1) * per_page
-    end = start + per_page
-    return { 'items': data[start:end], 'page': page, 'per_page': per_page, 'total': total }
+        filters.append(has_skill(skill))
+    
+    return list_page(
+        db,
+        select_fields(VOLUNTEER_COLUMNS, fields),
+        sort_keys=[User.id],
+        filters=filters,
+        page=page,
+        per_page=per_page,
+        cursor=cursor
+    )
 
 
 @router.put('/volunteers/{vol_id}/availability')
@@ -174,17 +181,44 @@ def set_volunteer_availability(vol_id: str, payload: dict, token: str = Header(N
     }}
 
 
+@router.get('/coverage')
+def get_coverage(
+    kind: str = Query('volunteer', pattern='^(volunteer|resource)$'),
+    skill: Optional[str] = Query(None, description='Volunteer skill, or resource type'),
+    available_for_hours: int = Query(1, ge=0, le=168),
+    token: str = Header(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Coverage heatmap: per grid cell, how many volunteers (or resources)
+    can arrive within 10/20/30 minutes, as a base64 uint16 array
+    """
+    require_role(token, ["authority", "ngo"])
+
+    if kind == 'volunteer':
+        entry = coverage_engine.volunteer_coverage(db, skill=skill, available_for_hours=available_for_hours)
+    else:
+        entry = coverage_engine.resource_coverage(db, resource_type=skill)
+
+    return {
+        'status': 'success',
+        'kind': kind,
+        'skill': skill,
+        'coverage': coverage_engine.encode(entry)
+    }
+
+
 @router.get('/assignments')
-def get_assignments(page: int = 1, per_page: int = 20, db: Session = Depends(get_db)):
-    total = db.query(Assignment).count()
-    assignments = db.query(Assignment).offset((page - 1) * per_page).limit(per_page).all()
-    
-    data = []
-    for a in assignments:
-        data.append({c.name: getattr(a, c.name) for c in a.__table__.columns})
-        
-    start = (page - 1) * per_page
-    return { 'items': data, 'page': page, 'per_page': per_page, 'total': total }
+def get_assignments(page: int = 1, per_page: int = 20, cursor: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    return list_page(
+        db,
+        select_fields(table_columns(Assignment), fields),
+        sort_keys=[Assignment.created_at, Assignment.id],
+        descending=True,
+        page=page,
+        per_page=per_page,
+        cursor=cursor
+    )
 
 
 @router.post('/assignments')
@@ -224,7 +258,6 @@ def create_assignment(payload: dict, token: str = Header(None), db: Session = De
     assignment = Assignment(
         id=f"asgn_{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{resource_id}",
         resource_id=resource_id,
-        volunteers=assigned_vols,
         crisis_id=crisis_id,
         notes=notes,
         assigned_by=user.get('user_id'),
@@ -232,6 +265,7 @@ def create_assignment(payload: dict, token: str = Header(None), db: Session = De
     )
 
     db.add(assignment)
+    set_assignment_volunteers(db, assignment, assigned_vols)
     db.commit()
     db.refresh(assignment)
     
@@ -239,16 +273,16 @@ def create_assignment(payload: dict, token: str = Header(None), db: Session = De
 
 
 @router.get('/volunteer_requests')
-def get_volunteer_requests(page: int = 1, per_page: int = 20, db: Session = Depends(get_db)):
-    total = db.query(VolunteerRequest).count()
-    requests = db.query(VolunteerRequest).order_by(VolunteerRequest.created_at.desc()).offset((page - 1) * per_page).limit(per_page).all()
-    
-    data = []
-    for r in requests:
-        data.append({c.name: getattr(r, c.name) for c in r.__table__.columns})
-        
-    start = (page - 1) * per_page
-    return { 'items': data, 'page': page, 'per_page': per_page, 'total': total }
+def get_volunteer_requests(page: int = 1, per_page: int = 20, cursor: Optional[str] = None, fields: Optional[str] = None, db: Session = Depends(get_db)):
+    return list_page(
+        db,
+        select_fields(table_columns(VolunteerRequest), fields),
+        sort_keys=[VolunteerRequest.created_at, VolunteerRequest.id],
+        descending=True,
+        page=page,
+        per_page=per_page,
+        cursor=cursor
+    )
 
 
 @router.post('/volunteer_requests')
@@ -308,11 +342,7 @@ def accept_volunteer_request(request_id: str, payload: dict, token: str = Header
     
     vol_id = current_user_id
 
-    accepted = list(req.accepted_volunteers) if req.accepted_volunteers else []
-    if vol_id not in accepted:
-        accepted.append(vol_id)
-        req.accepted_volunteers = accepted
-        req.fulfilled_count = len(accepted)
+    add_request_volunteer(db, req, vol_id)
 
     if req.fulfilled_count >= req.volunteers_needed:
         req.status = 'FULFILLED'
@@ -321,112 +351,81 @@ def accept_volunteer_request(request_id: str, payload: dict, token: str = Header
     return {"status": "ok", "message": "Request accepted"}
 
 
+URGENT_CRISES = ('fire', 'medical', 'violence', 'earthquake')
+
+
+def _task_priority(trust_score: float, crisis_type: str) -> str:
+    is_urgent = (crisis_type or '').lower() in URGENT_CRISES
+    if trust_score >= 0.65 and is_urgent:
+        return 'critical'
+    if trust_score >= 0.65:
+        return 'high'
+    if trust_score >= 0.45:
+        return 'medium'
+    return 'low'
+
+
 @router.get('/volunteer/tasks/{volunteer_id}')
 def get_volunteer_tasks(volunteer_id: str, db: Session = Depends(get_db)):
-    assignments = db.query(Assignment).all()
-    requests = db.query(VolunteerRequest).all()
-    resources = db.query(Resource).all()
-    
-    check_ids = [volunteer_id]
-    
     tasks = []
     
-    # 1. Assignments
-    for a in assignments:
-        if any(vid in (a.volunteers or []) for vid in check_ids):
-            # Resolve resource location
-            res_loc = "Location not specified"
-            res_lat = None
-            res_lon = None
-            res = next((r for r in resources if r.id == a.resource_id), None)
-            if res and res.location:
-                if isinstance(res.location, dict):
-                    res_lat = res.location.get('lat')
-                    res_lon = res.location.get('lon')
-                    if res_lat and res_lon: res_loc = f"{res_lat}, {res_lon}"
-                elif isinstance(res.location, str):
-                    res_loc = res.location
-
-            # Fetch trust_score, crisis_type, and location from alerts if crisis_id is provided
-            trust_score = 0.5  # default fallback
-            crisis_type = 'other'  # default fallback
-            alert_location = None
-            alert_lat = None
-            alert_lon = None
-            if a.crisis_id:
-                alert = db.query(Crisis).filter(Crisis.id == a.crisis_id).first()
-                if alert:
-                    trust_score = alert.trust_score or 0.5
-                    crisis_type = alert.crisis_type or 'other'
-                    alert_location = alert.location
-                    alert_lat = alert.latitude
-                    alert_lon = alert.longitude
-
-            # Determine priority based on trust_score and crisis_type
-            urgent_crises = ['fire', 'medical', 'violence', 'earthquake']
-            is_urgent = crisis_type.lower() in urgent_crises
-
-            if trust_score >= 0.65 and is_urgent:
-                priority = 'CRITICAL'
-            elif trust_score >= 0.65:
-                priority = 'HIGH'
-            elif trust_score >= 0.45:
-                priority = 'MEDIUM'
-            else:
-                priority = 'LOW'
-
-            # Use alert location if available, otherwise use resource location
-            task_location = alert_location or res_loc
-            task_lat = alert_lat or res_lat
-            task_lon = alert_lon or res_lon
-
-            tasks.append({
-                "task_id": a.id,
-                "task": f"Resource Support: {a.resource_id}",
-                "description": a.notes or "Assigned to support resource allocation",
-                "location": task_location,
-                "lat": task_lat,
-                "lon": task_lon,
-                "trust_score": trust_score,
-                "crisis_type": crisis_type,
-                "priority": priority.lower(),
-                "status": "assigned",
-                "assigned_at": a.created_at,
-                "type": "assignment"
-            })
-
-    # 2. Requests
-    for r in requests:
-        if any(vid in (r.accepted_volunteers or []) for vid in check_ids):
-            # Determine priority based on trust_score and crisis_type
-            trust_score = r.trust_score or 0.5
-            crisis_type = r.crisis_type or ''
-            urgent_crises = ['fire', 'medical', 'violence', 'earthquake']
-            is_urgent = crisis_type.lower() in urgent_crises
-
-            if trust_score >= 0.65 and is_urgent:
-                priority = 'CRITICAL'
-            elif trust_score >= 0.65:
-                priority = 'HIGH'
-            elif trust_score >= 0.45:
-                priority = 'MEDIUM'
-            else:
-                priority = 'LOW'
-
-            tasks.append({
-                "task_id": r.id,
-                "task": f"Emergency: {r.crisis_type}",
-                "description": r.message,
-                "location": r.location or "See Dashboard",
-                "lat": r.lat,
-                "lon": r.lon,
-                "trust_score": trust_score,
-                "crisis_type": crisis_type,
-                "priority": priority.lower(),
-                "status": r.status,
-                "assigned_at": r.created_at,
-                "required_skills": r.skills_required,
-                "type": "request"
-            })
+    # 1. Assignments (joined with their resource and crisis)
+    for a, res, alert in get_volunteer_assignments(db, volunteer_id):
+        # Resolve resource location
+        res_loc = "Location not specified"
+        res_lat = None
+        res_lon = None
+        if res and res.location:
+            if isinstance(res.location, dict):
+                res_lat = res.location.get('lat')
+                res_lon = res.location.get('lon')
+                if res_lat and res_lon: res_loc = f"{res_lat}, {res_lon}"
+            elif isinstance(res.location, str):
+                res_loc = res.location
+
+        # trust_score, crisis_type and location from the alert, if any
+        trust_score = (alert.trust_score if alert else None) or 0.5
+        crisis_type = (alert.crisis_type if alert else None) or 'other'
+
+        # Use alert location if available, otherwise use resource location
+        task_location = (alert.location if alert else None) or res_loc
+        task_lat = (alert.latitude if alert else None) or res_lat
+        task_lon = (alert.longitude if alert else None) or res_lon
+
+        tasks.append({
+            "task_id": a.id,
+            "task": f"Resource Support: {a.resource_id}",
+            "description": a.notes or "Assigned to support resource allocation",
+            "location": task_location,
+            "lat": task_lat,
+            "lon": task_lon,
+            "trust_score": trust_score,
+            "crisis_type": crisis_type,
+            "priority": _task_priority(trust_score, crisis_type),
+            "status": "assigned",
+            "assigned_at": a.created_at,
+            "type": "assignment"
+        })
+
+    # 2. Requests the volunteer accepted
+    for r in get_volunteer_accepted_requests(db, volunteer_id):
+        trust_score = r.trust_score or 0.5
+        crisis_type = r.crisis_type or ''
+
+        tasks.append({
+            "task_id": r.id,
+            "task": f"Emergency: {r.crisis_type}",
+            "description": r.message,
+            "location": r.location or "See Dashboard",
+            "lat": r.lat,
+            "lon": r.lon,
+            "trust_score": trust_score,
+            "crisis_type": crisis_type,
+            "priority": _task_priority(trust_score, crisis_type),
+            "status": r.status,
+            "assigned_at": r.created_at,
+            "required_skills": r.skills_required,
+            "type": "request"
+        })
             
     return {"tasks": tasks}
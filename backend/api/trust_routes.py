@@ -6,13 +6,12 @@ import os
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
-from agents.trust_agent import TrustAgent
+from agents.trust_agent import get_trust_agent
+from agents.trust.retention import TrustRetention
 
 router = APIRouter(prefix="/api/trust", tags=["Trust Agent"])
 
 
-trust_agent = TrustAgent(use_database=True)
-
 # ========== REQUEST MODELS ==========
 
 class AlertRequest(BaseModel):
@@ -96,6 +95,7 @@ async def verify_alert(alert: AlertRequest):
     
     ### Process:
     1. Rate limit check
+    1b. Result cache (repeat of the same report by the same user within the TTL)
     2. Duplicate detection
     3. User reputation lookup (with historical data)
     4. Cross-verification with existing reports
@@ -115,7 +115,7 @@ async def verify_alert(alert: AlertRequest):
     """
     try:
         alert_data = alert.dict()
-        result = trust_agent.verify_alert(alert_data)
+        result = get_trust_agent().verify_alert(alert_data)
         
         return {
             "success": True,
@@ -142,7 +142,7 @@ async def submit_feedback(feedback: FeedbackRequest):
     - Change amount
     """
     try:
-        result = trust_agent.update_user_feedback(
+        result = get_trust_agent().update_user_feedback(
             user_id=feedback.user_id,
             was_accurate=feedback.was_accurate,
             alert_id=feedback.alert_id
@@ -175,7 +175,7 @@ async def get_user_profile(user_id: str):
     - Current status
     """
     try:
-        profile = trust_agent.get_user_profile(user_id)
+        profile = get_trust_agent().get_user_profile(user_id)
         
         if profile is None or profile.get('status') == 'not_found':
             return {
@@ -206,7 +206,7 @@ async def get_user_history(
     Returns recent reputation changes for the user.
     """
     try:
-        history = trust_agent.reputation_manager.get_user_history(user_id, limit)
+        history = get_trust_agent().reputation_manager.get_user_history(user_id, limit)
         
         return {
             "success": True,
@@ -239,7 +239,7 @@ async def track_external_source(source: SourceTrackingRequest):
     - Official channels: `govt_alerts`
     """
     try:
-        trust_agent.reputation_manager.track_external_source(
+        get_trust_agent().reputation_manager.track_external_source(
             source_type=source.source_type,
             source_id=source.source_id,
             source_name=source.source_name
@@ -269,14 +269,14 @@ async def submit_source_feedback(feedback: SourceFeedbackRequest):
     Update source reliability based on accuracy.
     """
     try:
-        trust_agent.reputation_manager.update_source_reputation(
+        get_trust_agent().reputation_manager.update_source_reputation(
             source_type=feedback.source_type,
             source_id=feedback.source_id,
             was_accurate=feedback.was_accurate
         )
         
         # Get updated stats
-        stats = trust_agent.reputation_manager.get_source_stats(
+        stats = get_trust_agent().reputation_manager.get_source_stats(
             feedback.source_type,
             feedback.source_id
         )
@@ -299,7 +299,7 @@ async def get_source_stats(source_type: str, source_id: str):
     **Get source reliability statistics**
     """
     try:
-        stats = trust_agent.reputation_manager.get_source_stats(source_type, source_id)
+        stats = get_trust_agent().reputation_manager.get_source_stats(source_type, source_id)
         
         if stats is None:
             return {
@@ -335,7 +335,7 @@ async def get_crisis_info(crisis_type: str):
     - `traffic` → LOW (higher thresholds)
     """
     try:
-        info = trust_agent.get_crisis_info(crisis_type)
+        info = get_trust_agent().get_crisis_info(crisis_type)
         
         return {
             "success": True,
@@ -364,7 +364,7 @@ async def get_system_status():
     - Scoring configuration
     """
     try:
-        status = trust_agent.get_system_status()
+        status = get_trust_agent().get_system_status()
         
         return {
             "success": True,
@@ -390,7 +390,7 @@ async def get_statistics():
     - Agent performance metrics
     """
     try:
-        stats = trust_agent.db.get_statistics()
+        stats = get_trust_agent().db.get_statistics()
         
         return {
             "success": True,
@@ -403,6 +403,59 @@ async def get_statistics():
             detail=f"Failed to fetch statistics: {str(e)}"
         )
 
+@router.get("/cache", response_model=Dict)
+async def get_cache_statistics():
+    """
+    **Get verification result cache statistics**
+    
+    ### Returns:
+    - Hits, misses and hit ratio
+    - Current entries, TTL and capacity
+    """
+    try:
+        stats = get_trust_agent().result_cache.get_statistics()
+        
+        return {
+            "success": True,
+            "data": stats
+        }
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fetch cache statistics: {str(e)}"
+        )
+
+@router.get("/storage", response_model=Dict)
+async def get_storage_report():
+    """
+    **Get trust database size and retention report**
+    
+    ### Returns:
+    - File size, page count and free pages
+    - Hot, archived and summarized row counts per trust table
+    """
+    try:
+        agent = get_trust_agent()
+        if agent.mode != 'database':
+            return {
+                "success": False,
+                "error": "Only available in database mode"
+            }
+        
+        report = TrustRetention(agent.db).get_size_report()
+        
+        return {
+            "success": True,
+            "data": report
+        }
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to fetch storage report: {str(e)}"
+        )
+
 @router.get("/performance", response_model=Dict)
 async def get_agent_performance(
     days: int = Query(7, ge=1, le=90, description="Number of days to analyze")
@@ -413,7 +466,7 @@ async def get_agent_performance(
     Shows how well the Trust Agent itself is performing.
     """
     try:
-        performance = trust_agent.get_agent_performance(days)
+        performance = get_trust_agent().get_agent_performance(days)
         
         return {
             "success": True,
@@ -434,7 +487,7 @@ async def health_check():
     Quick check if Trust Agent is operational.
     """
     try:
-        status = trust_agent.get_system_status()
+        status = get_trust_agent().get_system_status()
         
         return {
             "status": "healthy",
@@ -460,7 +513,7 @@ async def get_rate_limit_status(user_id: str):
     Shows current usage and remaining quota.
     """
     try:
-        stats = trust_agent.rate_limiter.get_user_usage_stats(user_id)
+        stats = get_trust_agent().rate_limiter.get_user_usage_stats(user_id)
         
         return {
             "success": True,
@@ -483,7 +536,7 @@ async def get_thresholds(crisis_type: Optional[str] = None):
     Optionally filter by crisis type to see dynamic thresholds.
     """
     try:
-        thresholds = trust_agent.scorer.get_thresholds(crisis_type)
+        thresholds = get_trust_agent().scorer.get_thresholds(crisis_type)
         
         return {
             "success": True,
@@ -507,7 +560,7 @@ async def get_configuration():
     Returns all configuration settings.
     """
     try:
-        config = trust_agent.scorer.get_scoring_summary()
+        config = get_trust_agent().scorer.get_scoring_summary()
         
         return {
             "success": True,
@@ -0,0 +1,425 @@
+"""
+Resource allocation scalability benchmark
+
+Generates a synthetic Dehradun: N volunteers (skewed skill mix, ~85%
+available) spread over the city, N/10 resources and K concurrent crises,
+in a fresh SQLite database per scale. It then drives:
+
+- volunteer pool build (the one full read of the users table)
+- ResourceAgent.match_volunteers_to_crisis, once per crisis
+- ResourceAgent.reassign_failed_task, for the tasks just assigned
+- ResourceAgent.allocate_open_crises, one joint batch over K more crises
+- GeoOptimizer.optimize_allocation over every resource, per crisis
+- SkillMatcher.match_skills over every volunteer, per crisis
+
+For each scale/operation it reports p50/p99 latency, SQL statements per
+call and peak traced memory (a separate tracemalloc pass, so latency is
+measured untraced), and compares them with a saved baseline.
+
+Usage (from the project root):
+    python -m backend.benchmarks.allocation_benchmark
+    python -m backend.benchmarks.allocation_benchmark --scales 1000,10000,100000
+    python -m backend.benchmarks.allocation_benchmark --save-baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.append(os.path.dirname(BACKEND_DIR))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from db.database import Base
+from db import models
+from db.volunteer_pool import volunteer_pool
+from agents.resource.dispatch_queue import dispatch_queue
+from agents.resource_agent import ResourceAgent
+from agents.resource.geo_optimizer import GeoOptimizer
+from agents.resource.skill_matcher import SkillMatcher
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'resource_allocation.json')
+
+# Operations that run once per scale are repeated, so p50/p99 are not one sample
+SINGLE_SHOT_REPEATS = 5
+
+# Dehradun clock tower - the synthetic city is centred here
+CITY_CENTER = (30.3244, 78.0419)
+CITY_SPAN_DEG = 0.12  # ~13 km each way
+
+# Share of volunteers holding each skill (one to three skills each)
+SKILL_WEIGHTS = {
+    'first_aid': 35, 'rescue': 20, 'driver': 20, 'logistics': 15,
+    'medical': 10, 'firefighting': 8, 'water_rescue': 5, 'communication': 5
+}
+
+CRISIS_TYPES = ['fire', 'flood', 'medical', 'accident', 'earthquake']
+SEVERITIES = ['critical', 'high', 'high', 'medium', 'low']
+
+# Skills asked of SkillMatcher per crisis type
+REQUIRED_SKILLS = {
+    'fire': ['firefighting', 'first_aid', 'rescue'],
+    'flood': ['water_rescue', 'logistics', 'first_aid'],
+    'medical': ['first_aid', 'medical', 'driver'],
+    'accident': ['rescue', 'first_aid'],
+    'earthquake': ['rescue', 'first_aid', 'logistics']
+}
+
+
+# ---------- SYNTHETIC CITY ----------
+
+def _point(rng: random.Random) -> Dict[str, float]:
+    return {
+        'lat': CITY_CENTER[0] + rng.uniform(-CITY_SPAN_DEG, CITY_SPAN_DEG),
+        'lon': CITY_CENTER[1] + rng.uniform(-CITY_SPAN_DEG, CITY_SPAN_DEG)
+    }
+
+
+def generate_volunteers(n: int, rng: random.Random) -> List[Dict]:
+    skills, weights = list(SKILL_WEIGHTS), list(SKILL_WEIGHTS.values())
+    volunteers = []
+    for i in range(n):
+        p = _point(rng)
+        volunteers.append({
+            'id': f"bv_{i:06d}",
+            'phone': f"9{i:09d}",
+            'password': '$2b$12$benchmark',
+            'role': 'volunteer',
+            'name': f"Volunteer {i}",
+            'latitude': p['lat'],
+            'longitude': p['lon'],
+            'skills': sorted(set(rng.choices(skills, weights, k=rng.randint(1, 3)))),
+            'availability': '1' if rng.random() < 0.85 else '0',
+            'reliability_score': round(rng.uniform(0.6, 1.0), 2)
+        })
+    return volunteers
+
+
+def generate_resources(m: int, rng: random.Random) -> List[Dict]:
+    types = list(GeoOptimizer.SPEEDS)
+    return [
+        {'id': f"br_{i:05d}", 'type': rng.choice(types), 'location': _point(rng), 'available': True}
+        for i in range(m)
+    ]
+
+
+def generate_crises(k: int, rng: random.Random, prefix: str) -> List[Dict]:
+    crises = []
+    for i in range(k):
+        p = _point(rng)
+        crisis_type = rng.choice(CRISIS_TYPES)
+        crises.append({
+            'id': f"{prefix}_{i:04d}",
+            'title': f"{crisis_type.title()} #{i}",
+            'crisis_type': crisis_type,
+            'severity': rng.choice(SEVERITIES),
+            'latitude': p['lat'],
+            'longitude': p['lon'],
+            'status': 'pending',
+            'trust_score': round(rng.uniform(0.5, 1.0), 2)
+        })
+    return crises
+
+
+def build_city(db_url: str, n: int, m: int, k: int, seed: int):
+    """Create and fill a fresh database; returns (sessionmaker, engine, city)"""
+    rng = random.Random(seed)
+    engine = create_engine(db_url, connect_args={'check_same_thread': False})
+    Base.metadata.create_all(bind=engine)
+
+    volunteers = generate_volunteers(n, rng)
+    city = {
+        'volunteers': volunteers,
+        'resources': generate_resources(m, rng),
+        'crises': generate_crises(k, rng, 'bc'),
+        'batch_crises': generate_crises(k, rng, 'bb')
+    }
+
+    with engine.begin() as conn:
+        conn.execute(models.User.__table__.insert(), volunteers)
+        conn.execute(models.VolunteerSkill.__table__.insert(), [
+            {'user_id': v['id'], 'skill': s} for v in volunteers for s in v['skills']
+        ])
+        conn.execute(models.Crisis.__table__.insert(), city['crises'] + city['batch_crises'])
+
+    return sessionmaker(bind=engine, autoflush=False), engine, city
+
+
+# ---------- INSTRUMENTATION ----------
+
+class QueryCounter:
+    """Counts SQL statements the engine executes"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args):
+        self.count += 1
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def measure(name: str, scale: int, calls: List[Callable], counter: QueryCounter) -> Dict:
+    """Time each call and count its statements"""
+    latencies = []
+    before = counter.count
+    for call in calls:
+        t = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - t) * 1000)
+    # Queued notifications/metrics are part of the cost, just not the latency
+    dispatch_queue.flush()
+    statements = counter.count - before
+
+    return {
+        'scale': scale,
+        'op': name,
+        'calls': len(calls),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'queries_per_call': round(statements / len(calls), 2) if calls else 0.0
+    }
+
+
+def peak_memory_mb(call: Callable) -> float:
+    tracemalloc.start()
+    try:
+        call()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return round(peak / (1024 * 1024), 2)
+
+
+# ---------- WORKLOAD ----------
+
+def run_scale(n: int, k: int, resource_ratio: float, seed: int) -> List[Dict]:
+    m = max(1, int(n * resource_ratio))
+    results = []
+
+    with tempfile.TemporaryDirectory() as workdir:
+        Session, engine, city = build_city(f"sqlite:///{os.path.join(workdir, 'alloc.db')}", n, m, k, seed)
+        counter = QueryCounter(engine)
+        db = Session()
+        agent = ResourceAgent(db)
+        geo = GeoOptimizer()
+        skill_matcher = SkillMatcher()
+        volunteer_dicts = [
+            {'id': v['id'], 'skills': v['skills'], 'location': {'lat': v['latitude'], 'lon': v['longitude']}}
+            for v in city['volunteers']
+        ]
+        crisis_ids = [c['id'] for c in city['crises']]
+
+        try:
+            def build_pool():
+                # A fresh session each time, so no build reuses loaded users
+                with Session() as session:
+                    volunteer_pool.build(session)
+
+            volunteer_pool.invalidate()
+            pool = measure('pool_build', n, [build_pool] * SINGLE_SHOT_REPEATS, counter)
+            pool['peak_mb'] = peak_memory_mb(lambda: volunteer_pool.build(db))
+            results.append(pool)
+
+            match = measure('match_volunteers_to_crisis', n, [
+                (lambda cid=cid: agent.match_volunteers_to_crisis(cid)) for cid in crisis_ids
+            ], counter)
+            results.append(match)
+
+            assigned = [
+                t.id for t in db.query(models.Task).filter(models.Task.status == 'assigned').limit(k).all()
+            ]
+            reassign = measure('reassign_failed_task', n, [
+                (lambda tid=tid: agent.reassign_failed_task(tid, 'benchmark')) for tid in assigned
+            ], counter)
+            results.append(reassign)
+
+            # One batch of K fresh crises per repetition (a batch is filled once)
+            batches = [[c['id'] for c in city['batch_crises']]]
+            for rep in range(1, SINGLE_SHOT_REPEATS):
+                crises = generate_crises(k, random.Random(seed + 100 + rep), f'bb{rep}')
+                db.add_all([models.Crisis(**c) for c in crises])
+                batches.append([c['id'] for c in crises])
+            db.commit()
+            batch = measure('allocate_open_crises', n, [
+                (lambda ids=ids: agent.allocate_open_crises(ids)) for ids in batches
+            ], counter)
+            results.append(batch)
+
+            optimize = measure('optimize_allocation', n, [
+                (lambda c=c: geo.optimize_allocation(
+                    city['resources'], {'lat': c['latitude'], 'lon': c['longitude']}, 8
+                )) for c in city['crises']
+            ], counter)
+            first = city['crises'][0]
+            optimize['peak_mb'] = peak_memory_mb(lambda: geo.optimize_allocation(
+                city['resources'], {'lat': first['latitude'], 'lon': first['longitude']}, 8
+            ))
+            results.append(optimize)
+
+            skills = measure('match_skills', n, [
+                (lambda c=c: skill_matcher.match_skills(volunteer_dicts, REQUIRED_SKILLS[c['crisis_type']]))
+                for c in city['crises']
+            ], counter)
+            skills['peak_mb'] = peak_memory_mb(
+                lambda: skill_matcher.match_skills(volunteer_dicts, REQUIRED_SKILLS[first['crisis_type']])
+            )
+            results.append(skills)
+
+            # Memory for the DB-backed ops on crises that still need volunteers
+            extra = generate_crises(1, random.Random(seed + 1), 'bm')[0]
+            db.add(models.Crisis(**extra))
+            db.commit()
+            match['peak_mb'] = peak_memory_mb(lambda: agent.match_volunteers_to_crisis(extra['id']))
+            task = db.query(models.Task).filter(
+                models.Task.crisis_id == extra['id'], models.Task.status == 'assigned'
+            ).first()
+            reassign['peak_mb'] = peak_memory_mb(lambda: agent.reassign_failed_task(task.id, 'benchmark')) if task else None
+            batch['peak_mb'] = None
+        finally:
+            dispatch_queue.flush()
+            db.close()
+            engine.dispose()
+            volunteer_pool.invalidate()
+
+    return results
+
+
+# ---------- BASELINE ----------
+
+COMPARED_METRICS = [
+    # (metric, higher_is_better)
+    ('p50_ms', False),
+    ('p99_ms', False),
+    ('queries_per_call', False),
+    ('peak_mb', False),
+]
+
+
+def load_baseline(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results: List[Dict], args):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    baseline = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'crises': args.crises,
+        'resource_ratio': args.resource_ratio,
+        'python': sys.version.split()[0],
+        'results': {f"{r['op']}@{r['scale']}": r for r in results}
+    }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+    print(f"Baseline saved to {path}")
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float):
+    """
+    Return regressions worse than `tolerance` (fraction) against the
+    baseline, and the per-metric change in percent by op@scale (kept
+    apart from `results`, which may be saved as the next baseline)
+    """
+    regressions = []
+    deltas: Dict[str, Dict[str, float]] = {}
+    base_results = baseline.get('results', {})
+
+    for r in results:
+        key = f"{r['op']}@{r['scale']}"
+        base = base_results.get(key)
+        if not base:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            new, old = r.get(metric), base.get(metric)
+            if new is None or not old:
+                continue
+            change = (new - old) / old
+            deltas.setdefault(key, {})[metric] = round(change * 100, 1)
+            worse = -change if higher_is_better else change
+            if worse > tolerance:
+                regressions.append(f"{key} {metric}: {old} -> {new} ({change * 100:+.1f}%)")
+    return regressions, deltas
+
+
+# ---------- REPORT ----------
+
+def print_report(results: List[Dict], baseline: Dict, deltas: Dict[str, Dict[str, float]]):
+    print("\n" + "=" * 96)
+    print("  RESOURCE ALLOCATION BENCHMARK")
+    if baseline:
+        print(f"  Baseline: {baseline.get('created_at')} ({baseline.get('crises')} crises per scale)")
+    print("=" * 96)
+    print(f"  {'operation':<28}{'volunteers':>11}{'calls':>7}{'p50 ms':>10}{'p99 ms':>10}{'queries':>10}{'peak MB':>10}")
+
+    for r in results:
+        peak = '-' if r.get('peak_mb') is None else f"{r['peak_mb']:.2f}"
+        print(f"  {r['op']:<28}{r['scale']:>11}{r['calls']:>7}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+              f"{r['queries_per_call']:>10.1f}{peak:>10}")
+        delta = deltas.get(f"{r['op']}@{r['scale']}")
+        if delta:
+            changes = ', '.join(f"{k} {v:+.1f}%" for k, v in delta.items())
+            print(f"  {'':<28}vs baseline: {changes}")
+    print("=" * 96)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark resource allocation at increasing scale")
+    parser.add_argument('--scales', default='1000,5000,20000', help="Comma-separated volunteer counts")
+    parser.add_argument('--crises', type=int, default=20, help="Concurrent crises per scale")
+    parser.add_argument('--resource-ratio', type=float, default=0.1, help="Resources per volunteer")
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON path")
+    parser.add_argument('--save-baseline', action='store_true', help="Overwrite the baseline with this run")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed regression (fraction)")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit 1 if a metric regresses")
+    args = parser.parse_args()
+
+    # Keep per-task "no volunteers available" warnings out of the report
+    logging.disable(logging.WARNING)
+
+    results = []
+    for scale in [int(s) for s in args.scales.split(',') if s.strip()]:
+        results.extend(run_scale(scale, args.crises, args.resource_ratio, args.seed))
+
+    logging.disable(logging.NOTSET)
+
+    baseline = load_baseline(args.baseline)
+    regressions, deltas = compare(results, baseline, args.tolerance) if baseline else ([], {})
+    print_report(results, baseline, deltas)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, args)
+    elif not baseline:
+        print("No baseline found - run with --save-baseline to record one")
+
+    if regressions:
+        print("\nRegressions beyond tolerance:")
+        for line in regressions:
+            print(f"  {line}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Import-time profile for API cold start
+
+Runs `python -X importtime` on a fresh interpreter (the same thing a
+serverless cold start pays for) and reports the slowest modules, plus the
+cost of building each lazily-created agent singleton on first use.
+
+Usage (from the project root):
+    python -m backend.benchmarks.import_profile
+    python -m backend.benchmarks.import_profile --module backend.main --top 30
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+BACKEND_DIR = os.path.join(PROJECT_ROOT, 'backend')
+
+# (label, import statement, first-use call) - timed in-process after import
+SINGLETONS = [
+    ('TrustAgent', 'from backend.agents.trust_agent import get_trust_agent', 'get_trust_agent()'),
+    ('LearningAgent', 'from backend.agents.learning.learning_agent import get_learning_agent', 'get_learning_agent()'),
+    ('TwitterService.client', 'from backend.services.social_media_service import social_media_service',
+     'social_media_service.twitter.client'),
+]
+
+
+def _child_env() -> Dict[str, str]:
+    env = os.environ.copy()
+    # Same layout main.py sets up: both `backend.x` and bare `x` imports resolve
+    env['PYTHONPATH'] = os.pathsep.join(
+        p for p in [BACKEND_DIR, PROJECT_ROOT, env.get('PYTHONPATH')] if p
+    )
+    return env
+
+
+def profile_imports(module: str) -> Dict:
+    """Import `module` in a child interpreter with -X importtime and parse the log"""
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT,
+        env=_child_env(),
+        capture_output=True,
+        text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|')
+            entries.append({
+                'module': name.rstrip(),
+                'name': name.strip(),
+                'self_ms': int(self_us) / 1000,
+                'cumulative_ms': int(cumulative_us) / 1000
+            })
+        except ValueError:
+            continue
+
+    errors = [l for l in proc.stderr.splitlines() if not l.startswith('import time:')]
+
+    return {
+        'module': module,
+        'ok': proc.returncode == 0,
+        'wall_ms': round(wall_ms, 1),
+        'entries': entries,
+        'errors': errors[-5:] if proc.returncode != 0 else []
+    }
+
+
+def profile_singletons() -> List[Dict]:
+    """Time the first call of each lazy singleton in a child interpreter"""
+    results = []
+    for label, import_stmt, call in SINGLETONS:
+        code = (
+            'import time, io, contextlib\n'
+            f'{import_stmt}\n'
+            't = time.perf_counter()\n'
+            'with contextlib.redirect_stdout(io.StringIO()):\n'
+            f'    {call}\n'
+            'print((time.perf_counter() - t) * 1000)\n'
+        )
+        proc = subprocess.run(
+            [sys.executable, '-c', code],
+            cwd=PROJECT_ROOT,
+            env=_child_env(),
+            capture_output=True,
+            text=True
+        )
+        if proc.returncode == 0:
+            results.append({'singleton': label, 'first_use_ms': round(float(proc.stdout.strip().splitlines()[-1]), 1)})
+        else:
+            results.append({'singleton': label, 'error': proc.stderr.strip().splitlines()[-1]})
+    return results
+
+
+def print_report(report: Dict, singletons: List[Dict], top: int):
+    print("=" * 70)
+    print(f"  IMPORT PROFILE: {report['module']}")
+    print("=" * 70)
+    if not report['ok']:
+        print("  Import failed:")
+        for line in report['errors']:
+            print(f"    {line}")
+
+    entries = report['entries']
+    total_ms = sum(e['self_ms'] for e in entries)
+    print(f"  Wall time (interpreter + import): {report['wall_ms']:.1f}ms")
+    print(f"  Sum of module self time:          {total_ms:.1f}ms over {len(entries)} modules\n")
+
+    print(f"  {'cumulative':>11} {'self':>9}  module")
+    for e in sorted(entries, key=lambda e: e['cumulative_ms'], reverse=True)[:top]:
+        print(f"  {e['cumulative_ms']:>9.1f}ms {e['self_ms']:>7.1f}ms  {e['module']}")
+
+    project = [e for e in entries if e['name'].split('.')[0] in ('backend', 'agents', 'api', 'db', 'core', 'services', 'ws')]
+    if project:
+        print(f"\n  Slowest project modules (self time):")
+        for e in sorted(project, key=lambda e: e['self_ms'], reverse=True)[:10]:
+            print(f"  {e['self_ms']:>9.1f}ms  {e['name']}")
+
+    print(f"\n  Lazy singletons (first use, after import):")
+    for s in singletons:
+        if 'error' in s:
+            print(f"  {'failed':>11}  {s['singleton']}: {s['error']}")
+        else:
+            print(f"  {s['first_use_ms']:>9.1f}ms  {s['singleton']}")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import-time cost of the API")
+    parser.add_argument('--module', default='backend.main', help="Module to import (default: backend.main)")
+    parser.add_argument('--top', type=int, default=20, help="Number of modules to list")
+    parser.add_argument('--skip-singletons', action='store_true', help="Don't time lazy singletons")
+    args = parser.parse_args()
+
+    report = profile_imports(args.module)
+    singletons = [] if args.skip_singletons else profile_singletons()
+    print_report(report, singletons, args.top)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+"""
+Trust verification latency benchmark
+
+Replays the mock_alerts.json scenarios plus two generated bursts through
+TrustAgent.verify_alert, in both database (SQLite) and JSON mode:
+
+- city_burst: many users reporting the same incident at one location,
+  which is what a city-wide event looks like to cross-verification
+- user_burst: one user submitting many reports (with app retries mixed in),
+  which exercises the rate limiter, duplicate detector and result cache
+
+For each mode/workload it reports p50/p99 latency, throughput and SQLite
+statements per alert, and compares them with a saved baseline recorded
+with the same burst size.
+
+VERIFIED alerts are normally queued for batch resource allocation; the
+queue is replaced with a counter ("allocations") so the numbers measure
+trust verification, unless --with-allocation is passed.
+
+Usage (from the project root):
+    python -m backend.benchmarks.trust_benchmark
+    python -m backend.benchmarks.trust_benchmark --burst-size 500
+    python -m backend.benchmarks.trust_benchmark --save-baseline
+    python -m backend.benchmarks.trust_benchmark --with-allocation
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import types
+from collections import Counter
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+sys.path.append(os.path.dirname(BACKEND_DIR))
+
+from backend.agents.trust_agent import TrustAgent
+
+MOCK_ALERTS_PATH = os.path.join(BACKEND_DIR, 'agents', 'trust', 'mock_alerts.json')
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'trust_verification.json')
+
+# Dehradun clock tower - generated bursts are centred here
+CITY_CENTER = (30.3244, 78.0419)
+
+
+# ---------- WORKLOADS ----------
+
+def load_scenarios(path: str = MOCK_ALERTS_PATH) -> List[Dict]:
+    """Flatten every mock scenario into one ordered replay list"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    alerts = []
+    for scenario in data.get('scenarios', {}).values():
+        for alert in scenario.get('alerts', []):
+            alerts.append({k: v for k, v in alert.items() if k not in ('timestamp', 'expected_result')})
+    return alerts
+
+
+def generate_city_burst(size: int, seed: int = 7) -> List[Dict]:
+    """Many users, one incident: correlated reports within ~1km"""
+    rng = random.Random(seed)
+    messages = [
+        "Water entering houses near the river, need rescue",
+        "Flooding on the main road, cars stuck",
+        "Severe flooding here, families trapped on roofs",
+        "River has overflowed, urgent help needed",
+        "Water level rising fast in our colony"
+    ]
+    return [
+        {
+            'user_id': f"citizen_{i:05d}",
+            'crisis_type': 'flood',
+            'location': 'Rispana Bridge, Dehradun',
+            'lat': CITY_CENTER[0] + rng.uniform(-0.005, 0.005),
+            'lon': CITY_CENTER[1] + rng.uniform(-0.005, 0.005),
+            'message': rng.choice(messages),
+            'severity': rng.choice(['high', 'high', 'critical', 'medium']),
+            'has_image': rng.random() < 0.4
+        }
+        for i in range(size)
+    ]
+
+
+def generate_user_burst(size: int, retry_every: int = 4, seed: int = 11) -> List[Dict]:
+    """One user, many reports; every `retry_every`-th report repeats the previous one"""
+    rng = random.Random(seed)
+    places = ['Paltan Bazaar', 'ISBT Dehradun', 'Rajpur Road', 'Prem Nagar', 'Clement Town']
+    alerts = []
+    for i in range(size):
+        if alerts and retry_every and i % retry_every == 0:
+            alerts.append(dict(alerts[-1]))
+            continue
+        alerts.append({
+            'user_id': 'burst_user_001',
+            'crisis_type': rng.choice(['fire', 'flood', 'accident']),
+            'location': rng.choice(places),
+            'lat': CITY_CENTER[0] + rng.uniform(-0.05, 0.05),
+            'lon': CITY_CENTER[1] + rng.uniform(-0.05, 0.05),
+            'message': f"Report {i}: situation at {rng.choice(places)}",
+            'has_image': False
+        })
+    return alerts
+
+
+# ---------- INSTRUMENTATION ----------
+
+class StatementCounter:
+    """Counts SQL statements issued through TrustDatabase.get_connection"""
+
+    def __init__(self, db):
+        self.count = 0
+        if not hasattr(db, 'db_path'):
+            self.supported = False
+            return
+
+        self.supported = True
+        original = db.get_connection
+
+        def counted_connection():
+            conn = original()
+            conn.set_trace_callback(self._on_statement)
+            return conn
+
+        db.get_connection = counted_connection
+
+    def _on_statement(self, _sql):
+        self.count += 1
+
+
+class AllocationStub:
+    """
+    Stands in for the allocation queue while installed, so verified
+    alerts are counted instead of queued for the app database
+    """
+
+    MODULE = 'backend.agents.resource.allocation_queue'
+
+    def __init__(self):
+        self.calls = 0
+        self.module = types.ModuleType(self.MODULE)
+        self.module.allocation_queue = self
+        self._saved = None
+
+    def submit(self, crisis_id: str):
+        self.calls += 1
+
+    def __enter__(self):
+        self._saved = sys.modules.get(self.MODULE)
+        sys.modules[self.MODULE] = self.module
+        return self
+
+    def __exit__(self, *exc):
+        if self._saved is not None:
+            sys.modules[self.MODULE] = self._saved
+        else:
+            sys.modules.pop(self.MODULE, None)
+
+
+def build_agent(mode: str, workdir: str) -> TrustAgent:
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'database':
+            return TrustAgent(use_database=True, db_path=os.path.join(workdir, 'trust_bench.db'))
+        return TrustAgent(use_database=False, json_data_path=MOCK_ALERTS_PATH)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[rank]
+
+
+def run_workload(mode: str, name: str, alerts: List[Dict], with_allocation: bool = False) -> Dict:
+    """Replay alerts through a fresh agent and collect latency/statement stats"""
+    stub = AllocationStub()
+    with tempfile.TemporaryDirectory() as workdir, \
+            (contextlib.nullcontext() if with_allocation else stub):
+        agent = build_agent(mode, workdir)
+        counter = StatementCounter(agent.db)
+
+        latencies = []
+        decisions = Counter()
+        started = time.perf_counter()
+
+        for alert in alerts:
+            t = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = agent.verify_alert(dict(alert))
+            latencies.append((time.perf_counter() - t) * 1000)
+            decisions[result.get('decision', 'UNKNOWN')] += 1
+
+        elapsed = time.perf_counter() - started
+        cache_stats = agent.result_cache.get_statistics()
+
+    return {
+        'mode': mode,
+        'workload': name,
+        'alerts': len(alerts),
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(max(latencies), 3) if latencies else 0.0,
+        'throughput_per_s': round(len(alerts) / elapsed, 1) if elapsed > 0 else 0.0,
+        'statements_per_alert': round(counter.count / len(alerts), 2) if counter.supported and alerts else None,
+        'cache_hit_ratio': cache_stats['hit_ratio'],
+        'allocations': None if with_allocation else stub.calls,
+        'decisions': dict(decisions)
+    }
+
+
+# ---------- BASELINE ----------
+
+COMPARED_METRICS = [
+    # (metric, higher_is_better)
+    ('p50_ms', False),
+    ('p99_ms', False),
+    ('throughput_per_s', True),
+    ('statements_per_alert', False),
+]
+
+
+def load_baseline(path: str) -> Dict:
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_baseline(path: str, results: List[Dict], burst_size: int, with_allocation: bool):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    baseline = {
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'burst_size': burst_size,
+        'with_allocation': with_allocation,
+        'python': sys.version.split()[0],
+        'results': {f"{r['mode']}/{r['workload']}": r for r in results}
+    }
+    with open(path, 'w') as f:
+        json.dump(baseline, f, indent=2)
+    print(f"Baseline saved to {path}")
+
+
+def comparable(baseline: Dict, burst_size: int, with_allocation: bool) -> bool:
+    """
+    Whether the baseline was recorded with the same workload settings
+    (one that does not say whether allocation ran is not comparable)
+    """
+    return (baseline.get('burst_size') == burst_size
+            and baseline.get('with_allocation') == with_allocation)
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float):
+    """
+    Return regressions worse than `tolerance` (fraction) against the
+    baseline, and the per-metric change in percent by mode/workload
+    (kept apart from `results`, which may be saved as the next baseline)
+    """
+    regressions = []
+    deltas: Dict[str, Dict[str, float]] = {}
+    base_results = baseline.get('results', {})
+
+    for r in results:
+        key = f"{r['mode']}/{r['workload']}"
+        base = base_results.get(key)
+        if not base:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS:
+            new, old = r.get(metric), base.get(metric)
+            if new is None or not old:
+                continue
+            change = (new - old) / old
+            deltas.setdefault(key, {})[metric] = round(change * 100, 1)
+            worse = -change if higher_is_better else change
+            if worse > tolerance:
+                regressions.append(f"{key} {metric}: {old} -> {new} ({change * 100:+.1f}%)")
+    return regressions, deltas
+
+
+# ---------- REPORT ----------
+
+def print_report(results: List[Dict], baseline: Dict, deltas: Dict[str, Dict[str, float]]):
+    print("\n" + "=" * 96)
+    print("  TRUST VERIFICATION BENCHMARK")
+    if baseline:
+        print(f"  Baseline: {baseline.get('created_at')} (burst size {baseline.get('burst_size')}"
+              f"{', with allocation' if baseline.get('with_allocation') else ''})")
+    print("=" * 96)
+    print(f"  {'mode/workload':<26}{'alerts':>7}{'p50 ms':>10}{'p99 ms':>10}{'alerts/s':>11}{'stmts/alert':>13}{'cache hit':>11}")
+
+    for r in results:
+        stmts = '-' if r['statements_per_alert'] is None else f"{r['statements_per_alert']:.1f}"
+        print(f"  {r['mode'] + '/' + r['workload']:<26}{r['alerts']:>7}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+              f"{r['throughput_per_s']:>11.1f}{stmts:>13}{r['cache_hit_ratio']:>10.0%}")
+        delta = deltas.get(f"{r['mode']}/{r['workload']}")
+        if delta:
+            changes = ', '.join(f"{k} {v:+.1f}%" for k, v in delta.items())
+            print(f"  {'':<26}vs baseline: {changes}")
+        print(f"  {'':<26}decisions: {r['decisions']}"
+              + ('' if r['allocations'] is None else f", allocations stubbed: {r['allocations']}"))
+    print("=" * 96)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TrustAgent.verify_alert latency")
+    parser.add_argument('--burst-size', type=int, default=200, help="Alerts per generated burst")
+    parser.add_argument('--modes', default='database,json', help="Comma-separated: database,json")
+    parser.add_argument('--baseline', default=BASELINE_PATH, help="Baseline JSON path")
+    parser.add_argument('--save-baseline', action='store_true', help="Overwrite the baseline with this run")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed regression (fraction)")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit 1 if a metric regresses")
+    parser.add_argument('--with-allocation', action='store_true',
+                        help="Queue VERIFIED alerts for real resource allocation")
+    args = parser.parse_args()
+
+    workloads = {
+        'mock_scenarios': load_scenarios(),
+        'city_burst': generate_city_burst(args.burst_size),
+        'user_burst': generate_user_burst(args.burst_size),
+    }
+
+    results = []
+    for mode in [m.strip() for m in args.modes.split(',') if m.strip()]:
+        for name, alerts in workloads.items():
+            results.append(run_workload(mode, name, alerts, args.with_allocation))
+
+    baseline = load_baseline(args.baseline)
+    skipped = bool(baseline) and not comparable(baseline, args.burst_size, args.with_allocation)
+    regressions, deltas = compare(results, baseline, args.tolerance) if baseline and not skipped else ([], {})
+    print_report(results, baseline, deltas)
+
+    if args.save_baseline:
+        save_baseline(args.baseline, results, args.burst_size, args.with_allocation)
+    elif not baseline:
+        print("No baseline found - run with --save-baseline to record one")
+    elif skipped:
+        print(f"Baseline was recorded with burst size {baseline.get('burst_size')} and "
+              f"with_allocation={baseline.get('with_allocation')}; not compared")
+
+    if regressions:
+        print("\nRegressions beyond tolerance:")
+        for line in regressions:
+            print(f"  {line}")
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""
+Weekly volunteer availability as 168-bit hour-of-week masks
+
+Bit h is set when the volunteer is available during hour h of the week
+(Monday 00:00 = 0, local time). Masks are stored as three signed 64-bit
+words so they fit integer columns, and tested in bulk as uint64 arrays.
+"""
+
+import os
+import re
+from datetime import datetime, timedelta
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+HOURS_PER_DAY = 24
+HOURS_PER_WEEK = 7 * HOURS_PER_DAY
+WORDS = 3
+FULL_WEEK = (1 << HOURS_PER_WEEK) - 1
+
+# Shift times are local; volunteers are in IST unless configured otherwise
+UTC_OFFSET_MINUTES = int(os.getenv("AVAILABILITY_UTC_OFFSET_MINUTES", "330"))
+
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+
+
+def window_mask(start_hour: int, hours: int) -> int:
+    """`hours` consecutive hours from start_hour, wrapping at the week's end"""
+    hours = max(0, min(hours, HOURS_PER_WEEK))
+    start_hour %= HOURS_PER_WEEK
+    mask = ((1 << hours) - 1) << start_hour
+    return (mask | (mask >> HOURS_PER_WEEK)) & FULL_WEEK
+
+
+def _days_hours(days: Sequence[int], start: int, end: int) -> int:
+    """Hours [start, end) on each day; end <= start wraps past midnight"""
+    length = (end - start) % HOURS_PER_DAY or HOURS_PER_DAY
+    mask = 0
+    for day in days:
+        mask |= window_mask(day * HOURS_PER_DAY + start, length)
+    return mask
+
+
+EVERY_DAY = range(7)
+
+PRESETS = {
+    "anytime": FULL_WEEK,
+    "weekdays": _days_hours(range(5), 0, 24),
+    "weekends": _days_hours(range(5, 7), 0, 24),
+    "mornings": _days_hours(EVERY_DAY, 6, 12),
+    "afternoons": _days_hours(EVERY_DAY, 12, 18),
+    "evenings": _days_hours(EVERY_DAY, 18, 24),
+    "nights": _days_hours(EVERY_DAY, 22, 6),
+}
+
+# Legacy on/off values (the column used to hold a boolean)
+ON_VALUES = {"1", "true", "yes", "available"}
+
+_CUSTOM = re.compile(r"^([a-z]{3})(?:-([a-z]{3}))?\s+(\d{1,2})(?::00)?-(\d{1,2})(?::00)?$")
+
+
+def compile_availability(value) -> int:
+    """
+    Compile an availability value to its mask
+
+    Accepts booleans, presets ('anytime', 'weekdays', 'weekends',
+    'mornings', 'afternoons', 'evenings', 'nights') and day/hour ranges
+    such as 'mon-fri 09-17' or 'sat 22-06', joined with ',' or '+'.
+    Anything unrecognised compiles to 0 (never available).
+    """
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return FULL_WEEK if value else 0
+
+    mask = 0
+    for token in re.split(r"[,+;]", str(value).strip().lower()):
+        token = token.strip()
+        if not token:
+            continue
+        if token in PRESETS:
+            mask |= PRESETS[token]
+        elif token in ON_VALUES:
+            mask |= FULL_WEEK
+        else:
+            match = _CUSTOM.match(token)
+            if match and match.group(1) in DAYS and (match.group(2) or match.group(1)) in DAYS:
+                first = DAYS.index(match.group(1))
+                last = DAYS.index(match.group(2) or match.group(1))
+                days = [(first + i) % 7 for i in range((last - first) % 7 + 1)]
+                start, end = int(match.group(3)), int(match.group(4))
+                if 0 <= start < 24 and 0 <= end <= 24:
+                    mask |= _days_hours(days, start, end % 24)
+    return mask
+
+
+def local_now() -> datetime:
+    return datetime.utcnow() + timedelta(minutes=UTC_OFFSET_MINUTES)
+
+
+def hour_of_week(at: Optional[datetime] = None) -> int:
+    """Hour index of a local time (now by default)"""
+    at = at or local_now()
+    return at.weekday() * HOURS_PER_DAY + at.hour
+
+
+def next_hours_mask(hours: int = 1, at: Optional[datetime] = None) -> int:
+    """Mask for the current hour and the following hours - 1"""
+    return window_mask(hour_of_week(at), hours)
+
+
+# ---------- STORAGE ----------
+
+def to_words(mask: int) -> Tuple[int, int, int]:
+    """Three signed 64-bit words (for integer columns)"""
+    words = []
+    for i in range(WORDS):
+        word = (mask >> (64 * i)) & 0xFFFFFFFFFFFFFFFF
+        words.append(word - (1 << 64) if word >= (1 << 63) else word)
+    return tuple(words)
+
+
+def from_words(words: Sequence[Optional[int]]) -> Optional[int]:
+    """Inverse of to_words; None if any word is missing"""
+    if any(w is None for w in words):
+        return None
+    mask = 0
+    for i, word in enumerate(words):
+        mask |= (int(word) & 0xFFFFFFFFFFFFFFFF) << (64 * i)
+    return mask
+
+
+def mask_array(mask: int) -> np.ndarray:
+    """uint64[WORDS] form of a mask"""
+    return np.array([(mask >> (64 * i)) & 0xFFFFFFFFFFFFFFFF for i in range(WORDS)], dtype=np.uint64)
+
+
+def covers(masks: np.ndarray, window: int) -> np.ndarray:
+    """Which rows of an (n, WORDS) uint64 array include every hour of `window`"""
+    if len(masks) == 0:
+        return np.zeros(0, dtype=bool)
+    want = mask_array(window)
+    return np.all((masks & want) == want, axis=1)
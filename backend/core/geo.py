@@ -1,5 +1,7 @@
 import math
-from typing import Dict
+from typing import Dict, Tuple
+
+import numpy as np
 
 
 EARTH_RADIUS_KM = 6371
@@ -31,6 +33,72 @@ def haversine_distance(
     )
 
 
+def haversine_distances(
+    lat: float,
+    lon: float,
+    lats,
+    lons
+) -> np.ndarray:
+    """
+    Great-circle distances (in KM) from one point to many, in one NumPy pass.
+    """
+
+    lats = np.radians(np.asarray(lats, dtype=np.float64))
+    lons = np.radians(np.asarray(lons, dtype=np.float64))
+    phi1 = math.radians(lat)
+
+    a = (
+        np.sin((lats - phi1) / 2) ** 2
+        + math.cos(phi1) * np.cos(lats)
+        * np.sin((lons - math.radians(lon)) / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def haversine_matrix(
+    lats1,
+    lons1,
+    lats2,
+    lons2
+) -> np.ndarray:
+    """
+    Pairwise great-circle distances (in KM), shape (len(lats1), len(lats2)),
+    by broadcasting. NaN coordinates give NaN distances.
+    """
+
+    lat1 = np.radians(np.asarray(lats1, dtype=np.float64))[:, None]
+    lon1 = np.radians(np.asarray(lons1, dtype=np.float64))[:, None]
+    lat2 = np.radians(np.asarray(lats2, dtype=np.float64))[None, :]
+    lon2 = np.radians(np.asarray(lons2, dtype=np.float64))[None, :]
+
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2)
+        * np.sin((lon2 - lon1) / 2) ** 2
+    )
+
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def bounding_box(
+    lat: float,
+    lon: float,
+    radius_km: float
+) -> Tuple[float, float, float, float]:
+    """
+    (min_lat, max_lat, min_lon, max_lon) enclosing a radius around a point.
+    Used as a cheap indexed pre-filter before exact haversine distances.
+    """
+
+    dlat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    # Longitude degrees shrink with latitude; clamp near the poles
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    dlon = min(180.0, math.degrees(radius_km / (EARTH_RADIUS_KM * cos_lat)))
+
+    return lat - dlat, lat + dlat, lon - dlon, lon + dlon
+
+
 def distance_between_locations(
     loc1: Dict,
     loc2: Dict
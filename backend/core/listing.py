@@ -0,0 +1,126 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Session
+
+
+MAX_PER_PAGE = 100
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """Opaque token for a row's sort key (datetimes survive the round trip)"""
+    payload = [{"dt": v.isoformat()} if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str) -> List[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw)
+        if not isinstance(payload, list):
+            raise ValueError("cursor must be a list")
+        return [
+            datetime.fromisoformat(v["dt"]) if isinstance(v, dict) and "dt" in v else v
+            for v in payload
+        ]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def select_fields(columns: Dict[str, Any], fields: Optional[str]) -> Dict[str, Any]:
+    """Subset of `columns` named in a comma-separated `fields` param"""
+    if not fields:
+        return columns
+    names = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [n for n in names if n not in columns]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown fields: {', '.join(unknown)} (allowed: {', '.join(columns)})"
+        )
+    return {n: columns[n] for n in names}
+
+
+def check_sort_key(key):
+    """
+    A row seek never matches NULL, and coalescing the key would stop the
+    seek from using the (key, id) index, so sort keys must be NOT NULL
+    """
+    column = getattr(key, "expression", key)
+    if getattr(column, "nullable", False) and not getattr(column, "primary_key", False):
+        raise ValueError(f"Sort key {column} must be NOT NULL")
+    return key
+
+
+def list_page(
+    db: Session,
+    columns: Dict[str, Any],
+    sort_keys: Sequence[Any],
+    filters: Sequence[Any] = (),
+    descending: bool = False,
+    page: int = 1,
+    per_page: int = 20,
+    cursor: Optional[str] = None
+) -> Dict:
+    """
+    One page of a listing, filtered and projected in SQL
+
+    - `columns` maps output names to column expressions (only these are
+      selected)
+    - `sort_keys` must end in a unique column; with a cursor the page is
+      a keyset seek past the previous page's last row, so its cost does
+      not grow with depth
+    - Sort keys are compared as raw NOT NULL columns so both the seek and
+      the ORDER BY walk their index (no full scan or temp sort)
+    - Without a cursor, `page` is an OFFSET (for old clients) and the
+      filtered total is counted; cursor pages skip the count
+    """
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    sort_keys = [check_sort_key(key) for key in sort_keys]
+
+    # Sort keys ride along (unlabelled extras) so the next cursor can be built
+    key_labels = [f"_k{i}" for i in range(len(sort_keys))]
+    query = db.query(
+        *[col.label(name) for name, col in columns.items()],
+        *[key.label(label) for key, label in zip(sort_keys, key_labels)]
+    ).filter(*filters)
+
+    total = None
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(sort_keys):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        keys, bound = tuple_(*sort_keys), tuple_(*values)
+        query = query.filter(keys < bound if descending else keys > bound)
+    else:
+        total = query.count()
+
+    query = query.order_by(*[k.desc() if descending else k.asc() for k in sort_keys])
+    if not cursor:
+        query = query.offset((max(page, 1) - 1) * per_page)
+    rows = query.limit(per_page + 1).all()
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    items = [{name: row._mapping[name] for name in columns} for row in rows]
+    next_cursor = (
+        encode_cursor([rows[-1]._mapping[label] for label in key_labels])
+        if has_more else None
+    )
+
+    return {
+        "items": items,
+        "page": None if cursor else page,
+        "per_page": per_page,
+        "total": total,
+        "next_cursor": next_cursor
+    }
+
+
+def table_columns(model) -> Dict[str, Any]:
+    """Every column of a model, keyed by name"""
+    return {c.name: getattr(model, c.key) for c in model.__table__.columns}
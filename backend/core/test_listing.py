@@ -0,0 +1,112 @@
+import os
+import sys
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from core.listing import list_page
+from db.crud import UNKNOWN_TIMESTAMP, backfill_sort_timestamps
+from db.database import Base
+from db.models import Assignment, PipelineRun, VolunteerRequest
+
+
+COLUMNS = {"id": Assignment.id}
+SORT_KEYS = [Assignment.created_at, Assignment.id]
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine, tables=[Assignment.__table__])
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    start = datetime(2026, 1, 1)
+    session.add_all([
+        Assignment(id=f"a{i:02d}", crisis_id="c1", created_at=start + timedelta(minutes=i % 7))
+        for i in range(20)
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def walk(db, per_page, descending=True):
+    """Every id reached by following next_cursor from the first page"""
+    page = list_page(db, COLUMNS, SORT_KEYS, descending=descending, per_page=per_page)
+    ids = [item["id"] for item in page["items"]]
+    while page["next_cursor"]:
+        page = list_page(db, COLUMNS, SORT_KEYS, descending=descending, per_page=per_page,
+                         cursor=page["next_cursor"])
+        ids += [item["id"] for item in page["items"]]
+    return ids
+
+
+def offset_walk(db, per_page, descending=True):
+    ids, page = [], 1
+    while True:
+        items = list_page(db, COLUMNS, SORT_KEYS, descending=descending, page=page, per_page=per_page)["items"]
+        if not items:
+            return ids
+        ids += [item["id"] for item in items]
+        page += 1
+
+
+@pytest.mark.parametrize("per_page", [1, 2, 3, 7, 20])
+@pytest.mark.parametrize("descending", [True, False])
+def test_cursor_pages_match_offset_pages(db, per_page, descending):
+    ids = walk(db, per_page, descending)
+    assert len(ids) == len(set(ids)) == 20
+    assert ids == offset_walk(db, per_page, descending)
+
+
+def test_cursor_page_seeks_on_index(db, engine):
+    first = list_page(db, COLUMNS, SORT_KEYS, descending=True, per_page=5)
+
+    statements = []
+    capture = lambda conn, cursor, statement, params, context, many: statements.append((statement, params))
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        list_page(db, COLUMNS, SORT_KEYS, descending=True, per_page=5, cursor=first["next_cursor"])
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+
+    statement, params = statements[-1]
+    plan = " ".join(row[-1] for row in db.connection().exec_driver_sql(
+        "EXPLAIN QUERY PLAN " + statement, params
+    ))
+    assert "ix_assignments_created_id" in plan
+    assert "TEMP B-TREE" not in plan
+
+
+def test_nullable_sort_key_is_rejected(db):
+    with pytest.raises(ValueError):
+        list_page(db, COLUMNS, [Assignment.crisis_id, Assignment.id])
+
+
+def test_backfill_fills_null_sort_keys():
+    # Tables created before the columns were NOT NULL
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        for table, column in (("assignments", "created_at"),
+                              ("volunteer_requests", "created_at"),
+                              ("pipeline_runs", "timestamp")):
+            key = "run_id" if table == "pipeline_runs" else "id"
+            conn.execute(text(f"CREATE TABLE {table} ({key} VARCHAR(50) PRIMARY KEY, {column} DATETIME)"))
+            conn.execute(text(f"INSERT INTO {table} VALUES ('old', NULL), ('new', '2026-01-01 00:00:00')"))
+
+    session = sessionmaker(bind=engine)()
+    assert backfill_sort_timestamps(session) == 3
+    for column in (Assignment.created_at, VolunteerRequest.created_at, PipelineRun.timestamp):
+        values = dict(session.query(column.class_.__mapper__.primary_key[0], column))
+        assert values == {"old": UNKNOWN_TIMESTAMP, "new": datetime(2026, 1, 1)}
+    session.close()
+    engine.dispose()
@@ -1,11 +1,18 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
+from sqlalchemy import and_, or_, func, select
 from datetime import datetime, timedelta
 import bcrypt
 
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import uuid
-from .models import User, Crisis, Task, PerformanceMetric, SocialSignal
+import numpy as np
+from core.geo import bounding_box, haversine_distances
+from core.availability import compile_availability, next_hours_mask, to_words
+from .models import (
+    User, Crisis, Task, PerformanceMetric, SocialSignal, VolunteerSkill,
+    Resource, Assignment, VolunteerRequest, AssignmentVolunteer, RequestVolunteer,
+    PipelineRun
+)
 
 
 # ============= USER OPERATIONS =============
@@ -44,6 +51,7 @@ def create_user(
     )
     
     db.add(user)
+    set_volunteer_skills(db, user, skills)
     db.commit()
     db.refresh(user)
     return user
@@ -64,51 +72,134 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 
+def set_volunteer_skills(db: Session, user: User, skills: Optional[List[str]]):
+    """
+    Set user.skills and mirror it into volunteer_skills (caller commits)
+    """
+    user.skills = skills
+    db.query(VolunteerSkill).filter(VolunteerSkill.user_id == user.id).delete(synchronize_session=False)
+    for skill in dict.fromkeys(s for s in (skills or []) if s):
+        db.add(VolunteerSkill(user_id=user.id, skill=skill))
+
+
+def has_skill(skill: str):
+    """Filter clause: user has `skill` (index lookup on volunteer_skills)"""
+    return User.id.in_(select(VolunteerSkill.user_id).where(VolunteerSkill.skill == skill))
+
+
+def available_during(hours: int = 1, at: Optional[datetime] = None):
+    """
+    Filter clause: the availability mask covers the current hour and the
+    next hours - 1 (bitwise AND per 64-bit word)
+    """
+    words = to_words(next_hours_mask(hours, at))
+    columns = (User.availability_mask_0, User.availability_mask_1, User.availability_mask_2)
+    return and_(*[
+        column.op("&")(word) == word
+        for column, word in zip(columns, words) if word
+    ])
+
+
+def backfill_availability_masks(db: Session) -> int:
+    """Compile availability masks for rows written before the mask columns existed"""
+    users = db.query(User).filter(
+        User.availability.isnot(None),
+        User.availability_mask_0.is_(None)
+    ).all()
+    for user in users:
+        user.availability_mask_0, user.availability_mask_1, user.availability_mask_2 = (
+            to_words(compile_availability(user.availability))
+        )
+    db.commit()
+    return len(users)
+
+
+def backfill_volunteer_skills(db: Session) -> int:
+    """Populate volunteer_skills from the JSON column for rows written before it existed"""
+    synced = select(VolunteerSkill.user_id)
+    users = db.query(User).filter(User.skills.isnot(None), User.id.notin_(synced)).all()
+    count = 0
+    for user in users:
+        for skill in dict.fromkeys(s for s in (user.skills or []) if s):
+            db.add(VolunteerSkill(user_id=user.id, skill=skill))
+            count += 1
+    db.commit()
+    return count
+
+
 def get_available_volunteers(
     db: Session,
     latitude: Optional[float] = None,
     longitude: Optional[float] = None,
     required_skill: Optional[str] = None,
-    max_distance_km: float = 50.0
+    max_distance_km: float = 50.0,
+    available_for_hours: int = 1
 ) -> List[User]:
     """
-    Get available volunteers, optionally filtered by location and skill
+    Get volunteers available now (and for the next available_for_hours),
+    optionally filtered by location and skill
     """
+    if latitude is not None and longitude is not None:
+        return [
+            volunteer for volunteer, _ in get_volunteers_within_radius(
+                db, latitude, longitude, max_distance_km, required_skill, available_for_hours
+            )
+        ]
+
     query = db.query(User).filter(
         User.role == "volunteer",
-        User.availability == True
+        available_during(available_for_hours)
     )
-    
+
     # Filter by skill if specified
     if required_skill:
-        query = query.filter(User.skills.contains([required_skill]))
-    
+        query = query.filter(has_skill(required_skill))
+
+    return query.all()
+
+
+def get_volunteers_within_radius(
+    db: Session,
+    latitude: float,
+    longitude: float,
+    max_distance_km: float = 50.0,
+    required_skill: Optional[str] = None,
+    available_for_hours: int = 1
+) -> List[Tuple[User, float]]:
+    """
+    Available volunteers within max_distance_km, nearest first, with distances
+
+    A lat/lon bounding box is applied in SQL (served by ix_users_role_lat_lon),
+    then exact haversine distances for the survivors come from one NumPy pass.
+    """
+    min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, max_distance_km)
+
+    query = db.query(User).filter(
+        User.role == "volunteer",
+        User.latitude.between(min_lat, max_lat),
+        User.longitude.between(min_lon, max_lon),
+        available_during(available_for_hours)
+    )
+
+    if required_skill:
+        query = query.filter(has_skill(required_skill))
+
     volunteers = query.all()
-    
-    # Filter by distance if location provided
-    if latitude and longitude:
-        from math import radians, sin, cos, sqrt, atan2
-        
-        def haversine_distance(lat1, lon1, lat2, lon2):
-            """Calculate distance in km"""
-            R = 6371  # Earth radius in km
-            
-            lat1, lon1, lat2, lon2 = map(radians, [lat1, lon1, lat2, lon2])
-            dlat = lat2 - lat1
-            dlon = lon2 - lon1
-            
-            a = sin(dlat/2)**2 + cos(lat1) * cos(lat2) * sin(dlon/2)**2
-            c = 2 * atan2(sqrt(a), sqrt(1-a))
-            
-            return R * c
-        
-        volunteers = [
-            v for v in volunteers
-            if v.latitude and v.longitude and
-            haversine_distance(latitude, longitude, v.latitude, v.longitude) <= max_distance_km
-        ]
-    
-    return volunteers
+
+    if not volunteers:
+        return []
+
+    distances = haversine_distances(
+        latitude,
+        longitude,
+        [v.latitude for v in volunteers],
+        [v.longitude for v in volunteers]
+    )
+
+    in_range = np.flatnonzero(distances <= max_distance_km)
+    in_range = in_range[np.argsort(distances[in_range], kind="stable")]
+
+    return [(volunteers[i], float(distances[i])) for i in in_range]
 
 
 def update_volunteer_reliability(db: Session, volunteer_id: int, new_score: float):
@@ -212,10 +303,12 @@ def create_task(
     description: Optional[str] = None,
     latitude: Optional[float] = None,
     longitude: Optional[float] = None,
-    priority: int = 5
+    priority: int = 5,
+    commit: bool = True
 ) -> Task:
-    """Create new task"""
+    """Create new task (commit=False only flushes, for batch transactions)"""
     task = Task(
+        id=f"t_{uuid.uuid4().hex[:8]}",
         crisis_id=crisis_id,
         title=title,
         description=description,
@@ -228,8 +321,11 @@ def create_task(
     )
     
     db.add(task)
-    db.commit()
-    db.refresh(task)
+    if commit:
+        db.commit()
+        db.refresh(task)
+    else:
+        db.flush()
     return task
 
 
@@ -238,15 +334,18 @@ def get_task_by_id(db: Session, task_id: int) -> Optional[Task]:
     return db.query(Task).filter(Task.id == task_id).first()
 
 
-def assign_task(db: Session, task_id: int, volunteer_id: int) -> Optional[Task]:
+def assign_task(db: Session, task_id: int, volunteer_id: int, commit: bool = True) -> Optional[Task]:
     """Assign task to volunteer"""
     task = get_task_by_id(db, task_id)
     if task and task.status == "pending":
         task.volunteer_id = volunteer_id
         task.status = "assigned"
         task.assigned_at = datetime.utcnow()
-        db.commit()
-        db.refresh(task)
+        if commit:
+            db.commit()
+            db.refresh(task)
+        else:
+            db.flush()
         return task
     return None
 
@@ -297,9 +396,10 @@ def record_metric(
     metric_value: float,
     crisis_id: Optional[int] = None,
     task_id: Optional[int] = None,
-    metadata: Optional[dict] = None
+    metadata: Optional[dict] = None,
+    commit: bool = True
 ) -> PerformanceMetric:
-    """Record performance metric"""
+    """Record performance metric (metadata is stored in context_data)"""
     metric = PerformanceMetric(
         entity_type=entity_type,
         entity_id=entity_id,
@@ -307,12 +407,13 @@ def record_metric(
         metric_value=metric_value,
         crisis_id=crisis_id,
         task_id=task_id,
-        metadata=metadata
+        context_data=metadata
     )
     
     db.add(metric)
-    db.commit()
-    db.refresh(metric)
+    if commit:
+        db.commit()
+        db.refresh(metric)
     return metric
 
 
@@ -431,7 +532,7 @@ def update_volunteer_profile(
     if longitude is not None:
         volunteer.longitude = longitude
     if skills is not None:
-        volunteer.skills = skills
+        set_volunteer_skills(db, volunteer, skills)
     if availability is not None:
         volunteer.availability = availability
     if reliability_score is not None:
@@ -457,7 +558,7 @@ def attach_volunteer_to_user(
         return None
 
     user.role = "volunteer"
-    user.skills = skills or []
+    set_volunteer_skills(db, user, skills or [])
     user.availability = availability
     user.experience = experience
     user.emergency_contact = emergency_contact
@@ -473,6 +574,101 @@ def get_all_volunteers(db: Session) -> List[User]:
     """Get all volunteers"""
     return db.query(User).filter(User.role == "volunteer").all()
 
+
+def set_assignment_volunteers(db: Session, assignment: Assignment, volunteer_ids: List[str]):
+    """
+    Set assignment.volunteers and mirror it into assignment_volunteers (caller commits)
+    """
+    assignment.volunteers = volunteer_ids
+    db.query(AssignmentVolunteer).filter(
+        AssignmentVolunteer.assignment_id == assignment.id
+    ).delete(synchronize_session=False)
+    for vid in dict.fromkeys(v for v in (volunteer_ids or []) if v):
+        db.add(AssignmentVolunteer(assignment_id=assignment.id, volunteer_id=vid))
+
+
+def add_request_volunteer(db: Session, request: VolunteerRequest, volunteer_id: str) -> bool:
+    """
+    Record an acceptance in accepted_volunteers and request_volunteers
+    (caller commits); False if the volunteer had already accepted
+    """
+    accepted = list(request.accepted_volunteers or [])
+    if volunteer_id in accepted:
+        return False
+    request.accepted_volunteers = accepted + [volunteer_id]
+    request.fulfilled_count = len(request.accepted_volunteers)
+    db.add(RequestVolunteer(request_id=request.id, volunteer_id=volunteer_id))
+    return True
+
+
+def get_volunteer_assignments(
+    db: Session,
+    volunteer_id: str
+) -> List[Tuple[Assignment, Optional[Resource], Optional[Crisis]]]:
+    """A volunteer's assignments with their resource and crisis (one indexed join)"""
+    return db.query(Assignment, Resource, Crisis).join(
+        AssignmentVolunteer, AssignmentVolunteer.assignment_id == Assignment.id
+    ).outerjoin(
+        Resource, Resource.id == Assignment.resource_id
+    ).outerjoin(
+        Crisis, Crisis.id == Assignment.crisis_id
+    ).filter(
+        AssignmentVolunteer.volunteer_id == volunteer_id
+    ).all()
+
+
+def get_volunteer_accepted_requests(db: Session, volunteer_id: str) -> List[VolunteerRequest]:
+    """Volunteer requests the volunteer accepted (one indexed join)"""
+    return db.query(VolunteerRequest).join(
+        RequestVolunteer, RequestVolunteer.request_id == VolunteerRequest.id
+    ).filter(
+        RequestVolunteer.volunteer_id == volunteer_id
+    ).all()
+
+
+def backfill_volunteer_links(db: Session) -> int:
+    """
+    Populate assignment_volunteers/request_volunteers from the JSON columns
+    for rows written before they existed
+    """
+    count = 0
+    assignments = db.query(Assignment).filter(
+        Assignment.volunteers.isnot(None),
+        Assignment.id.notin_(select(AssignmentVolunteer.assignment_id))
+    ).all()
+    for assignment in assignments:
+        for vid in dict.fromkeys(v for v in (assignment.volunteers or []) if v):
+            db.add(AssignmentVolunteer(assignment_id=assignment.id, volunteer_id=vid))
+            count += 1
+
+    requests = db.query(VolunteerRequest).filter(
+        VolunteerRequest.accepted_volunteers.isnot(None),
+        VolunteerRequest.id.notin_(select(RequestVolunteer.request_id))
+    ).all()
+    for request in requests:
+        for vid in dict.fromkeys(v for v in (request.accepted_volunteers or []) if v):
+            db.add(RequestVolunteer(request_id=request.id, volunteer_id=vid))
+            count += 1
+
+    db.commit()
+    return count
+
+
+# Listing sort keys must be NOT NULL; rows written before that get this
+# (older than any real row, so they stay at the end of newest-first pages)
+UNKNOWN_TIMESTAMP = datetime(1970, 1, 1)
+
+
+def backfill_sort_timestamps(db: Session) -> int:
+    """Fill NULL created_at/timestamp sort keys left by rows from before the column default"""
+    count = 0
+    for column in (Assignment.created_at, VolunteerRequest.created_at, PipelineRun.timestamp):
+        count += db.query(column.class_).filter(column.is_(None)).update(
+            {column: UNKNOWN_TIMESTAMP}, synchronize_session=False
+        )
+    db.commit()
+    return count
+
 # ============= SOCIAL SIGNAL OPERATIONS =============
 
 def create_social_signal(
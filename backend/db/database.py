@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, inspect, text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from core.config import settings
@@ -34,8 +34,52 @@ SessionLocal = sessionmaker(
 Base = declarative_base()
 
 def init_db():
-    from .models import User, Crisis, Task, PerformanceMetric, SocialSignal
+    from .models import (
+        User, Crisis, Task, PerformanceMetric, SocialSignal, VolunteerSkill,
+        AssignmentVolunteer, RequestVolunteer
+    )
     Base.metadata.create_all(bind=engine)
+    # create_all skips tables that already exist; add new (nullable) columns
+    existing = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not existing.has_table(table.name):
+                continue
+            present = {c["name"] for c in existing.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in present and column.nullable:
+                    conn.execute(text(
+                        f"ALTER TABLE {table.name} ADD COLUMN {column.name} "
+                        f"{column.type.compile(dialect=engine.dialect)}"
+                    ))
+    # ...and indexes on them
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    # volunteer_skills, assignment_volunteers, request_volunteers and the
+    # availability masks mirror other columns; fill them for rows that predate them
+    from .crud import (
+        backfill_volunteer_skills, backfill_volunteer_links, backfill_availability_masks,
+        backfill_sort_timestamps
+    )
+    db = SessionLocal()
+    try:
+        backfill_volunteer_skills(db)
+        backfill_volunteer_links(db)
+        backfill_availability_masks(db)
+        # Listing sort keys are NOT NULL (so pages can seek on their index);
+        # older tables may still hold NULLs from before the column default
+        backfill_sort_timestamps(db)
+    finally:
+        db.close()
+    if engine.dialect.name != "sqlite":
+        # SQLite cannot add the constraint to an existing column; the backfill
+        # and the model default keep its rows non-NULL instead
+        with engine.begin() as conn:
+            for table, column in (("assignments", "created_at"),
+                                  ("volunteer_requests", "created_at"),
+                                  ("pipeline_runs", "timestamp")):
+                conn.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
     print("✅ Database tables created")
 
 def get_db():
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, JSON, Text
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Boolean, DateTime, ForeignKey, JSON, Text, Index, event
 from sqlalchemy.orm import relationship
 from datetime import datetime
+from core.availability import compile_availability, to_words
 from .database import Base
 
 
@@ -23,6 +24,10 @@ class User(Base):
     # Volunteer-specific fields
     skills = Column(JSON)  # List of skills: ["first_aid", "rescue"]
     availability = Column(String(50), nullable=True)  # Changed to string: 'anytime', 'weekdays', 'weekends', 'evenings'
+    # availability compiled to a 168-bit hour-of-week mask (three 64-bit words, see core.availability)
+    availability_mask_0 = Column(BigInteger, nullable=True)
+    availability_mask_1 = Column(BigInteger, nullable=True)
+    availability_mask_2 = Column(BigInteger, nullable=True)
     experience = Column(String(50), nullable=True)  # 'beginner', 'intermediate', 'advanced', 'expert'
     emergency_contact = Column(String(100), nullable=True)
     reliability_score = Column(Float, default=1.0)  # 0.0 to 1.0
@@ -40,6 +45,34 @@ class User(Base):
     assigned_tasks = relationship("Task", back_populates="volunteer")
     managed_crises = relationship("Crisis", back_populates="managing_ngo", foreign_keys="Crisis.accepted_by_ngo_id")
 
+    # Serves the volunteer radius search (bounding box on lat/lon per role);
+    # the mask index lets "available during these hours" scan the index only
+    __table_args__ = (
+        Index("ix_users_role_lat_lon", "role", "latitude", "longitude"),
+        Index("ix_users_role_availability", "role", "availability_mask_0", "availability_mask_1", "availability_mask_2"),
+    )
+
+
+@event.listens_for(User.availability, "set")
+def _compile_availability_mask(target, value, oldvalue, initiator):
+    """Keep the mask words in step with every write to availability"""
+    target.availability_mask_0, target.availability_mask_1, target.availability_mask_2 = (
+        to_words(compile_availability(value))
+    )
+
+
+class VolunteerSkill(Base):
+    """Normalized volunteer skills - one row per (user, skill) for indexed skill search"""
+    __tablename__ = "volunteer_skills"
+
+    user_id = Column(String(50), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    skill = Column(String(50), primary_key=True)
+
+    # Skill-first so "who has X" is an index range scan
+    __table_args__ = (
+        Index("ix_volunteer_skills_skill_user", "skill", "user_id"),
+    )
+
 
 class Crisis(Base):
     """Crisis/Emergency event"""
@@ -159,6 +192,11 @@ class Resource(Base):
     allocated_to = Column(String(50), nullable=True)
     allocated_at = Column(DateTime, nullable=True)
 
+    # Listing filters (type/availability), keyset on id
+    __table_args__ = (
+        Index("ix_resources_type_available_id", "type", "available", "id"),
+    )
+
 class Assignment(Base):
     __tablename__ = "assignments"
     id = Column(String(50), primary_key=True)
@@ -167,7 +205,12 @@ class Assignment(Base):
     crisis_id = Column(String(50))
     notes = Column(Text)
     assigned_by = Column(String(50))
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Keyset pagination: newest first, id breaks ties
+    __table_args__ = (
+        Index("ix_assignments_created_id", "created_at", "id"),
+    )
 
 class VolunteerRequest(Base):
     __tablename__ = "volunteer_requests"
@@ -183,17 +226,50 @@ class VolunteerRequest(Base):
     volunteers_needed = Column(Integer, default=1)
     fulfilled_count = Column(Integer, default=0)
     status = Column(String(20), default="OPEN")
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     created_by = Column(String(50))
     accepted_volunteers = Column(JSON)
 
+    __table_args__ = (
+        Index("ix_volunteer_requests_created_id", "created_at", "id"),
+    )
+
+
+class AssignmentVolunteer(Base):
+    """Normalized Assignment.volunteers - one row per (assignment, volunteer)"""
+    __tablename__ = "assignment_volunteers"
+
+    assignment_id = Column(String(50), ForeignKey("assignments.id", ondelete="CASCADE"), primary_key=True)
+    volunteer_id = Column(String(50), primary_key=True)
+
+    # Volunteer-first so "tasks for volunteer X" is an index range scan
+    __table_args__ = (
+        Index("ix_assignment_volunteers_volunteer", "volunteer_id", "assignment_id"),
+    )
+
+
+class RequestVolunteer(Base):
+    """Normalized VolunteerRequest.accepted_volunteers - one row per acceptance"""
+    __tablename__ = "request_volunteers"
+
+    request_id = Column(String(50), ForeignKey("volunteer_requests.id", ondelete="CASCADE"), primary_key=True)
+    volunteer_id = Column(String(50), primary_key=True)
+
+    __table_args__ = (
+        Index("ix_request_volunteers_volunteer", "volunteer_id", "request_id"),
+    )
+
 class PipelineRun(Base):
     __tablename__ = "pipeline_runs"
     run_id = Column(String(50), primary_key=True)
-    timestamp = Column(DateTime, default=datetime.utcnow)
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
     summary = Column(JSON)
     details = Column(JSON)
 
+    __table_args__ = (
+        Index("ix_pipeline_runs_timestamp_run", "timestamp", "run_id"),
+    )
+
 class SocialSignal(Base):
     """Social Media Signal - Raw data from Twitter/Reddit/Telegram"""
     __tablename__ = "social_signals"
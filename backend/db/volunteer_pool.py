@@ -0,0 +1,449 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import event, func, inspect
+from sqlalchemy.orm import Session
+
+from core.availability import compile_availability, covers, from_words, mask_array, next_hours_mask, WORDS
+from core.geo import bounding_box, haversine_distances
+
+
+ACTIVE_TASK_STATUSES = ("assigned", "in_progress")
+
+# Session.info keys for changes seen in flushes, applied on commit
+_PENDING_USERS = "volunteer_pool_users"
+_PENDING_TASKS = "volunteer_pool_tasks"
+
+
+def is_available(value) -> bool:
+    """Available at some hour of the week (shift strings included)"""
+    return compile_availability(value) != 0
+
+
+def availability_mask(user) -> int:
+    """Stored mask words, or the availability string compiled (rows not yet backfilled)"""
+    mask = from_words((
+        getattr(user, "availability_mask_0", None),
+        getattr(user, "availability_mask_1", None),
+        getattr(user, "availability_mask_2", None)
+    ))
+    return compile_availability(user.availability) if mask is None else mask
+
+
+class SkillRegistry:
+    """Append-only skill -> bit index, so masks never need renumbering"""
+
+    def __init__(self):
+        self._bits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._bits)
+
+    @property
+    def words(self) -> int:
+        """uint64 words needed for every registered skill"""
+        return max(1, (len(self._bits) + 63) // 64)
+
+    def bit(self, skill: str, create: bool = False) -> Optional[int]:
+        value = self._bits.get(skill)
+        if value is None and create:
+            with self._lock:
+                value = self._bits.setdefault(skill, len(self._bits))
+        return value
+
+    def mask(self, skills: Iterable[str], words: int = None) -> np.ndarray:
+        bits = [self.bit(s, create=True) for s in skills or ()]
+        mask = np.zeros(words or self.words, dtype=np.uint64)
+        for b in bits:
+            mask[b // 64] |= np.uint64(1) << np.uint64(b % 64)
+        return mask
+
+
+class VolunteerRecord:
+    """Immutable view of one volunteer, duck-typed like User for scoring"""
+
+    __slots__ = ("id", "name", "phone", "latitude", "longitude", "skills", "reliability_score",
+                 "availability", "availability_mask")
+
+    def __init__(self, id, name, phone, latitude, longitude, skills, reliability_score, availability_mask):
+        self.id = id
+        self.name = name
+        self.phone = phone
+        self.latitude = latitude
+        self.longitude = longitude
+        self.skills = tuple(skills or ())
+        self.reliability_score = 1.0 if reliability_score is None else float(reliability_score)
+        # 168-bit hour-of-week mask; `availability` is "ever available"
+        self.availability_mask = int(availability_mask or 0)
+        self.availability = self.availability_mask != 0
+
+    @classmethod
+    def from_user(cls, user) -> "VolunteerRecord":
+        return cls(
+            user.id, user.name, user.phone, user.latitude, user.longitude,
+            user.skills, user.reliability_score, availability_mask(user)
+        )
+
+
+class PoolSnapshot:
+    """
+    One consistent version of the pool
+
+    Arrays are never modified after construction; writers build a new
+    snapshot, so a reader holding one sees a single point in time.
+    """
+
+    __slots__ = ("version", "built_at", "records", "index", "latitudes", "longitudes",
+                 "skill_masks", "reliability", "available", "availability_masks", "active_tasks", "registry")
+
+    def __init__(self, version, records, index, latitudes, longitudes, skill_masks,
+                 reliability, available, availability_masks, active_tasks, registry, built_at=None):
+        self.version = version
+        self.built_at = built_at or time.time()
+        self.records = records
+        self.index = index
+        self.latitudes = latitudes
+        self.longitudes = longitudes
+        self.skill_masks = skill_masks
+        self.reliability = reliability
+        self.available = available
+        self.availability_masks = availability_masks
+        self.active_tasks = active_tasks
+        self.registry = registry
+
+    def __len__(self):
+        return len(self.records)
+
+    @classmethod
+    def from_records(cls, version, records: List[VolunteerRecord], active: Dict[str, int],
+                     registry: SkillRegistry) -> "PoolSnapshot":
+        for r in records:
+            for skill in r.skills:
+                registry.bit(skill, create=True)
+        words = registry.words
+        return cls(
+            version=version,
+            records=records,
+            index={r.id: i for i, r in enumerate(records)},
+            latitudes=np.array([np.nan if r.latitude is None else r.latitude for r in records], dtype=np.float64),
+            longitudes=np.array([np.nan if r.longitude is None else r.longitude for r in records], dtype=np.float64),
+            skill_masks=np.array([registry.mask(r.skills, words) for r in records], dtype=np.uint64).reshape(-1, words),
+            reliability=np.array([r.reliability_score for r in records], dtype=np.float64),
+            available=np.array([bool(r.availability) for r in records], dtype=bool),
+            availability_masks=np.array(
+                [mask_array(r.availability_mask) for r in records], dtype=np.uint64
+            ).reshape(-1, WORDS),
+            active_tasks=np.array([active.get(r.id, 0) for r in records], dtype=np.int32),
+            registry=registry
+        )
+
+    def has_skill(self, skill: str) -> np.ndarray:
+        """Boolean vector: which rows carry `skill`"""
+        bit = self.registry.bit(skill)
+        if bit is None or bit // 64 >= self.skill_masks.shape[1]:
+            return np.zeros(len(self.records), dtype=bool)
+        word = self.skill_masks[:, bit // 64]
+        return ((word >> np.uint64(bit % 64)) & np.uint64(1)).astype(bool)
+
+    def get(self, volunteer_id: str) -> Optional[VolunteerRecord]:
+        row = self.index.get(volunteer_id)
+        return None if row is None else self.records[row]
+
+    def within_radius(
+        self,
+        latitude: float,
+        longitude: float,
+        max_distance_km: float = 50.0,
+        required_skill: Optional[str] = None,
+        exclude: Iterable[str] = (),
+        available_for_hours: int = 1,
+        at=None
+    ) -> List[Tuple[VolunteerRecord, float]]:
+        """
+        Volunteers within the radius whose weekly availability covers the
+        current hour and the next available_for_hours - 1 (at: local time
+        to check instead of now), nearest first (no DB access)
+        """
+        if not self.records:
+            return []
+
+        min_lat, max_lat, min_lon, max_lon = bounding_box(latitude, longitude, max_distance_km)
+        # NaN coordinates compare False, like NULLs in the SQL version
+        mask = (
+            self.available
+            & (self.latitudes >= min_lat) & (self.latitudes <= max_lat)
+            & (self.longitudes >= min_lon) & (self.longitudes <= max_lon)
+        )
+        if available_for_hours:
+            mask &= covers(self.availability_masks, next_hours_mask(available_for_hours, at))
+        if required_skill:
+            mask &= self.has_skill(required_skill)
+        for volunteer_id in exclude or ():
+            row = self.index.get(volunteer_id)
+            if row is not None:
+                mask[row] = False
+
+        rows = np.flatnonzero(mask)
+        if rows.size == 0:
+            return []
+
+        distances = haversine_distances(latitude, longitude, self.latitudes[rows], self.longitudes[rows])
+        keep = distances <= max_distance_km
+        rows, distances = rows[keep], distances[keep]
+        order = np.argsort(distances, kind="stable")
+
+        return [(self.records[rows[i]], float(distances[i])) for i in order]
+
+
+class VolunteerPool:
+    """
+    In-memory volunteer pool for allocation bursts
+
+    Built with one query on first use, then kept current by SQLAlchemy
+    session hooks: user and task changes seen in a flush are applied when
+    that session commits (rolled-back changes are dropped). Writers swap in
+    a new snapshot with a bumped version; readers keep whichever snapshot
+    they took.
+
+    Hooks only see writes made through the ORM in this process, so the
+    pool is also rebuilt after `max_age_seconds` to pick up other workers.
+
+    Listeners (add_listener) get {id: (old_record, new_record)} after
+    each incremental update, or None after a full rebuild.
+    """
+
+    def __init__(self, max_age_seconds: float = 300.0):
+        self.max_age_seconds = max_age_seconds
+        self.registry = SkillRegistry()
+        self._snapshot: Optional[PoolSnapshot] = None
+        self._version = 0
+        self._lock = threading.Lock()
+        self._listeners = []
+        self.stats = {"builds": 0, "updates": 0}
+
+    def add_listener(self, callback):
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def _notify(self, changes):
+        for callback in list(self._listeners):
+            callback(changes)
+
+    # ---------- READ ----------
+
+    def snapshot(self, db: Session) -> PoolSnapshot:
+        snap = self._snapshot
+        if snap is None or (self.max_age_seconds and time.time() - snap.built_at > self.max_age_seconds):
+            snap = self.build(db)
+        return snap
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    # ---------- BUILD ----------
+
+    def build(self, db: Session) -> PoolSnapshot:
+        """Load every volunteer and active-task count (two queries)"""
+        from .models import User, Task
+
+        users = db.query(User).filter(User.role == "volunteer").all()
+        active = dict(
+            db.query(Task.volunteer_id, func.count(Task.id))
+            .filter(Task.volunteer_id.isnot(None), Task.status.in_(ACTIVE_TASK_STATUSES))
+            .group_by(Task.volunteer_id)
+            .all()
+        )
+
+        with self._lock:
+            self._version += 1
+            snap = PoolSnapshot.from_records(
+                self._version, [VolunteerRecord.from_user(u) for u in users], active, self.registry
+            )
+            self._snapshot = snap
+            self.stats["builds"] += 1
+        self._notify(None)
+        return snap
+
+    def invalidate(self):
+        """Drop the pool; the next read rebuilds it"""
+        with self._lock:
+            self._snapshot = None
+        self._notify(None)
+
+    # ---------- INCREMENTAL UPDATES ----------
+
+    def apply(self, users: Dict[str, Optional[VolunteerRecord]], task_deltas: Dict[str, int]):
+        """
+        Copy-on-write update: `users` maps id -> record (None removes it),
+        `task_deltas` maps volunteer id -> change in active task count
+        """
+        if not users and not task_deltas:
+            return
+        with self._lock:
+            snap = self._snapshot
+            if snap is None:
+                return
+            changes = {vid: (snap.get(vid), record) for vid, record in users.items()}
+
+            records = list(snap.records)
+            index = dict(snap.index)
+            latitudes = snap.latitudes.copy()
+            longitudes = snap.longitudes.copy()
+            reliability = snap.reliability.copy()
+            available = snap.available.copy()
+            availability_masks = snap.availability_masks.copy()
+            active_tasks = snap.active_tasks.copy()
+
+            for record in users.values():
+                if record is not None:
+                    for skill in record.skills:
+                        self.registry.bit(skill, create=True)
+            words = self.registry.words
+            skill_masks = snap.skill_masks
+            if skill_masks.shape[1] < words:
+                pad = np.zeros((len(records), words - skill_masks.shape[1]), dtype=np.uint64)
+                skill_masks = np.hstack([skill_masks, pad])
+            else:
+                skill_masks = skill_masks.copy()
+
+            removed, added = [], []
+            for volunteer_id, record in users.items():
+                row = index.get(volunteer_id)
+                if record is None:
+                    if row is not None:
+                        removed.append(row)
+                elif row is None:
+                    added.append(record)
+                else:
+                    records[row] = record
+                    latitudes[row] = np.nan if record.latitude is None else record.latitude
+                    longitudes[row] = np.nan if record.longitude is None else record.longitude
+                    skill_masks[row] = self.registry.mask(record.skills, words)
+                    reliability[row] = record.reliability_score
+                    available[row] = bool(record.availability)
+                    availability_masks[row] = mask_array(record.availability_mask)
+
+            for volunteer_id, delta in task_deltas.items():
+                row = index.get(volunteer_id)
+                if row is not None:
+                    active_tasks[row] = max(0, active_tasks[row] + delta)
+
+            if added:
+                extra = PoolSnapshot.from_records(0, added, {}, self.registry)
+                records.extend(added)
+                latitudes = np.concatenate([latitudes, extra.latitudes])
+                longitudes = np.concatenate([longitudes, extra.longitudes])
+                skill_masks = np.vstack([skill_masks, extra.skill_masks])
+                reliability = np.concatenate([reliability, extra.reliability])
+                available = np.concatenate([available, extra.available])
+                availability_masks = np.vstack([availability_masks, extra.availability_masks])
+                active_tasks = np.concatenate([
+                    active_tasks,
+                    np.array([max(0, task_deltas.get(r.id, 0)) for r in added], dtype=np.int32)
+                ])
+                for offset, record in enumerate(added):
+                    index[record.id] = len(records) - len(added) + offset
+
+            if removed:
+                keep = np.ones(len(records), dtype=bool)
+                keep[removed] = False
+                records = [r for r, k in zip(records, keep) if k]
+                latitudes, longitudes = latitudes[keep], longitudes[keep]
+                skill_masks, reliability = skill_masks[keep], reliability[keep]
+                available, active_tasks = available[keep], active_tasks[keep]
+                availability_masks = availability_masks[keep]
+                index = {r.id: i for i, r in enumerate(records)}
+
+            self._version += 1
+            self._snapshot = PoolSnapshot(
+                self._version, records, index, latitudes, longitudes, skill_masks,
+                reliability, available, availability_masks, active_tasks, self.registry,
+                built_at=snap.built_at
+            )
+            self.stats["updates"] += 1
+        if changes:
+            self._notify(changes)
+
+    def get_statistics(self) -> Dict:
+        snap = self._snapshot
+        return {
+            "built": snap is not None,
+            "version": self._version,
+            "volunteers": len(snap) if snap else 0,
+            "available": int(snap.available.sum()) if snap else 0,
+            "available_now": int(covers(snap.availability_masks, next_hours_mask(1)).sum()) if snap else 0,
+            "skills_registered": len(self.registry),
+            "age_seconds": round(time.time() - snap.built_at, 1) if snap else None,
+            **self.stats
+        }
+
+
+volunteer_pool = VolunteerPool()
+
+
+# ---------- SESSION HOOKS ----------
+# Matched on table name: models are importable as both db.models and
+# backend.db.models, which are distinct classes.
+
+def _task_state(task, current: bool):
+    """(volunteer_id, counts_as_active) before or after this flush"""
+    if current:
+        volunteer_id, status = task.volunteer_id, task.status
+    else:
+        state = inspect(task)
+
+        def previous(name):
+            history = state.attrs[name].history
+            if history.deleted:
+                return history.deleted[0]
+            return history.unchanged[0] if history.unchanged else getattr(task, name)
+        volunteer_id, status = previous("volunteer_id"), previous("status")
+    return volunteer_id, status in ACTIVE_TASK_STATUSES
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_pool_changes(session, flush_context):
+    users = session.info.setdefault(_PENDING_USERS, {})
+    tasks = session.info.setdefault(_PENDING_TASKS, {})
+
+    def bump(volunteer_id, delta):
+        if volunteer_id:
+            tasks[volunteer_id] = tasks.get(volunteer_id, 0) + delta
+
+    for obj in session.new | session.dirty:
+        table = getattr(obj, "__tablename__", None)
+        if table == "users":
+            users[obj.id] = VolunteerRecord.from_user(obj) if obj.role == "volunteer" else None
+        elif table == "tasks":
+            after = _task_state(obj, current=True)
+            before = (None, False) if obj in session.new else _task_state(obj, current=False)
+            if before != after:
+                if before[1]:
+                    bump(before[0], -1)
+                if after[1]:
+                    bump(after[0], 1)
+
+    for obj in session.deleted:
+        table = getattr(obj, "__tablename__", None)
+        if table == "users":
+            users[obj.id] = None
+        elif table == "tasks" and obj.status in ACTIVE_TASK_STATUSES:
+            bump(obj.volunteer_id, -1)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pool_changes(session):
+    users = session.info.pop(_PENDING_USERS, None)
+    tasks = session.info.pop(_PENDING_TASKS, None)
+    if users or tasks:
+        volunteer_pool.apply(users or {}, tasks or {})
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pool_changes(session):
+    session.info.pop(_PENDING_USERS, None)
+    session.info.pop(_PENDING_TASKS, None)
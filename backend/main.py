@@ -1,5 +1,6 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+import asyncio
 import logging
 import sys
 from pathlib import Path
@@ -32,6 +33,9 @@ try:
     from api.analytics_routes import router as analytics_router
     from api.learning import router as learning_router
     from ws.manager import manager
+    from backend.agents.resource_agent import router as resource_agent_router
+    from backend.agents.resource.dispatch_queue import dispatch_queue
+    from backend.agents.resource.allocation_queue import allocation_queue
 except ImportError as e:
     logging.error(f"Import error: {e}")
     raise
@@ -70,6 +74,16 @@ async def startup_event():
         logger.error(f"❌ Database initialization failed: {e}")
         raise
 
+    # Assignment notifications/metrics are sent off the request path
+    dispatch_queue.start(loop=asyncio.get_running_loop(), broadcaster=manager.broadcast)
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Finish queued allocations, then drain their notifications"""
+    allocation_queue.stop()
+    dispatch_queue.stop()
+
 # Register API Routers
 app.include_router(users_router)
 app.include_router(crisis_router)
@@ -84,6 +98,7 @@ app.include_router(system_router)
 app.include_router(simulate_router)
 app.include_router(orchestrator_router)
 app.include_router(resource_api_router)
+app.include_router(resource_agent_router)
 app.include_router(ngo_router)
 app.include_router(analytics_router)
 app.include_router(learning_router)
@@ -3,7 +3,6 @@ Social Media Service - Fetch crisis signals from Twitter/Reddit/Telegram
 """
 
 import os
-import tweepy
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional
 import logging
@@ -31,14 +30,28 @@ class TwitterService:
         self.access_token = os.getenv("TWITTER_ACCESS_TOKEN")
         self.access_token_secret = os.getenv("TWITTER_ACCESS_TOKEN_SECRET")
         
+        # tweepy is imported and the client built on first fetch, not at
+        # import time - the API process only needs it when the scheduler runs
+        self._client = None
+        self._client_initialized = False
+    
+    @property
+    def client(self):
+        if not self._client_initialized:
+            self._client = self._create_client()
+            self._client_initialized = True
+        return self._client
+    
+    def _create_client(self):
         if not all([self.api_key, self.api_secret, self.bearer_token]):
             logger.warning("Twitter API credentials not found. Service disabled.")
-            self.client = None
-            return
+            return None
         
         try:
+            import tweepy
+            
             # Twitter API v2 client
-            self.client = tweepy.Client(
+            client = tweepy.Client(
                 bearer_token=self.bearer_token,
                 consumer_key=self.api_key,
                 consumer_secret=self.api_secret,
@@ -46,9 +59,10 @@ class TwitterService:
                 access_token_secret=self.access_token_secret
             )
             logger.info("✅ Twitter API client initialized")
+            return client
         except Exception as e:
             logger.error(f"Failed to initialize Twitter client: {e}")
-            self.client = None
+            return None
     
     def search_recent_tweets(
         self,
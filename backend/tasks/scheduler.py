@@ -8,6 +8,7 @@ from backend.db.database import SessionLocal
 from backend.services.social_media_service import social_media_service
 from backend.agents.detection_agent import run_detection_pipeline
 from backend.seed_raw_signals import seed_raw_signals
+from backend.agents.trust.retention import run_trust_retention, format_size_report
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -51,6 +52,19 @@ def run_detection_task():
         logger.error(f"[Scheduler]  Error running detection: {e}")
 
 
+def run_trust_retention_task():
+    logger.info(f"[Scheduler] Starting trust DB retention at {datetime.utcnow()}")
+    
+    try:
+        result = run_trust_retention()
+        
+        for line in format_size_report(result):
+            logger.info(f"[Scheduler] {line}")
+        
+    except Exception as e:
+        logger.error(f"[Scheduler] Error running trust retention: {e}")
+
+
 def start_scheduler():
     
     logger.info("=" * 60)
@@ -61,6 +75,7 @@ def start_scheduler():
     # Twitter Fetch: Every 24 hours at 12:00 AM
     schedule.every().day.at("00:00").do(fetch_social_media_task)
     schedule.every(10).minutes.do(run_detection_task)     
+    schedule.every().day.at("03:00").do(run_trust_retention_task)
 
     logger.info("[Scheduler] Running initial tasks...")
     
@@ -78,6 +93,7 @@ def start_scheduler():
     logger.info("[Scheduler] - Social media fetch: Daily at 00:00")
     logger.info("[Scheduler] - Demo data injection: Once at startup")
     logger.info("[Scheduler] - Detection pipeline: Every 10 minutes")
+    logger.info("[Scheduler] - Trust DB retention: Daily at 03:00")
     
     while True:
         schedule.run_pending()
@@ -5,6 +5,7 @@ class EventType(str, Enum):
     NEW_CRISIS = "NEW_CRISIS"
     UPDATE_CRISIS = "UPDATE_CRISIS"
     ALERT = "ALERT"
+    TASK_ASSIGNED = "TASK_ASSIGNED"
 
 def build_event(event_type: EventType, payload: Dict[str, Any], target: str = "all") -> Dict[str, Any]:
     return {
@@ -43,6 +43,12 @@ export const setVolunteerAvailability = async (id, payload) => {
   return res.data;
 };
 
+export const getCoverage = async (params = {}) => {
+  // { kind: 'volunteer' | 'resource', skill, available_for_hours }
+  const res = await api.get('/api/resource/coverage', { params });
+  return res.data;
+};
+
 export const getVolunteerRequests = async () => {
   const res = await api.get('/api/resource/volunteer_requests');
   return res.data;